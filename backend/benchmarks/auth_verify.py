@@ -0,0 +1,77 @@
+"""
+Micro-benchmark of bearer token authentication
+Times get_current_user for an HS256 token issued by /api/auth and an
+RS256 token checked against a (pre-filled) JWKS cache, both with the
+signature verified on every call and served from verified_tokens.
+
+Run from the backend directory:
+    python benchmarks/auth_verify.py
+"""
+import asyncio
+import os
+import secrets
+import sys
+import time
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwk, jwt
+
+from config import settings
+from core import auth
+
+# Calls timed per case
+VERIFY_ROUNDS = 3000
+CACHED_ROUNDS = 20000
+
+
+def _tokens() -> dict[str, str]:
+    settings.JWT_SECRET_KEY = secrets.token_urlsafe(32)
+    claims = {"sub": str(uuid4()), "email": "user@example.com"}
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    auth.jwks_cache._keys = {"bench": jwk.construct(public_pem.decode(), "RS256")}
+    auth.jwks_cache._checked_at = time.monotonic()
+
+    return {
+        "HS256": auth.create_access_token(claims),
+        "RS256": jwt.encode(
+            {**claims, "aud": settings.SUPABASE_JWT_AUDIENCE, "exp": int(time.time()) + 3600},
+            private_pem,
+            algorithm="RS256",
+            headers={"kid": "bench"}
+        ),
+    }
+
+
+async def _time(token: str, cached: bool, rounds: int) -> float:
+    """Mean microseconds per get_current_user call"""
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    await auth.get_current_user(credentials)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if not cached:
+            auth.verified_tokens.clear()
+        await auth.get_current_user(credentials)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+async def main():
+    for algorithm, token in _tokens().items():
+        for cached in (False, True):
+            elapsed = await _time(token, cached, CACHED_ROUNDS if cached else VERIFY_ROUNDS)
+            print(f"{algorithm} {'cached' if cached else 'verify':>6}: {elapsed:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark of calendar event queries as the event store grows
+One user keeps USER_EVENTS events while other users' events are added
+until the store holds 1k to 1M events. get_events for a month window
+(and the page after it, by cursor) should take the same time at every
+size: the window is found by binary search in the user's own index and
+the page is sliced from it.
+
+Run from the backend directory:
+    python benchmarks/calendar_index.py
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.calendar import CalendarEvent
+from services.calendar_service import CalendarService
+
+# Total events in the store at each measurement
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+# Events of the measured user, one every ~9 hours over a year
+USER_EVENTS = 1000
+
+# Events per other user
+EVENTS_PER_OTHER_USER = 1000
+
+PAGE_SIZE = 50
+ROUNDS = 2000
+
+_EPOCH = datetime(2025, 1, 1)
+
+
+def _add_events(service: CalendarService, user_id, count: int):
+    """Store count one-hour events spread over a year for user_id"""
+    step = timedelta(days=365) / count
+    now = datetime.now()
+    for i in range(count):
+        start = _EPOCH + step * i
+        service._store(CalendarEvent.model_construct(
+            id=uuid4(),
+            user_id=user_id,
+            title=f"Event {i}",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            created_at=now,
+            updated_at=now
+        ))
+
+
+async def _time(service: CalendarService, user_id, start: datetime, end: datetime) -> tuple[float, float]:
+    """Mean microseconds for a month window's first page and the page after it"""
+    _, _, cursor = await service.get_events(user_id, start, end, limit=PAGE_SIZE)
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await service.get_events(user_id, start, end, limit=PAGE_SIZE)
+    first = (time.perf_counter() - started) / ROUNDS * 1e6
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await service.get_events(user_id, start, end, limit=PAGE_SIZE, cursor=cursor, include_total=False)
+    after = (time.perf_counter() - started) / ROUNDS * 1e6
+    return first, after
+
+
+async def main():
+    service = CalendarService()
+    user_id = uuid4()
+    _add_events(service, user_id, USER_EVENTS)
+    start, end = _EPOCH + timedelta(days=150), _EPOCH + timedelta(days=181)
+
+    print(f"{'events':>9} {'month page':>12} {'next page':>12}")
+    for size in SIZES:
+        while len(service.mock_events) < size:
+            _add_events(service, uuid4(), min(EVENTS_PER_OTHER_USER, size - len(service.mock_events)))
+        first, after = await _time(service, user_id, start, end)
+        print(f"{len(service.mock_events):>9,} {first:>9.1f} us {after:>9.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark of the journal "on this day" lookup
+One user has an entry for every day of YEARS years (about 3,650
+entries). get_on_this_day reads the (month, day) index and touches only
+the matching entries; the baseline finds the same entries by scanning
+every stored entry, as the lookup did without the index.
+
+Run from the backend directory:
+    python benchmarks/journal_on_this_day.py
+"""
+import asyncio
+import calendar
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from uuid import UUID, uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schemas.journal import CreateJournalEntryRequest, JournalEntrySummaryResponse
+from services.journal_service import JournalService
+
+# Years of daily entries
+YEARS = 10
+
+ROUNDS = 500
+
+# Days looked up: an ordinary day, and Feb 28 of a non-leap year (which adds Feb 29)
+DAYS = (date(2026, 6, 15), date(2026, 2, 28))
+
+
+async def _fill(service: JournalService, user_id: UUID) -> int:
+    first = date(2026 - YEARS, 1, 1)
+    days = (date(2026, 1, 1) - first).days
+    for offset in range(days):
+        day = first + timedelta(days=offset)
+        await service.create_entry(user_id, CreateJournalEntryRequest(
+            title=f"Day {day}",
+            content=f"What happened on {day:%A, %B %d %Y}.",
+            date=datetime.combine(day, datetime.min.time()).replace(hour=20)
+        ))
+    return days
+
+
+def _scan(service: JournalService, user_id: UUID, day: date) -> list[JournalEntrySummaryResponse]:
+    """get_on_this_day by a full scan of the stored entries"""
+    days = {(day.month, day.day)}
+    if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+        days.add((2, 29))
+    matches = [
+        entry for entry in service.mock_entries.values()
+        if entry.user_id == user_id and (entry.date.month, entry.date.day) in days and entry.date.year < day.year
+    ]
+    matches.sort(key=lambda entry: entry.date, reverse=True)
+    return [service._summary(e) for e in matches]
+
+
+async def main():
+    service = JournalService()
+    user_id = uuid4()
+    entries = await _fill(service, user_id)
+    print(f"{entries:,} daily entries over {YEARS} years")
+
+    for day in DAYS:
+        indexed = await service.get_on_this_day(user_id, day)
+        assert indexed == _scan(service, user_id, day)
+
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            await service.get_on_this_day(user_id, day)
+        index_us = (time.perf_counter() - started) / ROUNDS * 1e6
+
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            _scan(service, user_id, day)
+        scan_us = (time.perf_counter() - started) / ROUNDS * 1e6
+
+        print(f"{day:%b %d} ({len(indexed)} matches): index {index_us:8.1f} us, scan {scan_us:8.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
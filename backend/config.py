@@ -4,6 +4,13 @@ Configuration and environment variables for Moments backend.
 from pydantic_settings import BaseSettings
 from typing import Optional
 
+# The example value from .env.example and older defaults; it is public, so
+# tokens are neither issued nor accepted while it is the key
+JWT_SECRET_KEY_PLACEHOLDER = "your-secret-key-change-in-production"
+
+# Likewise for SUPABASE_JWT_SECRET: Supabase HS256 tokens are not accepted while it is the key
+SUPABASE_JWT_SECRET_PLACEHOLDER = "your_supabase_jwt_secret"
+
 
 class Settings(BaseSettings):
     # App settings
@@ -20,22 +27,39 @@ class Settings(BaseSettings):
     # Supabase settings (TODO: Add actual credentials)
     SUPABASE_URL: Optional[str] = None
     SUPABASE_KEY: Optional[str] = None
-    SUPABASE_JWT_SECRET: Optional[str] = None
+    SUPABASE_JWT_SECRET: Optional[str] = None  # verifies Supabase HS256 tokens
+    SUPABASE_JWKS_URL: Optional[str] = None  # RS256/ES256 keys; defaults to <SUPABASE_URL>/auth/v1/.well-known/jwks.json
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
     
-    # JWT settings (stub for now)
-    JWT_SECRET_KEY: str = "your-secret-key-change-in-production"
+    # JWT settings for tokens issued by /api/auth
+    JWT_SECRET_KEY: Optional[str] = None  # required to issue tokens; e.g. python -c "import secrets; print(secrets.token_urlsafe(32))"
     JWT_ALGORITHM: str = "HS256"
+    JWT_ISSUER: str = "moments-api"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
     
+    # Emails allowed to call /api/admin endpoints
+    ADMIN_EMAILS: list = []
+    
     # File upload settings
     UPLOAD_DIR: str = "backend/storage/uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_RESUMABLE_UPLOAD_SIZE: int = 2 * 1024 * 1024 * 1024  # 2GB via /api/uploads/sessions
+    MAX_BULK_INGEST_SIZE: int = 64 * 1024 * 1024  # 64MB per bulk health request
+    MAX_HEALTH_IMPORT_SIZE: int = 4 * 1024 * 1024 * 1024  # 4GB Apple Health / Google Fit export
+    
+    # Daily summary settings
+    DAILY_SUMMARY_SOURCE_TIMEOUT: float = 2.0  # seconds a module may await before its section is degraded
     
-    # Email settings (placeholder)
+    # Email settings (daily summaries are not sent while SMTP_HOST is unset)
     SMTP_HOST: Optional[str] = None
-    SMTP_PORT: Optional[int] = None
+    SMTP_PORT: Optional[int] = None  # defaults to 465 with SMTP_USE_TLS, 587 with SMTP_STARTTLS, else 25
     SMTP_USER: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
+    SMTP_FROM: str = "Moments <no-reply@moments.local>"
+    SMTP_USE_TLS: bool = False  # implicit TLS from the first byte
+    SMTP_STARTTLS: bool = False  # upgrade a plain connection with STARTTLS
+    SMTP_POOL_SIZE: int = 8  # persistent connections, i.e. messages in flight
+    DAILY_EMAIL_HOUR: int = 21  # local hour opted-in users are sent the day's summary
     
     class Config:
         env_file = ".env"
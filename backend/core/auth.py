@@ -1,19 +1,47 @@
 """
 Authentication and authorization utilities
-Stub implementation for JWT verification with Supabase
+JWT verification for tokens issued by /api/auth (HS256, JWT_SECRET_KEY)
+and by Supabase Auth (HS256 with SUPABASE_JWT_SECRET, or RS256/ES256
+against the project's JWKS)
 """
-from typing import Optional
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Optional
 from fastapi import Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from datetime import datetime, timedelta
-from uuid import UUID, uuid4
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
 
-from config import settings
-from core.exceptions import UnauthorizedException
+import httpx
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from config import JWT_SECRET_KEY_PLACEHOLDER, SUPABASE_JWT_SECRET_PLACEHOLDER, settings
+from core.exceptions import UnauthorizedException, ForbiddenException, ServiceUnavailableException
 
 # Security scheme
 security = HTTPBearer()
 
+# Verified tokens remembered (least recently used are dropped first)
+MAX_VERIFIED_TOKENS = 10000
+
+# How long fetched signing keys are trusted before the JWKS is fetched again
+JWKS_CACHE_TTL = 3600.0
+
+# Least time between JWKS fetches, so tokens with unknown key ids cannot
+# make every request fetch it
+JWKS_MIN_REFRESH_INTERVAL = 60.0
+
+JWKS_FETCH_TIMEOUT = 5.0
+
+# Allowed clock difference (seconds) when checking exp, nbf and iat
+JWT_LEEWAY = 30
+
+SYMMETRIC_ALGORITHMS = ("HS256",)
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
 
 class CurrentUser:
     """Current authenticated user model"""
@@ -23,28 +51,210 @@ class CurrentUser:
         self.name = name
 
 
+class VerifiedTokenCache:
+    """
+    LRU of users from tokens whose signature and claims were checked
+    Keyed by the token's SHA-256, so tokens themselves are not kept, and
+    each entry is dropped once the token's exp passes.
+    """
+
+    def __init__(self, max_size: int = MAX_VERIFIED_TOKENS):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, CurrentUser]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[CurrentUser]:
+        key = hashlib.sha256(token.encode()).digest()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user
+
+    def put(self, token: str, expires_at: float, user: CurrentUser):
+        key = hashlib.sha256(token.encode()).digest()
+        self._entries[key] = (expires_at, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class JWKSCache:
+    """Signing keys from a JWKS endpoint by key id, refetched after JWKS_CACHE_TTL"""
+
+    def __init__(self):
+        self._keys: dict[str, Key] = {}
+        self._checked_at = float("-inf")  # monotonic time of the last fetch attempt
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def url() -> Optional[str]:
+        if settings.SUPABASE_JWKS_URL:
+            return settings.SUPABASE_JWKS_URL
+        if settings.SUPABASE_URL:
+            return settings.SUPABASE_URL.rstrip("/") + "/auth/v1/.well-known/jwks.json"
+        return None
+
+    def _stale(self, kid: str) -> bool:
+        age = time.monotonic() - self._checked_at
+        return age > JWKS_CACHE_TTL or (kid not in self._keys and age > JWKS_MIN_REFRESH_INTERVAL)
+
+    async def get_key(self, kid: str) -> Optional[Key]:
+        """Key for kid, fetching the JWKS when it is stale or kid is new (rate limited)"""
+        if self._stale(kid):
+            async with self._lock:
+                if self._stale(kid):
+                    await self._refresh()
+        return self._keys.get(kid)
+
+    async def _refresh(self):
+        self._checked_at = time.monotonic()
+        url = self.url()
+        if not url:
+            return
+        try:
+            async with httpx.AsyncClient(timeout=JWKS_FETCH_TIMEOUT) as client:
+                response = await client.get(url)
+                response.raise_for_status()
+                entries = response.json().get("keys", [])
+        except (httpx.HTTPError, ValueError, AttributeError):
+            return  # keep the keys we have until the next attempt
+        keys = {}
+        for entry in entries:
+            if entry.get("use", "sig") != "sig" or entry.get("alg") not in ASYMMETRIC_ALGORITHMS or "kid" not in entry:
+                continue
+            try:
+                keys[entry["kid"]] = jwk.construct(entry, entry["alg"])
+            except JWTError:
+                continue
+        self._keys = keys
+
+    def clear(self):
+        self._keys = {}
+        self._checked_at = float("-inf")
+
+
+# Singleton instances
+verified_tokens = VerifiedTokenCache()
+jwks_cache = JWKSCache()
+
+
+def _configured(key: Optional[str], placeholder: str) -> Optional[str]:
+    return None if not key or key == placeholder else key
+
+
+def secret_key() -> Optional[str]:
+    """JWT_SECRET_KEY, or None while it is unset or the public placeholder"""
+    return _configured(settings.JWT_SECRET_KEY, JWT_SECRET_KEY_PLACEHOLDER)
+
+
+def supabase_secret() -> Optional[str]:
+    """SUPABASE_JWT_SECRET, or None while it is unset or the public placeholder"""
+    return _configured(settings.SUPABASE_JWT_SECRET, SUPABASE_JWT_SECRET_PLACEHOLDER)
+
+
+def require_secret_key() -> str:
+    """JWT_SECRET_KEY for signing; 503 while it is not configured"""
+    key = secret_key()
+    if key is None:
+        raise ServiceUnavailableException(detail="JWT_SECRET_KEY is not configured")
+    return key
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create JWT access token
-    STUB: Returns a mock token for development
-    TODO: Integrate with Supabase Auth
+    Signed with JWT_SECRET_KEY and issued as JWT_ISSUER
     """
-    # STUB: Return mock token
-    return "mock-dev-token-" + str(uuid4())
+    key = require_secret_key()
+    now = datetime.now(timezone.utc)
+    claims = {
+        **data,
+        "iss": settings.JWT_ISSUER,
+        "iat": now,
+        "exp": now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)),
+    }
+    return jwt.encode(claims, key, algorithm=settings.JWT_ALGORITHM)
 
 
-def verify_token(token: str) -> dict:
+async def verify_token(token: str) -> dict[str, Any]:
     """
-    Verify JWT token
-    STUB: Returns mock payload for development
-    TODO: Integrate with Supabase JWT verification
+    Verify a JWT's signature and claims and return its payload
+    The key is chosen from the header's alg and the (still unverified)
+    iss claim; the signature is then checked against that key only, with
+    exp required. Our own and Supabase HS256 tokens are refused while
+    JWT_SECRET_KEY or SUPABASE_JWT_SECRET (respectively) is not configured.
     """
-    # STUB: Return mock payload for any token
-    return {
-        "sub": "123e4567-e89b-12d3-a456-426614174000",
-        "email": "user@example.com",
-        "name": "Mock User"
-    }
+    try:
+        header = jwt.get_unverified_header(token)
+        issuer = jwt.get_unverified_claims(token).get("iss")
+    except JWTError:
+        raise UnauthorizedException(detail="Malformed token")
+
+    algorithm = header.get("alg")
+    audience = None
+    if algorithm == settings.JWT_ALGORITHM and issuer == settings.JWT_ISSUER:
+        key = secret_key()
+    elif algorithm in SYMMETRIC_ALGORITHMS and supabase_secret():
+        key, audience = supabase_secret(), settings.SUPABASE_JWT_AUDIENCE
+    elif algorithm in ASYMMETRIC_ALGORITHMS and header.get("kid"):
+        key, audience = await jwks_cache.get_key(header["kid"]), settings.SUPABASE_JWT_AUDIENCE
+    else:
+        key = None
+    if key is None:
+        raise UnauthorizedException(detail="Token signed with an unknown key")
+
+    try:
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=audience,
+            options={"require_exp": True, "require_sub": True, "verify_aud": audience is not None, "leeway": JWT_LEEWAY}
+        )
+    except JWTError:
+        raise UnauthorizedException(detail="Invalid or expired token")
+
+
+def _user_from_payload(payload: dict[str, Any]) -> CurrentUser:
+    metadata = payload.get("user_metadata") or {}
+    try:
+        user_id = UUID(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        raise UnauthorizedException(detail="Token subject is not a user id")
+    return CurrentUser(
+        user_id=user_id,
+        email=payload.get("email") or "",
+        name=payload.get("name") or metadata.get("full_name") or metadata.get("name")
+    )
+
+
+async def authenticate(token: str) -> CurrentUser:
+    """
+    User for a bearer token
+    Signatures are checked once per token: the user is then served from
+    verified_tokens until the token's exp.
+    """
+    user = verified_tokens.get(token)
+    if user is None:
+        payload = await verify_token(token)
+        user = _user_from_payload(payload)
+        verified_tokens.put(token, float(payload["exp"]), user)
+    return user
 
 
 async def get_current_user(
@@ -52,51 +262,42 @@ async def get_current_user(
 ) -> CurrentUser:
     """
     Dependency to get current authenticated user
-    
-    STUB IMPLEMENTATION:
-    - Returns a mock user for development
-    - TODO: Implement real Supabase JWT verification
-    
+    Raises 401 unless the bearer token verifies (see verify_token)
+
     Usage in routes:
         @router.get("/")
         async def my_route(current_user: CurrentUser = Depends(get_current_user)):
             user_id = current_user.user_id
             ...
     """
-    token = credentials.credentials
-    
-    # TODO: Uncomment this for real JWT verification
-    # payload = verify_token(token)
-    # user_id = UUID(payload.get("sub"))
-    # email = payload.get("email")
-    # name = payload.get("name")
-    
-    # STUB: Return mock user for development
-    mock_user = CurrentUser(
-        user_id=UUID("123e4567-e89b-12d3-a456-426614174000"),
-        email="user@example.com",
-        name="Mock User"
-    )
-    
-    return mock_user
+    return await authenticate(credentials.credentials)
 
 
 async def get_optional_user(
     authorization: Optional[str] = Header(None)
 ) -> Optional[CurrentUser]:
     """
-    Optional authentication - returns None if no token provided
+    Optional authentication - returns None if no valid token provided
     """
     if not authorization:
         return None
-    
+
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
     try:
-        token = authorization.replace("Bearer ", "")
-        # STUB: Return mock user
-        return CurrentUser(
-            user_id=UUID("123e4567-e89b-12d3-a456-426614174000"),
-            email="user@example.com",
-            name="Mock User"
-        )
-    except Exception:
+        return await authenticate(token.strip())
+    except UnauthorizedException:
         return None
+
+
+async def get_admin_user(
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
+    """
+    Dependency for admin-only routes
+    Admins are listed in settings.ADMIN_EMAILS
+    """
+    if current_user.email not in settings.ADMIN_EMAILS:
+        raise ForbiddenException(detail="Admin access required")
+    return current_user
@@ -0,0 +1,119 @@
+"""
+Compressed in-memory text storage for the mock services
+"""
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Any, Hashable
+
+# zlib level: 6 is the usual speed/ratio balance
+COMPRESSION_LEVEL = 6
+
+# Bodies shorter than this are stored as plain UTF-8
+MIN_COMPRESS_SIZE = 64
+
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+# Preset dictionary: markup and words common in rich-text journal bodies.
+# zlib favours matches near the end of the dictionary, so the most common
+# fragments come last. Changing it makes existing blobs unreadable.
+PRESET_DICTIONARY = (
+    " because before after again still never always every would could should "
+    "really little think thought felt feel feeling today yesterday tomorrow "
+    "morning evening night week weekend friends family together about there "
+    "their which where while when what with from this that have been were "
+    "the and for you was but not are all out just like some into more time "
+    "# ## ### **  * - > [ ](http ![](https:// ``` --- "
+    "&nbsp; &amp; &quot; <hr> <br> <br/> <blockquote> </blockquote> "
+    "<img src=\" alt=\"\"> <a href=\"https:// \"> </a> <li> </li> <ul> </ul> <ol> </ol> "
+    "<h1> </h1> <h2> </h2> <h3> </h3> <em> </em> <strong> </strong> "
+    "</p>\n<p> <p> </p> "
+).encode()
+
+
+class CompressedTextStore:
+    """
+    Key -> text store holding zlib-compressed UTF-8 blobs
+    Reads decompress on demand through a small LRU of hot bodies bounded by
+    cache_bytes. Sizes are tracked per group (e.g. per user) for reporting.
+    """
+
+    def __init__(self, cache_bytes: int = 8 * 1024 * 1024):
+        self._blobs: dict[Hashable, bytes] = {}
+        self._groups: dict[Hashable, Any] = {}
+        self._sizes: dict[Hashable, int] = {}  # uncompressed UTF-8 bytes
+        self._totals: dict[Any, list[int]] = defaultdict(lambda: [0, 0, 0])  # count, raw, stored
+        self._cache: OrderedDict[Hashable, str] = OrderedDict()
+        self._cache_size = 0
+        self.cache_bytes = cache_bytes
+        self.hits = self.misses = 0
+
+    def put(self, key: Hashable, text: str, group: Any = None):
+        """Store (or replace) the text for key"""
+        self.delete(key)
+        raw = text.encode()
+        if len(raw) < MIN_COMPRESS_SIZE:
+            blob = _RAW + raw
+        else:
+            compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=PRESET_DICTIONARY)
+            blob = _ZLIB + compressor.compress(raw) + compressor.flush()
+        self._blobs[key] = blob
+        self._groups[key] = group
+        self._sizes[key] = len(raw)
+        totals = self._totals[group]
+        totals[0] += 1
+        totals[1] += len(raw)
+        totals[2] += len(blob)
+
+    def get(self, key: Hashable) -> str:
+        """Text for key, decompressing on a cache miss"""
+        text = self._cache.get(key)
+        if text is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return text
+        self.misses += 1
+        blob = self._blobs[key]
+        if blob[:1] == _ZLIB:
+            decompressor = zlib.decompressobj(zdict=PRESET_DICTIONARY)
+            text = (decompressor.decompress(blob[1:]) + decompressor.flush()).decode()
+        else:
+            text = blob[1:].decode()
+        self._remember(key, text)
+        return text
+
+    def _remember(self, key: Hashable, text: str):
+        size = self._sizes[key]
+        if size > self.cache_bytes:
+            return
+        self._cache[key] = text
+        self._cache_size += size
+        while self._cache_size > self.cache_bytes:
+            old_key, _ = self._cache.popitem(last=False)
+            self._cache_size -= self._sizes[old_key]
+
+    def delete(self, key: Hashable):
+        """Drop key if present"""
+        blob = self._blobs.pop(key, None)
+        if blob is None:
+            return
+        if self._cache.pop(key, None) is not None:
+            self._cache_size -= self._sizes[key]
+        size = self._sizes.pop(key)
+        totals = self._totals[self._groups.pop(key)]
+        totals[0] -= 1
+        totals[1] -= size
+        totals[2] -= len(blob)
+
+    def group_stats(self) -> dict[Any, tuple[int, int, int]]:
+        """{group: (items, raw bytes, stored bytes)} for non-empty groups"""
+        return {group: tuple(totals) for group, totals in self._totals.items() if totals[0]}
+
+    def cache_stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._cache),
+            "bytes": self._cache_size,
+            "capacity_bytes": self.cache_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,22 @@
+"""
+Datetime convention shared by the schemas and services
+Stored datetimes are naive server-local time, the same as datetime.now()
+that they are compared with. Timezone-aware values from clients (e.g. a
+JavaScript toISOString() "...Z") are converted at the boundary, so naive
+and aware values never meet in an index or a comparison.
+"""
+from datetime import datetime
+from typing import Annotated, Optional
+
+from pydantic import AfterValidator
+
+
+def to_local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """value in server-local time without tzinfo (naive values pass through)"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+# A datetime field or query parameter normalized with to_local_naive
+LocalDatetime = Annotated[datetime, AfterValidator(to_local_naive)]
@@ -0,0 +1,33 @@
+"""
+In-process change notifications between the mock services
+"""
+from collections import defaultdict
+from typing import Any, Callable
+
+
+class EventBus:
+    """
+    Synchronous publish/subscribe by topic name
+    Handlers run inline in the publishing call, so they must be cheap
+    (e.g. cache invalidation) and must not raise.
+    """
+
+    def __init__(self):
+        self._handlers: dict[str, list[Callable[..., Any]]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Callable[..., Any]):
+        """Call handler(**payload) for every event published on topic"""
+        self._handlers[topic].append(handler)
+
+    def publish(self, topic: str, **payload: Any):
+        for handler in self._handlers.get(topic, ()):
+            handler(**payload)
+
+
+# Topics published by the services
+HEALTH_CHANGED = "health.changed"  # user_id, day: the entry for that date changed
+JOURNAL_CHANGED = "journal.changed"  # user_id, day: an entry written that date changed
+COLLEGE_CHANGED = "college.changed"  # user_id, due: a task due then (or None) changed
+
+# Singleton instance
+event_bus = EventBus()
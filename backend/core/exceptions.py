@@ -38,3 +38,15 @@ class ConflictException(MomentsException):
     """Raised when resource already exists"""
     def __init__(self, detail: str = "Resource already exists"):
         super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+class PayloadTooLargeException(MomentsException):
+    """Raised when a request body exceeds the allowed size"""
+    def __init__(self, detail: str = "Request body too large"):
+        super().__init__(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+
+class ServiceUnavailableException(MomentsException):
+    """Raised when a dependency such as the mail server cannot serve the request"""
+    def __init__(self, detail: str = "Service unavailable"):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
@@ -0,0 +1,59 @@
+"""
+In-memory ordered indexes for the mock services
+"""
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Iterator, Optional
+
+
+def _sort_key(entry: tuple) -> Any:
+    return entry[0]
+
+
+class SortedIndex:
+    """
+    Ordered list of (sort_key, item_id) pairs
+    Range lookups use binary search, so reads cost O(log n + k)
+    instead of a full scan and sort per request.
+    """
+
+    def __init__(self):
+        self._entries: list[tuple[Any, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Any, item_id: Any):
+        """Insert an item at its sorted position"""
+        insort(self._entries, (key, item_id))
+
+    def remove(self, key: Any, item_id: Any):
+        """Remove an item previously added with the same key"""
+        i = bisect_left(self._entries, (key, item_id))
+        if i < len(self._entries) and self._entries[i] == (key, item_id):
+            del self._entries[i]
+
+    def bounds(self, low: Optional[Any] = None, high: Optional[Any] = None) -> tuple[int, int]:
+        """Positions [start, stop) of entries with low <= key <= high"""
+        start = 0 if low is None else bisect_left(self._entries, low, key=_sort_key)
+        stop = len(self._entries) if high is None else bisect_right(self._entries, high, key=_sort_key)
+        return start, max(start, stop)
+
+    def position(self, key: Any, item_id: Any, after: bool = False) -> int:
+        """Position of (key, item_id), or just past it when after is set"""
+        if after:
+            return bisect_right(self._entries, (key, item_id))
+        return bisect_left(self._entries, (key, item_id))
+
+    def entries(self, start: int = 0, stop: Optional[int] = None) -> list[tuple[Any, Any]]:
+        """(key, item_id) pairs between two positions, in key order"""
+        return self._entries[start:stop]
+
+    def iter_entries(self, start: int = 0, stop: Optional[int] = None) -> Iterator[tuple[Any, Any]]:
+        """Lazily yield (key, item_id) pairs between two positions"""
+        stop = len(self._entries) if stop is None else min(stop, len(self._entries))
+        for i in range(start, stop):
+            yield self._entries[i]
+
+    def ids(self, start: int = 0, stop: Optional[int] = None) -> list[Any]:
+        """Item ids between two positions, in key order"""
+        return [item_id for _, item_id in self._entries[start:stop]]
@@ -0,0 +1,141 @@
+"""
+Cursor (keyset) pagination helpers
+Cursors are opaque base64 tokens encoding the sort key and id of the last
+item on a page, so the next page seeks straight to it instead of skipping
+(page - 1) * limit rows.
+"""
+import base64
+import heapq
+import json
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Optional
+from uuid import UUID
+
+from core.exceptions import BadRequestException
+from core.indexing import SortedIndex
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"u": str(value)}
+    if isinstance(value, tuple):
+        return {"t": [_encode_value(v) for v in value]}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "u" in value:
+            return UUID(value["u"])
+        if "t" in value:
+            return tuple(_decode_value(v) for v in value["t"])
+    return value
+
+
+def encode_cursor(key: Any, item_id: Any) -> str:
+    """Encode a sort key and item id as an opaque cursor"""
+    payload = json.dumps([_encode_value(key), _encode_value(item_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _has_type(value: Any, key_type: Any) -> bool:
+    """Whether a decoded value has the shape of key_type (a tuple of types for tuple keys)"""
+    if isinstance(key_type, tuple):
+        return (
+            isinstance(value, tuple) and len(value) == len(key_type)
+            and all(_has_type(v, t) for v, t in zip(value, key_type))
+        )
+    if key_type is datetime:
+        # Stored datetimes are naive (see core.datetimes)
+        return isinstance(value, datetime) and value.tzinfo is None
+    return type(value) is key_type
+
+
+def decode_cursor(cursor: str, key_type: Any) -> tuple[Any, Any]:
+    """
+    Decode a cursor produced by encode_cursor
+    The key must have the index's key_type and the item id must be a UUID,
+    so tampered cursors and ones from another endpoint are rejected.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key, item_id = _decode_value(key), _decode_value(item_id)
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise BadRequestException(detail="Invalid cursor")
+    if not _has_type(key, key_type) or not isinstance(item_id, UUID):
+        raise BadRequestException(detail="Invalid cursor")
+    return key, item_id
+
+
+def paginate_index(
+    index: SortedIndex, start: int, stop: int, page: int, limit: int,
+    cursor: Optional[str] = None, descending: bool = False, key_type: Any = datetime
+) -> tuple[list[tuple[Any, Any]], Optional[str]]:
+    """
+    Slice one page of (key, item_id) pairs from index positions [start, stop)
+    With a cursor the page begins right after the cursor's entry;
+    otherwise it is offset by page number. Returns the page and next cursor.
+    key_type is the type of the index's keys (see decode_cursor).
+    """
+    if cursor is not None:
+        key, item_id = decode_cursor(cursor, key_type)
+        if descending:
+            stop = min(stop, index.position(key, item_id))
+        else:
+            start = max(start, index.position(key, item_id, after=True))
+        offset = 0
+    else:
+        offset = (page - 1) * limit
+    
+    if descending:
+        page_stop = max(start, stop - offset)
+        page_start = max(start, page_stop - limit)
+        entries = index.entries(page_start, page_stop)[::-1]
+        has_more = page_start > start
+    else:
+        page_start = min(stop, start + offset)
+        page_stop = min(stop, page_start + limit)
+        entries = index.entries(page_start, page_stop)
+        has_more = page_stop < stop
+    
+    next_cursor = encode_cursor(*entries[-1]) if entries and has_more else None
+    return entries, next_cursor
+
+
+def paginate_merged(
+    segments: list[tuple[SortedIndex, int, int]], page: int, limit: int,
+    cursor: Optional[str] = None, key_type: Any = datetime
+) -> tuple[list[tuple[Any, Any]], Optional[str]]:
+    """
+    Like paginate_index over several index ranges sharing one key order
+    Each (index, start, stop) segment is range-read and the segments are
+    merged lazily, so a page costs O(limit * log segments) after the seeks.
+    """
+    segments = [s for s in segments if s[1] < s[2]]
+    if len(segments) <= 1:
+        index, start, stop = segments[0] if segments else (SortedIndex(), 0, 0)
+        return paginate_index(index, start, stop, page, limit, cursor, key_type=key_type)
+    
+    if cursor is not None:
+        key, item_id = decode_cursor(cursor, key_type)
+        segments = [(index, max(start, index.position(key, item_id, after=True)), stop) for index, start, stop in segments]
+        offset = 0
+    else:
+        offset = (page - 1) * limit
+    
+    merged = heapq.merge(*(index.iter_entries(start, stop) for index, start, stop in segments))
+    entries = list(islice(merged, offset, offset + limit + 1))
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    next_cursor = encode_cursor(*entries[-1]) if entries and has_more else None
+    return entries, next_cursor
@@ -30,8 +30,9 @@ class PaginatedResponse(BaseModel, Generic[T]):
     data: list[T]
     page: int
     limit: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None  # omitted when include_total=false
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to continue
     
     class Config:
         json_schema_extra = {
@@ -42,7 +43,8 @@ class PaginatedResponse(BaseModel, Generic[T]):
                 "page": 1,
                 "limit": 10,
                 "total": 100,
-                "total_pages": 10
+                "total_pages": 10,
+                "next_cursor": "W3siZHQiOiIyMDI0LTAxLTE1VDE0OjAwOjAwIn0seyJ1IjoiLi4uIn1d"
             }
         }
 
@@ -0,0 +1,112 @@
+"""
+In-process deadline scheduling for the mock services
+"""
+import asyncio
+import heapq
+import time
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+# Longest single sleep, so clock jumps are noticed reasonably soon
+MAX_SLEEP = 60.0
+
+# Most keys handed to on_due per call before yielding to the event loop
+DUE_BATCH_SIZE = 1000
+
+
+class DeadlineScheduler:
+    """
+    Min-heap of (deadline, key) that calls on_due(keys) once deadlines pass
+    Rescheduling or cancelling a key leaves its old heap entry in place;
+    stale entries are skipped when popped and the heap is rebuilt once
+    they outnumber live ones, so every operation is O(log n) amortized.
+    The runner sleeps until the earliest deadline instead of ticking.
+    Deadlines are POSIX timestamps.
+    """
+
+    def __init__(self, on_due: Callable[[list[Any]], None]):
+        self.on_due = on_due
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._deadlines: dict[Hashable, float] = {}
+        self._counter = 0  # tie-breaker so keys are never compared
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Set (or move) the deadline of key"""
+        if self._deadlines.get(key) == deadline:
+            return
+        self._deadlines[key] = deadline
+        self._counter += 1
+        if not self._heap or deadline < self._heap[0][0]:
+            self._wakeup.set()
+        heapq.heappush(self._heap, (deadline, self._counter, key))
+        self._compact()
+
+    def cancel(self, key: Hashable):
+        """Forget key's deadline if it has one"""
+        if self._deadlines.pop(key, None) is not None:
+            self._compact()
+
+    def rebuild(self, deadlines: Iterable[tuple[Hashable, float]]):
+        """Replace every deadline at once (O(n) heapify)"""
+        self._deadlines = dict(deadlines)
+        self._heap = [(deadline, i, key) for i, (key, deadline) in enumerate(self._deadlines.items())]
+        self._counter = len(self._heap)
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def _compact(self):
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self.rebuild(list(self._deadlines.items()))
+
+    def pop_due(self, now: float, limit: Optional[int] = None) -> list[Any]:
+        """Remove and return (up to limit) keys whose deadline is at or before now"""
+        due = []
+        while self._heap and self._heap[0][0] <= now and (limit is None or len(due) < limit):
+            deadline, _, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == deadline:
+                del self._deadlines[key]
+                due.append(key)
+        return due
+
+    def _next_deadline(self) -> Optional[float]:
+        while self._heap and self._deadlines.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    async def _run(self):
+        while True:
+            due = self.pop_due(time.time(), DUE_BATCH_SIZE)
+            if due:
+                self.on_due(due)
+            if len(due) == DUE_BATCH_SIZE:
+                await asyncio.sleep(0)
+                continue
+            self._wakeup.clear()
+            deadline = self._next_deadline()
+            timeout = MAX_SLEEP if deadline is None else min(MAX_SLEEP, max(0.0, deadline - time.time()))
+            # A timer setting the event rather than wait_for, which can swallow
+            # cancellation when the event fires at the same moment
+            timer = asyncio.get_running_loop().call_later(timeout, self._wakeup.set)
+            try:
+                await self._wakeup.wait()
+            finally:
+                timer.cancel()
+
+    def start(self):
+        """Start the runner on the current event loop"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,334 @@
+"""
+In-memory full-text search for the mock services
+"""
+import html
+import re
+from bisect import bisect_left, insort
+from typing import Any, Iterable
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+_TAG = re.compile(r"<[^>]+>")
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+_SPACES = re.compile(r"\s+")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Most vocabulary terms a prefix query expands to
+MAX_PREFIX_TERMS = 64
+
+# Bits of a position key holding the token position within its document
+_POSITION_BITS = 24
+
+
+def plain_text(text: str) -> str:
+    """Strip HTML tags and entities so rich text indexes like plain text"""
+    return _SPACES.sub(" ", html.unescape(_TAG.sub(" ", text))).strip()
+
+
+def fold_case(text: str) -> str:
+    """
+    text.lower() without changing its length, so offsets into the result
+    are offsets into text ("İ" lowers to two characters; it becomes "i")
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(char.lower()[0] for char in text)
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(fold_case(text))
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """array with room for at least size items (capacity doubles)"""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array), 8), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _contains(sorted_values: np.ndarray, wanted: np.ndarray) -> np.ndarray:
+    """Mask of wanted values present in a sorted array"""
+    if not len(sorted_values):
+        return np.zeros(len(wanted), dtype=bool)
+    positions = np.searchsorted(sorted_values, wanted)
+    positions[positions == len(sorted_values)] = 0
+    return sorted_values[positions] == wanted
+
+
+class Query:
+    """
+    Parsed search query: every clause must match
+    Clauses are terms, "quoted phrases" and prefix* terms.
+    """
+
+    def __init__(self, text: str):
+        self.terms: list[str] = []
+        self.phrases: list[list[str]] = []
+        self.prefixes: list[str] = []
+        for quoted, word in _QUERY.findall(text):
+            tokens = tokenize(quoted or word)
+            if not tokens:
+                continue
+            if word.endswith("*") and len(tokens) == 1:
+                self.prefixes.append(tokens[0])
+            elif len(tokens) == 1:
+                self.terms.append(tokens[0])
+            else:
+                self.phrases.append(tokens)
+
+    def __bool__(self) -> bool:
+        return bool(self.terms or self.phrases or self.prefixes)
+
+
+class _Postings:
+    """
+    Append-only postings of one term
+    Document numbers only increase, so docs and keys stay sorted; removed
+    documents are skipped via the index's alive mask until compaction.
+    """
+
+    def __init__(self):
+        self.docs = np.zeros(0, dtype=np.int64)
+        self.frequencies = np.zeros(0, dtype=np.float64)
+        self.keys = np.zeros(0, dtype=np.int64)  # doc << _POSITION_BITS | position
+        self.size = self.key_count = self.dead = 0
+
+    @property
+    def live(self) -> int:
+        return self.size - self.dead
+
+    def append(self, doc: int, frequency: float, positions: list[int]):
+        self.docs = _grow(self.docs, self.size + 1)
+        self.frequencies = _grow(self.frequencies, self.size + 1)
+        self.docs[self.size] = doc
+        self.frequencies[self.size] = frequency
+        self.size += 1
+        end = self.key_count + len(positions)
+        self.keys = _grow(self.keys, end)
+        self.keys[self.key_count:end] = np.array(positions, dtype=np.int64) | (doc << _POSITION_BITS)
+        self.key_count = end
+
+    def compact(self, alive: np.ndarray):
+        """Drop entries of removed documents"""
+        keep = alive[self.docs[:self.size]]
+        self.docs = self.docs[:self.size][keep]
+        self.frequencies = self.frequencies[:self.size][keep]
+        keys = self.keys[:self.key_count]
+        self.keys = keys[alive[keys >> _POSITION_BITS]]
+        self.size, self.key_count, self.dead = len(self.docs), len(self.keys), 0
+
+    def renumber(self, alive: np.ndarray, numbers: np.ndarray):
+        """Drop entries of removed documents and move the rest to new numbers"""
+        self.compact(alive)
+        self.docs = numbers[self.docs]
+        keys = self.keys
+        self.keys = (numbers[keys >> _POSITION_BITS] << _POSITION_BITS) | (keys & ((1 << _POSITION_BITS) - 1))
+
+    def arrays(self, alive: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(docs, frequencies) of live documents"""
+        docs = self.docs[:self.size]
+        if not self.dead:
+            return docs, self.frequencies[:self.size]
+        keep = alive[docs]
+        return docs[keep], self.frequencies[:self.size][keep]
+
+
+class InvertedIndex:
+    """
+    Positional inverted index with BM25 ranking
+    Documents are lists of (text, boost) fields and get dense internal
+    numbers, so matching and scoring are NumPy operations over postings
+    arrays. Fields are separated by a position gap so phrases never match
+    across them. Re-adding a document gives it a new number; once removed
+    numbers outnumber live ones, live documents are renumbered densely.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, _Postings] = {}
+        self._vocabulary: list[str] = []  # sorted, for prefix queries
+        self._numbers: dict[Any, int] = {}
+        self._ids: list[Any] = []
+        self._terms: dict[int, list[str]] = {}
+        self._lengths = np.zeros(0, dtype=np.float64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def add(self, doc_id: Any, fields: Iterable[tuple[str, float]]):
+        """Index a document (replacing any previous version)"""
+        self.remove(doc_id)
+        frequencies: dict[str, float] = {}
+        positions: dict[str, list[int]] = {}
+        position = 0
+        for text, boost in fields:
+            for token in tokenize(text):
+                frequencies[token] = frequencies.get(token, 0.0) + boost
+                positions.setdefault(token, []).append(position)
+                position += 1
+            position += 1
+
+        doc = len(self._ids)
+        self._ids.append(doc_id)
+        self._numbers[doc_id] = doc
+        self._terms[doc] = list(frequencies)
+        length = sum(frequencies.values())
+        self._lengths = _grow(self._lengths, doc + 1)
+        self._alive = _grow(self._alive, doc + 1)
+        self._lengths[doc] = length
+        self._alive[doc] = True
+        self._total_length += length
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+                insort(self._vocabulary, term)
+            postings.append(doc, frequency, positions[term])
+
+    def remove(self, doc_id: Any):
+        """Drop a document from the index"""
+        doc = self._numbers.pop(doc_id, None)
+        if doc is None:
+            return
+        self._alive[doc] = False
+        self._ids[doc] = None
+        self._total_length -= self._lengths[doc]
+        for term in self._terms.pop(doc):
+            postings = self._postings[term]
+            postings.dead += 1
+            if not postings.live:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+            elif postings.dead * 2 > postings.size:
+                postings.compact(self._alive)
+        if len(self._ids) - len(self._numbers) > len(self._numbers):
+            self._renumber()
+
+    def _renumber(self):
+        """
+        Give live documents the numbers 0..n-1 (in their current order, so
+        postings stay sorted) and shrink the per-document arrays to match
+        """
+        count = len(self._ids)
+        alive = self._alive[:count]
+        numbers = np.cumsum(alive) - 1
+        for postings in self._postings.values():
+            postings.renumber(alive, numbers)
+        self._terms = {int(numbers[doc]): terms for doc, terms in self._terms.items()}
+        self._ids = [doc_id for doc_id in self._ids if doc_id is not None]
+        self._numbers = {doc_id: doc for doc, doc_id in enumerate(self._ids)}
+        self._lengths = self._lengths[:count][alive]
+        self._alive = np.ones(len(self._ids), dtype=bool)
+
+    def expand(self, prefix: str) -> list[str]:
+        """Vocabulary terms starting with prefix (at most MAX_PREFIX_TERMS)"""
+        start = bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _mask(self, docs: np.ndarray) -> np.ndarray:
+        """Dense membership mask over all document numbers"""
+        mask = np.zeros(len(self._ids), dtype=bool)
+        mask[docs] = True
+        return mask
+
+    def _phrase_docs(self, tokens: list[str], candidates: np.ndarray) -> np.ndarray:
+        """Documents in the candidates mask with tokens at consecutive positions"""
+        starts = None
+        for offset, token in enumerate(tokens):
+            postings = self._postings[token]
+            keys = postings.keys[:postings.key_count]
+            keys = keys[candidates[keys >> _POSITION_BITS]] - offset
+            starts = keys if starts is None else starts[_contains(keys, starts)]
+            if not len(starts):
+                break
+        return np.unique(starts >> _POSITION_BITS)
+
+    def search(self, query: Query, top: int) -> tuple[list[tuple[Any, float]], int, list[str]]:
+        """
+        Best `top` documents matching every clause, with BM25 scores
+        Returns (hits, total matches, vocabulary terms that matched).
+        """
+        clauses = [[term] for term in query.terms]
+        clauses += [self.expand(prefix) for prefix in query.prefixes]
+        clauses += [[token] for tokens in query.phrases for token in tokens]
+        if not clauses or any(not any(term in self._postings for term in c) for c in clauses):
+            return [], 0, []
+
+        arrays = {
+            term: self._postings[term].arrays(self._alive)
+            for clause in clauses for term in clause if term in self._postings
+        }
+        clause_docs = []
+        for clause in clauses:
+            docs = [arrays[term][0] for term in clause if term in arrays]
+            clause_docs.append(docs[0] if len(docs) == 1 else np.flatnonzero(self._mask(np.concatenate(docs))))
+        clause_docs.sort(key=len)
+        candidates = clause_docs[0]
+        for docs in clause_docs[1:]:
+            candidates = candidates[self._mask(docs)[candidates]]
+        for tokens in query.phrases:
+            if not len(candidates):
+                break
+            candidates = self._phrase_docs(tokens, self._mask(candidates))
+        if not len(candidates):
+            return [], 0, []
+
+        scores = self._score(arrays, candidates)
+        top = min(top, len(candidates))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        hits = [(self._ids[candidates[i]], float(scores[i])) for i in best]
+        return hits, len(candidates), list(arrays)
+
+    def _score(self, arrays: dict[str, tuple[np.ndarray, np.ndarray]], candidates: np.ndarray) -> np.ndarray:
+        count = len(self._numbers)
+        average_length = self._total_length / count if count else 1.0
+        norms = K1 * (1 - B + B * self._lengths[candidates] / average_length)
+        scores = np.zeros(len(candidates))
+        dense = np.zeros(len(self._ids))
+        for docs, frequencies in arrays.values():
+            idf = np.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            dense[docs] = frequencies
+            tf = dense[candidates]
+            dense[docs] = 0.0
+            scores += idf * tf * (K1 + 1) / (tf + norms)
+        return scores
+
+
+def highlight(text: str, terms: list[str], width: int = 160) -> str:
+    """
+    Excerpt of plain text around the first matching term, with matches
+    wrapped in <mark>; falls back to the start of the text
+    """
+    text_lower = fold_case(text)
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\b") if terms else None
+    match = pattern.search(text_lower) if pattern else None
+    start = max(0, match.start() - width // 3) if match else 0
+    if start:
+        start = text.find(" ", start) + 1 or start
+    end = min(len(text), start + width)
+    space = text.rfind(" ", start, end)
+    if end < len(text) and space > start:
+        end = space
+
+    parts, position = [], start
+    if pattern:
+        for found in pattern.finditer(text_lower, start, end):
+            parts.append(html.escape(text[position:found.start()]))
+            parts.append(f"<mark>{html.escape(text[found.start():found.end()])}</mark>")
+            position = found.end()
+    parts.append(html.escape(text[position:end]))
+    return ("…" if start else "") + "".join(parts) + ("…" if end < len(text) else "")
@@ -0,0 +1,259 @@
+"""
+Pooled SMTP delivery for outgoing mail
+"""
+import asyncio
+import base64
+import random
+import re
+import ssl
+import time
+from typing import Optional
+
+# Seconds to wait for any single server reply
+SMTP_TIMEOUT = 30.0
+
+# Delivery attempts per message before it counts as failed
+MAX_ATTEMPTS = 4
+
+# Delay before the first retry; doubled for each later one, with jitter
+RETRY_BACKOFF = 1.0
+
+# Idle connections older than this are closed instead of reused
+IDLE_TIMEOUT = 60.0
+
+# Messages sent over one connection before it is replaced
+MAX_MESSAGES_PER_CONNECTION = 1000
+
+_LEADING_DOT = re.compile(rb"(?m)^\.")
+_LINE_ENDING = re.compile(rb"\r\n|\r|\n")
+
+
+class SMTPReplyError(Exception):
+    """The server refused a command; 4xx replies are worth retrying"""
+
+    def __init__(self, code: int, text: str):
+        super().__init__(f"{code} {text}")
+        self.code = code
+        self.text = text
+
+    @property
+    def transient(self) -> bool:
+        return 400 <= self.code < 500
+
+
+def _data_block(message: bytes) -> bytes:
+    """Message body for DATA: CRLF line endings, dot-stuffed, terminated"""
+    message = _LEADING_DOT.sub(b"..", _LINE_ENDING.sub(b"\r\n", message))
+    if not message.endswith(b"\r\n"):
+        message += b"\r\n"
+    return message + b".\r\n"
+
+
+class _Connection:
+    """One ESMTP session; replies to pipelined commands are read in order"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: float):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.extensions: dict[str, str] = {}
+        self.sent = 0
+        self.idle_since = time.monotonic()
+
+    async def reply(self) -> tuple[int, str]:
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line.endswith(b"\n"):
+                raise ConnectionError("Connection closed by the SMTP server")
+            lines.append(line[4:].strip().decode("utf-8", "replace"))
+            if line[3:4] != b"-":
+                return int(line[:3]), "\n".join(lines)
+
+    async def command(self, line: str, expect: tuple[int, ...] = (250,)) -> str:
+        self.writer.write(line.encode() + b"\r\n")
+        code, text = await self.reply()
+        if code not in expect:
+            raise SMTPReplyError(code, text)
+        return text
+
+    async def ehlo(self, hostname: str):
+        text = await self.command(f"EHLO {hostname}")
+        self.extensions = {}
+        for line in text.splitlines()[1:]:
+            keyword, _, params = line.partition(" ")
+            self.extensions[keyword.upper()] = params
+
+    async def login(self, username: str, password: str):
+        methods = self.extensions.get("AUTH", "").upper().split()
+        if "PLAIN" in methods or "LOGIN" not in methods:
+            token = base64.b64encode(f"\0{username}\0{password}".encode()).decode()
+            await self.command(f"AUTH PLAIN {token}", expect=(235,))
+        else:
+            await self.command("AUTH LOGIN", expect=(334,))
+            await self.command(base64.b64encode(username.encode()).decode(), expect=(334,))
+            await self.command(base64.b64encode(password.encode()).decode(), expect=(235,))
+
+    async def send(self, sender: str, recipient: str, message: bytes):
+        """
+        One mail transaction; with PIPELINING the envelope and DATA go out
+        in a single write and their replies are read back together
+        """
+        size = f" SIZE={len(message)}" if "SIZE" in self.extensions else ""
+        envelope = [f"MAIL FROM:<{sender}>{size}", f"RCPT TO:<{recipient}>", "DATA"]
+        expected = [250, 250, 354]
+        if "PIPELINING" in self.extensions:
+            self.writer.write("".join(f"{line}\r\n" for line in envelope).encode())
+            replies = [await self.reply() for _ in envelope]
+        else:
+            replies = []
+            for line, code in zip(envelope, expected):
+                self.writer.write(line.encode() + b"\r\n")
+                replies.append(await self.reply())
+                if replies[-1][0] != code:
+                    break
+        refused = next(((code, text) for (code, text), want in zip(replies, expected) if code != want), None)
+        if refused is not None:
+            if replies[-1][0] == 354:
+                # DATA was accepted although the envelope was not: send an empty body
+                self.writer.write(b".\r\n")
+                await self.reply()
+            await self.command("RSET")
+            raise SMTPReplyError(*refused)
+
+        self.writer.write(_data_block(message))
+        code, text = await self.reply()
+        if code != 250:
+            raise SMTPReplyError(code, text)
+        self.sent += 1
+
+    def close(self):
+        if not self.writer.is_closing():
+            self.writer.write(b"QUIT\r\n")  # flushed before the transport closes
+        self.writer.close()
+
+
+class SMTPPool:
+    """
+    Bounded pool of persistent SMTP connections
+    At most `size` messages are in flight at once, each over a connection
+    of its own. Connections are opened on demand and kept for reuse;
+    transient failures (4xx replies, dropped connections, timeouts) are
+    retried with exponential backoff on a fresh connection.
+    """
+
+    def __init__(
+        self, host: str, port: int, size: int,
+        username: Optional[str] = None, password: Optional[str] = None,
+        use_tls: bool = False, start_tls: bool = False,
+        local_hostname: str = "localhost", timeout: float = SMTP_TIMEOUT
+    ):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.local_hostname = local_hostname
+        self.timeout = timeout
+        self._idle: list[_Connection] = []  # most recently used last
+        self._slots = asyncio.Semaphore(size)
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.connections_opened = 0
+        self.in_use = 0
+
+    async def _open(self) -> _Connection:
+        context = ssl.create_default_context() if self.use_tls or self.start_tls else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context if self.use_tls else None),
+            self.timeout
+        )
+        connection = _Connection(reader, writer, self.timeout)
+        try:
+            code, text = await connection.reply()
+            if code != 220:
+                raise SMTPReplyError(code, text)
+            await connection.ehlo(self.local_hostname)
+            if self.start_tls:
+                await connection.command("STARTTLS", expect=(220,))
+                await writer.start_tls(context, server_hostname=self.host)
+                await connection.ehlo(self.local_hostname)
+            if self.username:
+                await connection.login(self.username, self.password or "")
+        except BaseException:
+            connection.close()
+            raise
+        self.connections_opened += 1
+        return connection
+
+    async def _acquire(self) -> _Connection:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                connection = self._idle.pop()
+                if time.monotonic() - connection.idle_since < IDLE_TIMEOUT and not connection.writer.is_closing():
+                    break
+                connection.close()
+            else:
+                connection = await self._open()
+        except BaseException:
+            self._slots.release()
+            raise
+        self.in_use += 1
+        return connection
+
+    def _release(self, connection: _Connection, reusable: bool):
+        self.in_use -= 1
+        if reusable and connection.sent < MAX_MESSAGES_PER_CONNECTION:
+            connection.idle_since = time.monotonic()
+            self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    async def send(self, sender: str, recipient: str, message: bytes):
+        """Deliver one message, retrying transient failures; raises once attempts run out"""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                connection = await self._acquire()
+                reusable = False
+                try:
+                    await connection.send(sender, recipient, message)
+                    reusable = True
+                except SMTPReplyError as e:
+                    # The envelope was reset, so the session is still usable unless closing
+                    reusable = e.code != 421
+                    raise
+                finally:
+                    self._release(connection, reusable)
+                self.sent += 1
+                return
+            except SMTPReplyError as e:
+                if not e.transient or attempt == MAX_ATTEMPTS:
+                    self.failed += 1
+                    raise
+            except (OSError, EOFError, asyncio.TimeoutError):
+                if attempt == MAX_ATTEMPTS:
+                    self.failed += 1
+                    raise
+            self.retries += 1
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    def close(self):
+        """Close idle connections; ones in use are closed when released"""
+        while self._idle:
+            self._idle.pop().close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "idle": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+        }
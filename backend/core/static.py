@@ -0,0 +1,161 @@
+"""
+Static file serving for content-addressed uploads
+"""
+import os
+import re
+from typing import Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+# Files named by their content hash never change, so clients keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Anything else may be replaced in place, so clients revalidate
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Bytes per read when the server cannot send the file itself
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Extensions shown in the browser; any other file (HTML, SVG, scripts...)
+# is sent as a download, so uploads never run as pages on this origin
+INLINE_EXTENSIONS = frozenset({
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".bmp", ".heic", ".heif",
+    ".mp4", ".m4v", ".mov", ".webm", ".mp3", ".m4a", ".aac", ".oga", ".ogg", ".opus", ".wav", ".flac",
+    ".pdf", ".txt",
+})
+
+# <sha256>[.<variant>].<ext>
+_CONTENT_NAME = re.compile(r"^[0-9a-f]{64}(?:\.[a-z0-9]{1,10})+$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    (offset, count) of a single `bytes=` range, or None to send the whole
+    file (malformed or multi-range headers); ValueError if unsatisfiable
+    """
+    match = _RANGE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        count = min(int(last), size)
+        if not count:
+            raise ValueError("Empty suffix range")
+        return size - count, count
+    start = int(first)
+    if start >= size:
+        raise ValueError("Range starts past the end of the file")
+    end = min(int(last), size - 1) if last else size - 1
+    if end < start:
+        return None
+    return start, end - start + 1
+
+
+class MediaFileResponse(FileResponse):
+    """
+    File response for a byte range (the whole file by default)
+    The body is handed to the server when it supports the zero-copy or
+    path-send ASGI extensions, and otherwise streamed in chunks, so
+    large media is never read into memory.
+    """
+
+    def __init__(self, path: str, stat_result: os.stat_result, headers: Optional[dict] = None):
+        super().__init__(path, stat_result=stat_result, headers=headers)
+        self.offset = 0
+        self.count = stat_result.st_size
+
+    def set_range(self, offset: int, count: int):
+        size = self.stat_result.st_size
+        self.status_code = 206
+        self.offset, self.count = offset, count
+        self.headers["content-length"] = str(count)
+        self.headers["content-range"] = f"bytes {offset}-{offset + count - 1}/{size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope["method"].upper() == "HEAD" or not self.count:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+            try:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            finally:
+                file.close()
+        elif "http.response.pathsend" in extensions and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+        else:
+            await self._stream(send)
+
+    async def _stream(self, send: Send):
+        remaining = self.count
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.offset)
+            while remaining:
+                chunk = await file.read(min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break  # truncated underneath us; end the body early
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
+        if remaining:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class ContentAddressedFiles(StaticFiles):
+    """
+    StaticFiles for a content-addressed directory
+    Files named by their SHA-256 get the hash as a strong ETag and an
+    immutable cache policy. Range requests are answered with 206, and
+    dot-directories and in-progress `.part` files are never served.
+    Content types are never sniffed, and only INLINE_EXTENSIONS are
+    displayed rather than downloaded.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") or part.endswith(".part") for part in path.split(os.sep)):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self, full_path: str, stat_result: os.stat_result, scope: Scope, status_code: int = 200
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        headers = {"accept-ranges": "bytes", "x-content-type-options": "nosniff"}
+        if os.path.splitext(name)[1].lower() not in INLINE_EXTENSIONS:
+            headers["content-disposition"] = "attachment"
+        if _CONTENT_NAME.match(name):
+            headers["etag"] = f'"{os.path.splitext(name)[0]}"'
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            headers["cache-control"] = REVALIDATE_CACHE_CONTROL
+
+        response = MediaFileResponse(full_path, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        byte_range = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if byte_range and (if_range is None or if_range in (response.headers["etag"], response.headers["last-modified"])):
+            try:
+                selected = parse_range(byte_range, stat_result.st_size)
+            except ValueError:
+                return Response(
+                    status_code=416,
+                    headers={"content-range": f"bytes */{stat_result.st_size}", "accept-ranges": "bytes"}
+                )
+            if selected:
+                response.set_range(*selected)
+        return response
@@ -1,12 +1,13 @@
 """
 Main FastAPI application for Moments - Personal Life Management System
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import os
 
 from config import settings
+from core.static import ContentAddressedFiles
 from routers import (
     auth,
     calendar,
@@ -21,7 +22,28 @@ from routers import (
     pomodoro,
     daily,
     reminders,
+    admin,
+    uploads,
 )
+from services.thumbnail_service import thumbnail_service
+from services.college_service import college_service
+from services.daily_service import daily_service
+from services.email_service import email_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Resume background work left pending by the last run"""
+    await thumbnail_service.resume_pending()
+    college_service.start_overdue_transitions()
+    daily_service.start_precompute()
+    email_service.start_schedule()
+    yield
+    await email_service.stop_schedule()
+    await daily_service.stop_precompute()
+    await college_service.stop_overdue_transitions()
+    thumbnail_service.shutdown()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -29,6 +51,7 @@ app = FastAPI(
     version=settings.APP_VERSION,
     debug=settings.DEBUG,
     description="Backend API for Moments - A personal life chronicle and management system",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -41,8 +64,8 @@ app.add_middleware(
 )
 
 # Mount static files for uploads
-if os.path.exists(settings.UPLOAD_DIR):
-    app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+app.mount("/uploads", ContentAddressedFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
@@ -58,6 +81,8 @@ app.include_router(expenses.router, prefix="/api/expenses", tags=["Expenses"])
 app.include_router(pomodoro.router, prefix="/api/pomodoro", tags=["Pomodoro"])
 app.include_router(daily.router, prefix="/api/daily", tags=["Daily Summary"])
 app.include_router(reminders.router, prefix="/api/reminders", tags=["Reminders"])
+app.include_router(uploads.router, prefix="/api/uploads", tags=["Uploads"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/")
@@ -23,6 +23,9 @@ class CalendarEvent(BaseModel):
     color: Optional[str] = None  # hex color code
     location: Optional[str] = None
     reminder_minutes: Optional[int] = None  # minutes before event
+    recurrence_rule: Optional[str] = None  # RRULE, e.g. "FREQ=WEEKLY;BYDAY=MO"
+    recurrence_exdates: list[datetime] = []  # start times of cancelled occurrences
+    ical_uid: Optional[str] = None  # UID (and RECURRENCE-ID) of the VEVENT it was imported from
     created_at: datetime
     updated_at: datetime
     
@@ -40,6 +43,8 @@ class CalendarEvent(BaseModel):
                 "color": "#3b82f6",
                 "location": "Conference Room A",
                 "reminder_minutes": 15,
+                "recurrence_rule": "FREQ=WEEKLY;BYDAY=MO",
+                "recurrence_exdates": [],
                 "created_at": "2024-01-10T10:00:00",
                 "updated_at": "2024-01-10T10:00:00"
             }
@@ -52,3 +52,28 @@ class DailySummary(BaseModel):
                 "tasks_pending": 5
             }
         }
+
+
+class DailyEmailSubscription(BaseModel):
+    """
+    A user's opt-in to the scheduled daily summary email
+    TODO: Connect to PostgreSQL daily_email_subscriptions table
+    """
+    user_id: UUID
+    recipient_email: str
+    name: Optional[str] = None  # greeting in the email
+    created_at: datetime
+    updated_at: datetime
+    last_sent_date: Optional[date] = None  # day of the last summary delivered
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "user_id": "123e4567-e89b-12d3-a456-426614174000",
+                "recipient_email": "user@example.com",
+                "name": "John Doe",
+                "created_at": "2024-01-01T00:00:00",
+                "updated_at": "2024-01-01T00:00:00",
+                "last_sent_date": "2024-01-14"
+            }
+        }
@@ -22,6 +22,8 @@ class JournalEntry(BaseModel):
     mood: Optional[str] = None  # happy, sad, neutral, etc.
     tags: list[str] = []
     is_private: bool = True
+    excerpt: str = ""  # Plain-text opening of content, set on write
+    word_count: int = 0
     created_at: datetime
     updated_at: datetime
     
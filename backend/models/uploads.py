@@ -0,0 +1,37 @@
+"""
+Upload models - Database templates
+"""
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+
+
+class Upload(BaseModel):
+    """
+    Uploaded file entity
+    Files are stored once per content hash; each upload is a reference
+    TODO: Connect to PostgreSQL uploads table
+    """
+    id: UUID
+    user_id: UUID
+    sha256: str  # hex digest, also the stored file name
+    size: int  # bytes
+    content_type: Optional[str] = None
+    filename: Optional[str] = None  # original client file name
+    url: str  # /uploads/<sha256[:2]>/<sha256>.<ext>
+    created_at: datetime
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "123e4567-e89b-12d3-a456-426614174020",
+                "user_id": "123e4567-e89b-12d3-a456-426614174000",
+                "sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                "size": 482133,
+                "content_type": "image/jpeg",
+                "filename": "temple.jpg",
+                "url": "/uploads/9f/9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08.jpg",
+                "created_at": "2024-01-15T20:00:00"
+            }
+        }
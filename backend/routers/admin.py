@@ -0,0 +1,35 @@
+"""
+Admin router - Operational endpoints for administrators
+"""
+from fastapi import APIRouter, Depends
+
+from schemas.daily import EmailDeliveryStatsResponse
+from schemas.journal import JournalStorageStatsResponse
+from services.email_service import email_service
+from services.journal_service import journal_service
+from core.auth import get_admin_user, CurrentUser
+from core.responses import Response
+
+router = APIRouter()
+
+
+@router.get("/storage/journal", response_model=Response[JournalStorageStatsResponse])
+async def get_journal_storage_stats(current_user: CurrentUser = Depends(get_admin_user)):
+    """Journal content compression ratio and memory saved, per user"""
+    stats = await journal_service.get_storage_stats()
+    return Response(
+        success=True,
+        message="Journal storage stats retrieved successfully",
+        data=stats
+    )
+
+
+@router.get("/email/stats", response_model=Response[EmailDeliveryStatsResponse])
+async def get_email_delivery_stats(current_user: CurrentUser = Depends(get_admin_user)):
+    """Daily summary email throughput, failures and SMTP pool usage"""
+    stats = await email_service.get_stats()
+    return Response(
+        success=True,
+        message="Email delivery stats retrieved successfully",
+        data=stats
+    )
@@ -1,21 +1,58 @@
 """
 Calendar router - Calendar events endpoints
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, File, UploadFile, Request
+from fastapi.responses import Response as RawResponse, StreamingResponse
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 from uuid import UUID
 import math
 
-from schemas.calendar import CreateEventRequest, UpdateEventRequest, EventResponse
+from schemas.calendar import (
+    CreateEventRequest,
+    UpdateEventRequest,
+    EventResponse,
+    EventWithConflictsResponse,
+    FreeBusyResponse,
+    CalendarGridResponse,
+    CalendarImportResponse
+)
 from services.calendar_service import calendar_service
+from services.ical_service import (
+    import_ics,
+    iter_ics,
+    create_feed_token,
+    verify_feed_token
+)
+from config import settings
 from core.auth import get_current_user, CurrentUser
+from core.exceptions import PayloadTooLargeException
 from core.responses import Response, PaginatedResponse
 
 router = APIRouter()
 
+# Read size for uploaded .ics files
+ICS_CHUNK_SIZE = 64 * 1024
 
-@router.post("/events", response_model=Response[EventResponse])
+
+def _ics_response(request: Request, user_id: UUID, cache_control: str, filename: Optional[str] = None):
+    """Stream a user's calendar, or 304 when the client's ETag is current"""
+    etag = calendar_service.get_etag(user_id)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return RawResponse(status_code=304, headers=headers)
+    
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(
+        iter_ics(calendar_service.iter_user_events(user_id)),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers
+    )
+
+
+@router.post("/events", response_model=Response[EventWithConflictsResponse])
 async def create_event(
     request: CreateEventRequest,
     current_user: CurrentUser = Depends(get_current_user)
@@ -29,26 +66,41 @@ async def create_event(
     )
 
 
-@router.get("/events", response_model=PaginatedResponse[EventResponse])
+@router.get(
+    "/events",
+    response_model=Union[PaginatedResponse[EventResponse], Response[CalendarGridResponse]]
+)
 async def get_events(
     start_date: Optional[str] = Query(None, description="Filter events starting from this date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Filter events until this date (YYYY-MM-DD)"),
-    view: Optional[str] = Query(None, description="View type: month, day, hour"),
+    view: Optional[str] = Query(None, description="View type: month, day, hour (returns an aggregated grid for the period containing start_date)"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(50, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Continue after a previous page's next_cursor (overrides page)"),
+    include_total: bool = Query(True, description="Compute total and total_pages"),
     current_user: CurrentUser = Depends(get_current_user)
 ):
-    """Get calendar events with optional date filtering"""
+    """Get calendar events with optional date filtering, or an aggregated grid when view is set"""
     # Convert string dates to datetime if provided
     start_datetime = datetime.fromisoformat(start_date) if start_date else None
     end_datetime = datetime.fromisoformat(end_date) if end_date else None
     
-    events, total = await calendar_service.get_events(
+    if view:
+        grid = await calendar_service.get_grid(current_user.user_id, view, start_datetime)
+        return Response(
+            success=True,
+            message="Calendar view retrieved successfully",
+            data=grid
+        )
+    
+    events, total, next_cursor = await calendar_service.get_events(
         user_id=current_user.user_id,
         start_date=start_datetime,
         end_date=end_datetime,
         page=page,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return PaginatedResponse(
@@ -58,7 +110,23 @@ async def get_events(
         page=page,
         limit=limit,
         total=total,
-        total_pages=math.ceil(total / limit)
+        total_pages=math.ceil(total / limit) if total is not None else None,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/freebusy", response_model=Response[FreeBusyResponse])
+async def get_free_busy(
+    start: datetime = Query(..., description="Window start"),
+    end: datetime = Query(..., description="Window end"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get merged busy intervals and overlapping events for a time window"""
+    free_busy = await calendar_service.get_free_busy(current_user.user_id, start, end)
+    return Response(
+        success=True,
+        message="Free/busy retrieved successfully",
+        data=free_busy
     )
 
 
@@ -76,7 +144,7 @@ async def get_event(
     )
 
 
-@router.put("/events/{event_id}", response_model=Response[EventResponse])
+@router.put("/events/{event_id}", response_model=Response[EventWithConflictsResponse])
 async def update_event(
     event_id: UUID,
     request: UpdateEventRequest,
@@ -103,3 +171,72 @@ async def delete_event(
         message="Calendar event deleted successfully",
         data={}
     )
+
+
+@router.delete("/events/{event_id}/occurrences", response_model=Response[EventResponse])
+async def cancel_event_occurrence(
+    event_id: UUID,
+    occurrence_start: datetime = Query(..., description="Start time of the occurrence to cancel"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Cancel a single occurrence of a recurring event"""
+    event = await calendar_service.cancel_occurrence(
+        current_user.user_id, event_id, occurrence_start
+    )
+    return Response(
+        success=True,
+        message="Calendar event occurrence cancelled successfully",
+        data=event
+    )
+
+
+@router.post("/import", response_model=Response[CalendarImportResponse])
+async def import_calendar(
+    file: UploadFile = File(..., description="iCalendar (.ics) file"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Import events from an .ics file (up to MAX_UPLOAD_SIZE), parsed incrementally"""
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise PayloadTooLargeException(detail=f"Calendar file exceeds {settings.MAX_UPLOAD_SIZE} bytes")
+    
+    async def chunks():
+        size = 0
+        while chunk := await file.read(ICS_CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.MAX_UPLOAD_SIZE:
+                raise PayloadTooLargeException(detail=f"Calendar file exceeds {settings.MAX_UPLOAD_SIZE} bytes")
+            yield chunk
+    
+    result = await import_ics(current_user.user_id, chunks())
+    return Response(
+        success=True,
+        message="Calendar imported successfully",
+        data=result
+    )
+
+
+@router.get("/export.ics")
+async def export_calendar(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Stream all calendar events as an .ics file"""
+    return _ics_response(request, current_user.user_id, "private, no-cache", filename="moments.ics")
+
+
+@router.get("/feed-url", response_model=Response[dict])
+async def get_feed_url(current_user: CurrentUser = Depends(get_current_user)):
+    """Get a secret subscription URL for calendar apps"""
+    token = create_feed_token(current_user.user_id)
+    return Response(
+        success=True,
+        message="Calendar feed URL retrieved successfully",
+        data={"url": f"/api/calendar/feed/{token}.ics"}
+    )
+
+
+@router.get("/feed/{token}.ics")
+async def get_feed(token: str, request: Request):
+    """Subscribable calendar feed, authenticated by its URL token"""
+    user_id = verify_feed_token(token)
+    return _ics_response(request, user_id, "private, max-age=300")
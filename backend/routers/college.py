@@ -4,12 +4,14 @@ College router - College tasks endpoints
 from fastapi import APIRouter, Depends, Query
 from typing import Optional
 from uuid import UUID
+from datetime import datetime
 import math
 
 from schemas.college import (
     CreateCollegeTaskRequest,
     UpdateCollegeTaskRequest,
-    CollegeTaskResponse
+    CollegeTaskResponse,
+    CollegeTaskCountsResponse
 )
 from services.college_service import college_service
 from core.auth import get_current_user, CurrentUser
@@ -37,14 +39,22 @@ async def get_tasks(
     status: Optional[str] = Query(None, description="Filter by status: ongoing, completed, pending, overdue"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Continue after a previous page's next_cursor (overrides page)"),
+    include_total: bool = Query(True, description="Compute total and total_pages"),
+    due_before: Optional[datetime] = Query(None, description="Only tasks due at or before this time"),
+    overdue: bool = Query(False, description="Only tasks past their due date and not completed"),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get college tasks with pagination"""
-    tasks, total = await college_service.get_tasks(
+    tasks, total, next_cursor = await college_service.get_tasks(
         user_id=current_user.user_id,
         status=status,
         page=page,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        due_before=due_before,
+        overdue=overdue
     )
     
     return PaginatedResponse(
@@ -54,7 +64,23 @@ async def get_tasks(
         page=page,
         limit=limit,
         total=total,
-        total_pages=math.ceil(total / limit)
+        total_pages=math.ceil(total / limit) if total is not None else None,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/tasks/counts", response_model=Response[CollegeTaskCountsResponse])
+async def get_task_counts(
+    due_before: Optional[datetime] = Query(None, description="Only count tasks due at or before this time"),
+    overdue: bool = Query(False, description="Only count tasks past their due date and not completed"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get task counts per status"""
+    counts = await college_service.count_tasks(current_user.user_id, due_before=due_before, overdue=overdue)
+    return Response(
+        success=True,
+        message="College task counts retrieved successfully",
+        data=CollegeTaskCountsResponse(counts=counts, total=sum(counts.values()))
     )
 
 
@@ -2,11 +2,19 @@
 Daily summary router - Daily aggregated data endpoints
 """
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from datetime import date
 from typing import Optional
 
-from schemas.daily import DailySummaryResponse, SendDailySummaryEmailRequest
-from services.daily_service import daily_service
+from schemas.daily import (
+    DailyEmailSubscriptionRequest,
+    DailyEmailSubscriptionResponse,
+    DailySummaryResponse,
+    SendDailySummaryEmailRequest,
+    SendDailySummaryEmailResponse
+)
+from services.daily_service import daily_service, iter_ndjson
+from services.email_service import email_service
 from core.auth import get_current_user, CurrentUser
 from core.responses import Response
 
@@ -29,21 +37,64 @@ async def get_daily_summary(
     )
 
 
-@router.post("/email", response_model=Response[dict])
+@router.get("/summary/range")
+async def get_daily_summary_range(
+    start: date = Query(..., description="First day (inclusive)"),
+    end: date = Query(..., description="Last day (inclusive)"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Stream one daily summary per day from start to end as NDJSON
+    Each line is a DailySummaryResponse, oldest day first.
+    """
+    summaries = await daily_service.get_summary_range(current_user.user_id, start, end)
+    return StreamingResponse(iter_ndjson(summaries), media_type="application/x-ndjson")
+
+
+@router.post("/email", response_model=Response[SendDailySummaryEmailResponse])
 async def send_daily_summary_email(
     request: SendDailySummaryEmailRequest,
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """
-    Send daily summary email
-    
-    TODO: Implement email sending logic
-    - Fetch daily summary
-    - Format as palm-leaf manuscript style HTML
-    - Send via SMTP
+    Send a day's summary as a palm-leaf manuscript style email now
+    Returns 503 when email delivery is not configured or the mail server
+    cannot be reached.
+    """
+    sent = await email_service.send_summary(current_user.user_id, current_user.email, current_user.name, request)
+    return Response(
+        success=True,
+        message="Daily summary email sent successfully",
+        data=sent
+    )
+
+
+@router.get("/email/subscription", response_model=Response[DailyEmailSubscriptionResponse])
+async def get_daily_email_subscription(current_user: CurrentUser = Depends(get_current_user)):
     """
+    Get scheduled daily summary email settings
+    """
+    subscription = await email_service.get_subscription(current_user.user_id)
+    return Response(
+        success=True,
+        message="Daily email subscription retrieved successfully",
+        data=subscription
+    )
+
+
+@router.put("/email/subscription", response_model=Response[DailyEmailSubscriptionResponse])
+async def update_daily_email_subscription(
+    request: DailyEmailSubscriptionRequest,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Opt in to (or out of) the daily summary email sent at DAILY_EMAIL_HOUR
+    """
+    subscription = await email_service.update_subscription(
+        current_user.user_id, current_user.email, current_user.name, request
+    )
     return Response(
         success=True,
-        message="Daily summary email feature coming soon",
-        data={"note": "Email service will be implemented later"}
+        message="Daily email subscription updated successfully",
+        data=subscription
     )
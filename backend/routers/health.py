@@ -1,32 +1,46 @@
 """
 Health router - Health tracking endpoints
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from datetime import date
 from typing import Optional
 from uuid import UUID
+import os
+import tempfile
+import aiofiles
 
 from schemas.health import (
     CreateHealthEntryRequest,
     UpdateHealthEntryRequest,
     HealthEntryResponse,
-    HealthStatsResponse
+    HealthStatsResponse,
+    RollingHealthStatsResponse,
+    BulkIngestResponse,
+    HealthImportJobResponse
 )
 from services.health_service import health_service
+from services.health_ingest import ingest_health_rows
+from services.health_import_service import health_import_service
+from config import settings
+from core.exceptions import PayloadTooLargeException, BadRequestException
 from core.auth import get_current_user, CurrentUser
 from core.responses import Response, PaginatedResponse
 import math
 
 router = APIRouter()
 
+# Export formats accepted by /import
+IMPORT_SOURCES = ("apple_health", "google_fit")
+
 
 @router.post("/entries", response_model=Response[HealthEntryResponse])
 async def create_health_entry(
     request: CreateHealthEntryRequest,
+    upsert: bool = Query(False, description="Update the existing entry for this date instead of failing with 409"),
     current_user: CurrentUser = Depends(get_current_user)
 ):
-    """Create a new health entry"""
-    entry = await health_service.create_entry(current_user.user_id, request)
+    """Create a new health entry (one per day)"""
+    entry = await health_service.create_entry(current_user.user_id, request, upsert=upsert)
     return Response(
         success=True,
         message="Health entry created successfully",
@@ -34,19 +48,96 @@ async def create_health_entry(
     )
 
 
+@router.post("/entries/bulk", response_model=Response[BulkIngestResponse])
+async def bulk_ingest_health_entries(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Bulk upsert health entries from an NDJSON stream or a JSON array
+    of create requests (one entry per day; existing days are updated)
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_BULK_INGEST_SIZE:
+        raise PayloadTooLargeException(detail=f"Bulk body exceeds {settings.MAX_BULK_INGEST_SIZE} bytes")
+    
+    result = await ingest_health_rows(current_user.user_id, request.stream())
+    return Response(
+        success=True,
+        message="Health entries ingested successfully",
+        data=result
+    )
+
+
+@router.post("/import", response_model=Response[HealthImportJobResponse])
+async def import_health_export(
+    request: Request,
+    source: str = Query(..., description="Export format: apple_health (export.xml / export.zip) or google_fit (JSON / Takeout zip)"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Upload a raw Apple Health or Google Fit export as the request body
+    The file is parsed in a background worker process; poll the returned
+    job for progress.
+    """
+    if source not in IMPORT_SOURCES:
+        raise BadRequestException(detail=f"source must be one of: {', '.join(IMPORT_SOURCES)}")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_HEALTH_IMPORT_SIZE:
+        raise PayloadTooLargeException(detail=f"Export exceeds {settings.MAX_HEALTH_IMPORT_SIZE} bytes")
+    
+    fd, path = tempfile.mkstemp(prefix="health-import-")
+    os.close(fd)
+    try:
+        received = 0
+        async with aiofiles.open(path, "wb") as spool:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > settings.MAX_HEALTH_IMPORT_SIZE:
+                    raise PayloadTooLargeException(detail=f"Export exceeds {settings.MAX_HEALTH_IMPORT_SIZE} bytes")
+                await spool.write(chunk)
+        job = await health_import_service.start_import(current_user.user_id, source, path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return Response(
+        success=True,
+        message="Health import started",
+        data=job
+    )
+
+
+@router.get("/import/{job_id}", response_model=Response[HealthImportJobResponse])
+async def get_health_import_job(
+    job_id: UUID,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get the status and progress of a health import"""
+    job = await health_import_service.get_job(current_user.user_id, job_id)
+    return Response(
+        success=True,
+        message="Health import job retrieved successfully",
+        data=job
+    )
+
+
 @router.get("/entries", response_model=PaginatedResponse[HealthEntryResponse])
 async def get_health_entries(
     date: Optional[date] = Query(None, description="Filter by specific date"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Continue after a previous page's next_cursor (overrides page)"),
+    include_total: bool = Query(True, description="Compute total and total_pages"),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get health entries with pagination"""
-    entries, total = await health_service.get_entries(
+    entries, total, next_cursor = await health_service.get_entries(
         user_id=current_user.user_id,
         date=date,
         page=page,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return PaginatedResponse(
@@ -56,7 +147,8 @@ async def get_health_entries(
         page=page,
         limit=limit,
         total=total,
-        total_pages=math.ceil(total / limit)
+        total_pages=math.ceil(total / limit) if total is not None else None,
+        next_cursor=next_cursor
     )
 
 
@@ -116,3 +208,16 @@ async def get_health_stats(
         message="Health statistics retrieved successfully",
         data=stats
     )
+
+
+@router.get("/stats/rolling", response_model=Response[list[RollingHealthStatsResponse]])
+async def get_rolling_health_stats(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get health statistics for the last 7, 30 and 90 days"""
+    stats = await health_service.get_rolling_stats(current_user.user_id)
+    return Response(
+        success=True,
+        message="Rolling health statistics retrieved successfully",
+        data=stats
+    )
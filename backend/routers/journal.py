@@ -2,15 +2,17 @@
 Journal router - Journaling endpoints
 """
 from fastapi import APIRouter, Depends, Query
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Optional, Union
 from uuid import UUID
 import math
 
 from schemas.journal import (
     CreateJournalEntryRequest,
     UpdateJournalEntryRequest,
-    JournalEntryResponse
+    JournalEntryResponse,
+    JournalEntrySummaryResponse,
+    JournalSearchResult
 )
 from services.journal_service import journal_service
 from core.auth import get_current_user, CurrentUser
@@ -33,21 +35,30 @@ async def create_journal_entry(
     )
 
 
-@router.get("/entries", response_model=PaginatedResponse[JournalEntryResponse])
+@router.get(
+    "/entries",
+    response_model=Union[PaginatedResponse[JournalEntryResponse], PaginatedResponse[JournalEntrySummaryResponse]]
+)
 async def get_journal_entries(
     start_date: Optional[datetime] = Query(None, description="Filter entries from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter entries until this date"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=50, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Continue after a previous page's next_cursor (overrides page)"),
+    include_total: bool = Query(True, description="Compute total and total_pages"),
+    summary: bool = Query(False, description="Return title, date, mood, tags, cover and excerpt only (fetch content via /entries/{id})"),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get journal entries with pagination"""
-    entries, total = await journal_service.get_entries(
+    entries, total, next_cursor = await journal_service.get_entries(
         user_id=current_user.user_id,
         start_date=start_date,
         end_date=end_date,
         page=page,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        summary=summary
     )
     
     return PaginatedResponse(
@@ -57,6 +68,47 @@ async def get_journal_entries(
         page=page,
         limit=limit,
         total=total,
+        total_pages=math.ceil(total / limit) if total is not None else None,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/on-this-day", response_model=Response[list[JournalEntrySummaryResponse]])
+async def get_on_this_day(
+    date: Optional[date] = Query(None, description="Day to look back from (defaults to today)"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get entries from the same calendar day in previous years"""
+    entries = await journal_service.get_on_this_day(current_user.user_id, date or datetime.now().date())
+    return Response(
+        success=True,
+        message="On this day entries retrieved successfully",
+        data=entries
+    )
+
+
+@router.get("/search", response_model=PaginatedResponse[JournalSearchResult])
+async def search_journal_entries(
+    q: str = Query(..., min_length=1, description='Search terms; "quoted phrases" and prefix* supported'),
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(10, ge=1, le=50, description="Items per page"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Search journal entries, best matches first"""
+    results, total = await journal_service.search_entries(
+        user_id=current_user.user_id,
+        q=q,
+        page=page,
+        limit=limit
+    )
+    
+    return PaginatedResponse(
+        success=True,
+        message="Journal search completed successfully",
+        data=results,
+        page=page,
+        limit=limit,
+        total=total,
         total_pages=math.ceil(total / limit)
     )
 
@@ -0,0 +1,116 @@
+"""
+Uploads router - File upload endpoints
+"""
+from fastapi import APIRouter, Depends, Query, Request
+from typing import Optional
+from uuid import UUID
+
+from schemas.uploads import CreateUploadSessionRequest, UploadResponse, UploadSessionResponse
+from services.upload_service import upload_service
+from config import settings
+from core.exceptions import PayloadTooLargeException
+from core.auth import get_current_user, CurrentUser
+from core.responses import Response
+
+router = APIRouter()
+
+
+@router.post("", response_model=Response[UploadResponse])
+async def upload_file(
+    request: Request,
+    filename: Optional[str] = Query(None, description="Original file name (used for the extension)"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Upload a file sent as the raw request body (up to MAX_UPLOAD_SIZE)
+    Identical content is stored once and served from the same URL
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_SIZE:
+        raise PayloadTooLargeException(detail=f"Upload exceeds {settings.MAX_UPLOAD_SIZE} bytes")
+    
+    upload = await upload_service.save_stream(
+        current_user.user_id,
+        request.stream(),
+        filename=filename,
+        content_type=request.headers.get("content-type")
+    )
+    return Response(
+        success=True,
+        message="File uploaded successfully",
+        data=upload
+    )
+
+
+@router.post("/sessions", response_model=Response[UploadSessionResponse])
+async def create_upload_session(
+    request: CreateUploadSessionRequest,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Start a resumable upload for large files"""
+    session = await upload_service.create_session(current_user.user_id, request)
+    return Response(
+        success=True,
+        message="Upload session created successfully",
+        data=session
+    )
+
+
+@router.get("/sessions/{session_id}", response_model=Response[UploadSessionResponse])
+async def get_upload_session(
+    session_id: UUID,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get a resumable upload's progress (resume from received)"""
+    session = await upload_service.get_session(current_user.user_id, session_id)
+    return Response(
+        success=True,
+        message="Upload session retrieved successfully",
+        data=session
+    )
+
+
+@router.put("/sessions/{session_id}", response_model=Response[UploadSessionResponse])
+async def upload_chunk(
+    session_id: UUID,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of this chunk; must equal the session's received count"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Append the raw request body to a resumable upload"""
+    session = await upload_service.append_chunk(
+        current_user.user_id, session_id, offset, request.stream()
+    )
+    return Response(
+        success=True,
+        message="Chunk uploaded successfully",
+        data=session
+    )
+
+
+@router.post("/sessions/{session_id}/complete", response_model=Response[UploadResponse])
+async def complete_upload_session(
+    session_id: UUID,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Finish a resumable upload"""
+    upload = await upload_service.complete_session(current_user.user_id, session_id)
+    return Response(
+        success=True,
+        message="File uploaded successfully",
+        data=upload
+    )
+
+
+@router.delete("/sessions/{session_id}", response_model=Response[dict])
+async def cancel_upload_session(
+    session_id: UUID,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Abandon a resumable upload"""
+    await upload_service.cancel_session(current_user.user_id, session_id)
+    return Response(
+        success=True,
+        message="Upload session cancelled successfully",
+        data={}
+    )
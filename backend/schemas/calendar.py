@@ -6,18 +6,22 @@ from uuid import UUID
 from datetime import datetime
 from typing import Optional
 
+from core.datetimes import LocalDatetime
+
 
 class CreateEventRequest(BaseModel):
     """Create calendar event request"""
     title: str
     description: Optional[str] = None
-    start_time: datetime
-    end_time: datetime
+    start_time: LocalDatetime
+    end_time: LocalDatetime
     all_day: bool = False
     category: Optional[str] = None
     color: Optional[str] = None
     location: Optional[str] = None
     reminder_minutes: Optional[int] = None
+    recurrence_rule: Optional[str] = None  # RRULE, e.g. "FREQ=WEEKLY;BYDAY=MO"
+    recurrence_exdates: list[LocalDatetime] = []
     
     class Config:
         json_schema_extra = {
@@ -30,7 +34,8 @@ class CreateEventRequest(BaseModel):
                 "category": "work",
                 "color": "#3b82f6",
                 "location": "Conference Room A",
-                "reminder_minutes": 15
+                "reminder_minutes": 15,
+                "recurrence_rule": "FREQ=WEEKLY;BYDAY=MO"
             }
         }
 
@@ -39,13 +44,15 @@ class UpdateEventRequest(BaseModel):
     """Update calendar event request"""
     title: Optional[str] = None
     description: Optional[str] = None
-    start_time: Optional[datetime] = None
-    end_time: Optional[datetime] = None
+    start_time: Optional[LocalDatetime] = None
+    end_time: Optional[LocalDatetime] = None
     all_day: Optional[bool] = None
     category: Optional[str] = None
     color: Optional[str] = None
     location: Optional[str] = None
     reminder_minutes: Optional[int] = None
+    recurrence_rule: Optional[str] = None
+    recurrence_exdates: Optional[list[LocalDatetime]] = None
 
 
 class EventResponse(BaseModel):
@@ -61,5 +68,63 @@ class EventResponse(BaseModel):
     color: Optional[str]
     location: Optional[str]
     reminder_minutes: Optional[int]
+    recurrence_rule: Optional[str] = None
+    recurrence_exdates: list[datetime] = []
+    recurrence_id: Optional[datetime] = None  # occurrence start when expanded from a series
     created_at: datetime
     updated_at: datetime
+
+
+class EventConflict(BaseModel):
+    """Event (or occurrence) that overlaps another one"""
+    event_id: UUID
+    title: str
+    start_time: datetime
+    end_time: datetime
+    recurrence_id: Optional[datetime] = None
+    overlaps_with: list[UUID] = []
+
+
+class EventWithConflictsResponse(EventResponse):
+    """Calendar event response with overlapping events"""
+    conflicts: list[EventConflict] = []
+
+
+class BusyInterval(BaseModel):
+    """Merged busy time range"""
+    start: datetime
+    end: datetime
+    event_ids: list[UUID]
+
+
+class FreeBusyResponse(BaseModel):
+    """Free/busy response for a time window"""
+    start: datetime
+    end: datetime
+    busy: list[BusyInterval]
+    conflicts: list[EventConflict]
+
+
+class CalendarGridSlot(BaseModel):
+    """One cell of an aggregated calendar view"""
+    start: datetime
+    end: datetime
+    count: int  # events touching this slot
+    occupancy: float  # busy fraction of the slot, 0-1
+    categories: dict[str, Optional[str]] = {}  # category -> color
+
+
+class CalendarGridResponse(BaseModel):
+    """Server-computed calendar grid for month, day or hour views"""
+    view: str  # month (day slots), day (hour slots), hour (15-minute slots)
+    start: datetime
+    end: datetime
+    slots: list[CalendarGridSlot]
+
+
+class CalendarImportResponse(BaseModel):
+    """iCalendar import result"""
+    imported: int
+    updated: int = 0  # events already imported with the same UID
+    skipped: int
+    errors: list[str] = []  # first few parse/validation errors
@@ -6,6 +6,8 @@ from uuid import UUID
 from datetime import datetime
 from typing import Optional
 
+from core.datetimes import LocalDatetime
+
 
 class CreateCollegeTaskRequest(BaseModel):
     """Create college task request"""
@@ -13,7 +15,7 @@ class CreateCollegeTaskRequest(BaseModel):
     description: Optional[str] = None
     type: str  # assignment, project, homework, writing
     status: str = "pending"
-    due_date: Optional[datetime] = None
+    due_date: Optional[LocalDatetime] = None
     priority: Optional[str] = None
     subject: Optional[str] = None
     tags: list[str] = []
@@ -39,7 +41,7 @@ class UpdateCollegeTaskRequest(BaseModel):
     description: Optional[str] = None
     type: Optional[str] = None
     status: Optional[str] = None
-    due_date: Optional[datetime] = None
+    due_date: Optional[LocalDatetime] = None
     priority: Optional[str] = None
     subject: Optional[str] = None
     tags: Optional[list[str]] = None
@@ -59,3 +61,9 @@ class CollegeTaskResponse(BaseModel):
     tags: list[str]
     created_at: datetime
     updated_at: datetime
+
+
+class CollegeTaskCountsResponse(BaseModel):
+    """Task counts per status (e.g. for a Kanban header)"""
+    counts: dict[str, int]
+    total: int
@@ -1,9 +1,9 @@
 """
 Daily summary schemas
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, EmailStr
 from uuid import UUID
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
 
 from schemas.health import HealthEntryResponse
@@ -11,6 +11,13 @@ from schemas.college import CollegeTaskResponse
 from schemas.journal import JournalEntryResponse
 
 
+class DailySummarySourceStatus(BaseModel):
+    """How one module's section of a daily summary was produced"""
+    status: str  # ok, timeout, error, or cached (not queried for this response)
+    duration_ms: float
+    error: Optional[str] = None
+
+
 class DailySummaryResponse(BaseModel):
     """Daily summary response"""
     date: date
@@ -23,9 +30,54 @@ class DailySummaryResponse(BaseModel):
     steps: int = 0
     tasks_completed: int = 0
     tasks_pending: int = 0
+    # Per-module timing; sections of modules that are not "ok" are left empty
+    sources: dict[str, DailySummarySourceStatus] = {}
+    degraded: list[str] = []
+    # Served from the materialized summary cache; sources then report "cached"
+    cached: bool = False
 
 
 class SendDailySummaryEmailRequest(BaseModel):
     """Send daily summary email request"""
     date: Optional[date] = None  # Defaults to today
-    recipient_email: Optional[str] = None  # Defaults to user's email
+    recipient_email: Optional[EmailStr] = None  # Defaults to user's email
+
+
+class SendDailySummaryEmailResponse(BaseModel):
+    """A daily summary email accepted by the mail server"""
+    date: date
+    recipient_email: str
+
+
+class DailyEmailSubscriptionRequest(BaseModel):
+    """Opt in to (or out of) the scheduled daily summary email"""
+    enabled: bool
+    recipient_email: Optional[EmailStr] = None  # Defaults to user's email
+
+
+class DailyEmailSubscriptionResponse(BaseModel):
+    """Scheduled daily summary email settings"""
+    enabled: bool
+    recipient_email: Optional[str] = None
+    send_hour: int  # local hour summaries go out
+    last_sent_date: Optional[date] = None
+
+
+class DailyEmailRunStats(BaseModel):
+    """One scheduled (or manual) delivery to every subscriber"""
+    date: date
+    started_at: datetime
+    finished_at: Optional[datetime] = None  # None while running
+    recipients: int
+    sent: int
+    failed: int
+    render_seconds: float  # worker time spent rendering
+    messages_per_second: float
+
+
+class EmailDeliveryStatsResponse(BaseModel):
+    """Daily summary email throughput and SMTP pool usage"""
+    subscribers: int
+    # size, in_use, idle, connections_opened, sent, failed, retries since startup
+    pool: dict[str, int]
+    last_run: Optional[DailyEmailRunStats] = None
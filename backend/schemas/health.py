@@ -1,20 +1,48 @@
 """
 Health schemas - Request/Response models for health tracking
 """
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel, Field, field_validator
 from uuid import UUID
-from datetime import date, datetime
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Annotated, Optional
+
+from typing_extensions import Required, TypedDict
+
+# Daily value limits: far above real days, and small enough that summing
+# them in the int64 day columns cannot overflow
+MAX_WATER = 1000
+MAX_STEPS = 1_000_000
+MAX_CALORIES = 100_000
+
+# How far before and after today entries may be dated, which bounds the
+# span (and memory) of a user's day columns
+HEALTH_HISTORY_DAYS = 30 * 366
+HEALTH_FUTURE_DAYS = 1
+
+
+def _check_entry_date(value: date) -> date:
+    today = date.today()
+    if value < today - timedelta(days=HEALTH_HISTORY_DAYS):
+        raise ValueError(f"must be within {HEALTH_HISTORY_DAYS} days before today")
+    if value > today + timedelta(days=HEALTH_FUTURE_DAYS):
+        raise ValueError("must not be in the future")
+    return value
+
+
+EntryDate = Annotated[date, AfterValidator(_check_entry_date)]
+Water = Annotated[int, Field(ge=0, le=MAX_WATER)]
+Steps = Annotated[int, Field(ge=0, le=MAX_STEPS)]
+Calories = Annotated[int, Field(ge=0, le=MAX_CALORIES)]
 
 
 class CreateHealthEntryRequest(BaseModel):
     """Create health entry request"""
-    date: date
-    water: int = 0
-    steps: int = 0
-    calories: Optional[int] = None
-    meals: list[str] = []
-    meal_types: list[str] = []
+    date: EntryDate
+    water: Water = 0
+    steps: Steps = 0
+    calories: Optional[Calories] = None
+    meals: list[str] = Field(default_factory=list)  # no per-row deepcopy of a [] default
+    meal_types: list[str] = Field(default_factory=list)
     cycle: Optional[str] = None
     period_day: Optional[int] = None
     bath: bool = False
@@ -40,10 +68,10 @@ class CreateHealthEntryRequest(BaseModel):
 
 
 class UpdateHealthEntryRequest(BaseModel):
-    """Update health entry request"""
-    water: Optional[int] = None
-    steps: Optional[int] = None
-    calories: Optional[int] = None
+    """Update health entry request (fields left out are unchanged)"""
+    water: Optional[Water] = None
+    steps: Optional[Steps] = None
+    calories: Optional[Calories] = None
     meals: Optional[list[str]] = None
     meal_types: Optional[list[str]] = None
     cycle: Optional[str] = None
@@ -51,6 +79,33 @@ class UpdateHealthEntryRequest(BaseModel):
     bath: Optional[bool] = None
     face_wash: Optional[bool] = None
     notes: Optional[str] = None
+    
+    @field_validator("water", "steps", "meals", "meal_types", "bath", "face_wash")
+    @classmethod
+    def _not_null(cls, value):
+        # Only calories, cycle, period_day and notes can be cleared
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+class HealthEntryRow(TypedDict, total=False):
+    """
+    Bulk upsert row: the CreateHealthEntryRequest fields it sets
+    Validated into a plain dict, several times faster than a model, and
+    the keys present are the fields an existing day gets overwritten with.
+    """
+    date: Required[EntryDate]
+    water: Water
+    steps: Steps
+    calories: Optional[Calories]
+    meals: list[str]
+    meal_types: list[str]
+    cycle: Optional[str]
+    period_day: Optional[int]
+    bath: bool
+    face_wash: bool
+    notes: Optional[str]
 
 
 class HealthEntryResponse(BaseModel):
@@ -72,6 +127,17 @@ class HealthEntryResponse(BaseModel):
     updated_at: datetime
 
 
+class HealthMetricStats(BaseModel):
+    """Distribution of one metric's daily totals over logged days"""
+    mean: float
+    min: int
+    max: int
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+
+
 class HealthStatsResponse(BaseModel):
     """Health statistics response"""
     period: str  # weekly, monthly
@@ -79,4 +145,56 @@ class HealthStatsResponse(BaseModel):
     avg_steps: float
     avg_calories: Optional[float]
     total_days: int
-    streak: int  # consecutive days with entries
+    streak: int  # consecutive logged days ending at the last logged day
+    longest_streak: int = 0
+    water: Optional[HealthMetricStats] = None
+    steps: Optional[HealthMetricStats] = None
+    calories: Optional[HealthMetricStats] = None
+    bath_rate: Optional[float] = None  # share of entries with a bath
+    face_wash_rate: Optional[float] = None
+
+
+class RollingHealthStatsResponse(BaseModel):
+    """Health statistics for a trailing window ending today"""
+    window_days: int  # 7, 30, 90
+    start_date: date
+    end_date: date
+    avg_water: float
+    avg_steps: float
+    avg_calories: Optional[float]
+    total_days: int
+    total_water: int
+    total_steps: int
+    total_calories: int
+
+
+class BulkRowError(BaseModel):
+    """Rejected row in a bulk ingest"""
+    row: int  # 1-based line (NDJSON) or array position
+    error: str
+
+
+class BulkIngestResponse(BaseModel):
+    """Bulk health ingest result"""
+    received: int
+    created: int
+    updated: int
+    failed: int
+    errors: list[BulkRowError] = []  # first MAX_BULK_ERRORS failures
+
+
+class HealthImportJobResponse(BaseModel):
+    """Apple Health / Google Fit export import job"""
+    id: UUID
+    source: str  # apple_health, google_fit
+    status: str  # queued, running, applying, completed, failed
+    bytes_total: int  # uncompressed export size
+    bytes_read: int = 0
+    progress: float = 0.0  # share of bytes_total parsed
+    records: int = 0  # samples rolled up into days
+    days_created: int = 0
+    days_updated: int = 0
+    days_skipped: int = 0  # out-of-range dates or implausible totals
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
@@ -1,17 +1,19 @@
 """
 Journal schemas - Request/Response models for journaling
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from uuid import UUID
 from datetime import datetime
 from typing import Optional
 
+from core.datetimes import LocalDatetime
+
 
 class CreateJournalEntryRequest(BaseModel):
     """Create journal entry request"""
     title: str
     content: str
-    date: Optional[datetime] = None  # Defaults to now
+    date: Optional[LocalDatetime] = None  # Defaults to now
     cover_image: Optional[str] = None
     images: list[str] = []
     mood: Optional[str] = None
@@ -42,6 +44,14 @@ class UpdateJournalEntryRequest(BaseModel):
     mood: Optional[str] = None
     tags: Optional[list[str]] = None
     is_private: Optional[bool] = None
+    
+    @field_validator("title", "content", "images", "tags", "is_private")
+    @classmethod
+    def _not_null(cls, value):
+        # Only cover_image and mood can be cleared
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
 
 
 class JournalEntryResponse(BaseModel):
@@ -58,3 +68,50 @@ class JournalEntryResponse(BaseModel):
     is_private: bool
     created_at: datetime
     updated_at: datetime
+
+
+class JournalEntrySummaryResponse(BaseModel):
+    """Journal entry list item without content"""
+    id: UUID
+    title: str
+    date: datetime
+    cover_image: Optional[str]
+    mood: Optional[str]
+    tags: list[str]
+    is_private: bool
+    excerpt: str
+    word_count: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class JournalSearchResult(BaseModel):
+    """Ranked journal search hit"""
+    id: UUID
+    title: str
+    date: datetime
+    cover_image: Optional[str]
+    mood: Optional[str]
+    tags: list[str]
+    score: float  # BM25
+    snippet: str  # excerpt with matches wrapped in <mark>
+
+
+class JournalUserStorageStats(BaseModel):
+    """Journal content storage for one user"""
+    user_id: UUID
+    entries: int
+    raw_bytes: int  # UTF-8 content size
+    stored_bytes: int  # compressed size held in memory
+    compression_ratio: float
+    saved_bytes: int
+
+
+class JournalStorageStatsResponse(BaseModel):
+    """Journal content storage across users"""
+    users: list[JournalUserStorageStats]
+    raw_bytes: int
+    stored_bytes: int
+    compression_ratio: float
+    saved_bytes: int
+    cache: dict[str, int]  # LRU of decompressed bodies: entries, bytes, hits, misses
@@ -0,0 +1,47 @@
+"""
+Upload schemas - Request/Response models for file uploads
+"""
+from pydantic import BaseModel, Field
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+
+
+class UploadResponse(BaseModel):
+    """Upload response"""
+    id: UUID
+    sha256: str
+    size: int
+    content_type: Optional[str]
+    filename: Optional[str]
+    url: str
+    deduplicated: bool = False  # content was already stored
+    created_at: datetime
+
+
+class CreateUploadSessionRequest(BaseModel):
+    """Start a resumable upload"""
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    size: int = Field(..., gt=0)  # total bytes that will be sent
+    sha256: Optional[str] = None  # verified on completion when given
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filename": "lecture-04.pdf",
+                "content_type": "application/pdf",
+                "size": 73400320
+            }
+        }
+
+
+class UploadSessionResponse(BaseModel):
+    """Resumable upload state"""
+    id: UUID
+    filename: Optional[str]
+    content_type: Optional[str]
+    size: int
+    received: int  # bytes stored so far; resume from this offset
+    chunk_size: int  # suggested bytes per PUT
+    expires_at: datetime
@@ -3,12 +3,54 @@ Calendar service - Mock implementation
 TODO: Connect to database
 """
 from uuid import UUID, uuid4
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Optional
+from heapq import heappop, heappush, merge
+from itertools import islice
+from typing import Iterator, Optional
+
+from dateutil.rrule import rrule, rrulestr
 
 from models.calendar import CalendarEvent
-from schemas.calendar import CreateEventRequest, UpdateEventRequest, EventResponse
-from core.exceptions import NotFoundException
+from schemas.calendar import (
+    CreateEventRequest,
+    UpdateEventRequest,
+    EventResponse,
+    EventConflict,
+    EventWithConflictsResponse,
+    BusyInterval,
+    FreeBusyResponse,
+    CalendarGridSlot,
+    CalendarGridResponse
+)
+from core.datetimes import to_local_naive
+from core.exceptions import NotFoundException, BadRequestException
+from core.indexing import SortedIndex
+from core.pagination import encode_cursor, decode_cursor, paginate_index
+
+# How far ahead a series is expanded when the requested window has no end
+RECURRENCE_HORIZON = timedelta(days=366)
+
+# Cached grids kept per user before the oldest is evicted
+GRID_CACHE_SIZE = 32
+
+# Suffix of the UIDs events are exported with (the event id comes first)
+EXPORT_UID_SUFFIX = "@moments"
+
+# Distinguishes version counters across restarts in ETags
+_BOOT_ID = uuid4().hex[:8]
+
+
+def parse_recurrence_rule(rule: str, dtstart: datetime) -> rrule:
+    """Parse an RRULE string anchored at the series start"""
+    try:
+        parsed = rrulestr(rule, dtstart=dtstart)
+    except (ValueError, TypeError) as exc:
+        raise BadRequestException(detail=f"Invalid recurrence rule: {exc}")
+    if not isinstance(parsed, rrule):
+        raise BadRequestException(detail="Recurrence rule must be a single RRULE")
+    return parsed
 
 
 class CalendarService:
@@ -16,6 +58,18 @@ class CalendarService:
     
     def __init__(self):
         self.mock_events: dict[UUID, CalendarEvent] = {}
+        # Per-user single events ordered by start_time
+        self._index: dict[UUID, SortedIndex] = defaultdict(SortedIndex)
+        # Per-user recurring series, expanded only inside requested windows
+        self._series: dict[UUID, dict[UUID, rrule]] = defaultdict(dict)
+        # Upper bound on single-event duration per user, bounds overlap lookbehind
+        self._max_duration: dict[UUID, timedelta] = defaultdict(timedelta)
+        # Per-user aggregated view grids keyed by (view, period start)
+        self._grid_cache: dict[UUID, dict[tuple[str, datetime], CalendarGridResponse]] = {}
+        # Per-user imported events by iCalendar UID, so re-imports update them
+        self._by_uid: dict[UUID, dict[str, UUID]] = defaultdict(dict)
+        # Per-user change counter, bumped on every write (feeds ETags)
+        self._versions: dict[UUID, int] = defaultdict(int)
         self._seed_mock_data()
     
     def _seed_mock_data(self):
@@ -52,7 +106,7 @@ class CalendarService:
         
         for data in events_data:
             event_id = uuid4()
-            self.mock_events[event_id] = CalendarEvent(
+            self._store(CalendarEvent(
                 id=event_id,
                 user_id=user_id,
                 all_day=False,
@@ -61,12 +115,195 @@ class CalendarService:
                 created_at=datetime.now(),
                 updated_at=datetime.now(),
                 **data
+            ))
+    
+    def _touch(self, user_id: UUID):
+        """Record a change to the user's events and drop derived caches"""
+        self._versions[user_id] += 1
+        self._grid_cache.pop(user_id, None)
+    
+    def _store(self, event: CalendarEvent, rule: Optional[rrule] = None):
+        """Add event to the user's time index or series map, then save it"""
+        self._touch(event.user_id)
+        if event.recurrence_rule:
+            self._series[event.user_id][event.id] = rule or parse_recurrence_rule(
+                event.recurrence_rule, event.start_time
             )
+        else:
+            self._index[event.user_id].add(event.start_time, event.id)
+            duration = event.end_time - event.start_time
+            if duration > self._max_duration[event.user_id]:
+                self._max_duration[event.user_id] = duration
+        if event.ical_uid:
+            self._by_uid[event.user_id][event.ical_uid] = event.id
+        # Only after indexing succeeded, so a stored event is always indexed
+        self.mock_events[event.id] = event
+    
+    def _unstore(self, event: CalendarEvent):
+        """Drop event and remove it from the user's time index or series map"""
+        self._touch(event.user_id)
+        if event.recurrence_rule:
+            self._series[event.user_id].pop(event.id, None)
+        else:
+            self._index[event.user_id].remove(event.start_time, event.id)
+        if event.ical_uid and self._by_uid[event.user_id].get(event.ical_uid) == event.id:
+            del self._by_uid[event.user_id][event.ical_uid]
+        del self.mock_events[event.id]
+    
+    def _iter_occurrences(
+        self, user_id: UUID, start_date: Optional[datetime], end_date: Optional[datetime],
+        after: Optional[tuple[datetime, UUID]] = None
+    ) -> Iterator[tuple[datetime, UUID]]:
+        """
+        Lazily expand the user's recurring series inside a window
+        Yields (occurrence, event_id) in order, merged across series, so a
+        page only generates the occurrences up to its end. Only occurrences
+        in [start_date, end_date] (and past the cursor entry `after`) are
+        yielded; an open end is capped at RECURRENCE_HORIZON past the window start.
+        """
+        return merge(*(
+            self._expand_series(event_id, rule, start_date, end_date, after)
+            for event_id, rule in self._series.get(user_id, {}).items()
+        ))
+    
+    def _expand_series(
+        self, event_id: UUID, rule: rrule, start_date: Optional[datetime],
+        end_date: Optional[datetime], after: Optional[tuple[datetime, UUID]]
+    ) -> Iterator[tuple[datetime, UUID]]:
+        event = self.mock_events[event_id]
+        window_start = start_date or event.start_time
+        window_end = end_date or max(window_start, datetime.now()) + RECURRENCE_HORIZON
+        if after is not None:
+            window_start = max(window_start, after[0])
+        exdates = set(event.recurrence_exdates)
+        for occurrence in rule.xafter(window_start, inc=True):
+            if occurrence > window_end:
+                return
+            if occurrence in exdates or (after is not None and (occurrence, event_id) <= after):
+                continue
+            yield occurrence, event_id
+    
+    def _overlapping(
+        self, user_id: UUID, start: datetime, end: datetime
+    ) -> list[tuple[datetime, datetime, UUID, Optional[datetime]]]:
+        """
+        Events and occurrences intersecting [start, end), ordered by start
+        Single events come from the time index, looking back by the user's
+        longest event so ones that started before the window are included.
+        """
+        intervals = []
+        index = self._index.get(user_id)
+        if index is not None:
+            lo, hi = index.bounds(start - self._max_duration[user_id], end)
+            for event_start, event_id in index.iter_entries(lo, hi):
+                event_end = self.mock_events[event_id].end_time
+                if event_start < end and event_end > start:
+                    intervals.append((event_start, event_end, event_id, None))
+        
+        for event_id, rule in self._series.get(user_id, {}).items():
+            event = self.mock_events[event_id]
+            duration = event.end_time - event.start_time
+            exdates = set(event.recurrence_exdates)
+            for occurrence in rule.between(start - duration, end, inc=True):
+                if occurrence < end and occurrence + duration > start and occurrence not in exdates:
+                    intervals.append((occurrence, occurrence + duration, event_id, occurrence))
+        
+        intervals.sort(key=lambda interval: (interval[0], interval[1]))
+        return intervals
+    
+    def _sweep(
+        self, intervals: list[tuple[datetime, datetime, UUID, Optional[datetime]]],
+        start: datetime, end: datetime
+    ) -> tuple[list[BusyInterval], list[EventConflict]]:
+        """
+        Single sweep over start-ordered intervals
+        Merges them into busy blocks clipped to the window and, using a heap
+        of active end times, records which intervals overlap each other.
+        """
+        busy: list[list] = []
+        active: list[tuple[datetime, int]] = []
+        overlaps: dict[int, list[int]] = defaultdict(list)
+        
+        for position, (interval_start, interval_end, event_id, _) in enumerate(intervals):
+            while active and active[0][0] <= interval_start:
+                heappop(active)
+            for _, other in active:
+                overlaps[position].append(other)
+                overlaps[other].append(position)
+            heappush(active, (interval_end, position))
+            
+            if busy and interval_start <= busy[-1][1]:
+                busy[-1][1] = max(busy[-1][1], interval_end)
+                busy[-1][2].append(event_id)
+            else:
+                busy.append([interval_start, interval_end, [event_id]])
+        
+        busy_intervals = [
+            BusyInterval(start=max(block_start, start), end=min(block_end, end), event_ids=event_ids)
+            for block_start, block_end, event_ids in busy
+        ]
+        conflicts = []
+        for position in sorted(overlaps):
+            interval_start, interval_end, event_id, recurrence_id = intervals[position]
+            conflicts.append(EventConflict(
+                event_id=event_id,
+                title=self.mock_events[event_id].title,
+                start_time=interval_start,
+                end_time=interval_end,
+                recurrence_id=recurrence_id,
+                overlaps_with=[intervals[other][2] for other in overlaps[position]]
+            ))
+        return busy_intervals, conflicts
+    
+    def _find_conflicts(self, event: CalendarEvent) -> list[EventConflict]:
+        """
+        Other events overlapping any of an event's occurrences
+        A series is checked occurrence by occurrence up to RECURRENCE_HORIZON
+        ahead; each overlapping interval is reported once.
+        """
+        window_end = event.end_time
+        if event.recurrence_rule:
+            window_end = max(event.start_time, datetime.now()) + RECURRENCE_HORIZON
+        intervals = self._overlapping(event.user_id, event.start_time, window_end)
+        
+        # Own occurrences share one duration, so their ends are sorted like their starts
+        own_starts = [start for start, _, event_id, _ in intervals if event_id == event.id]
+        own_ends = [end for _, end, event_id, _ in intervals if event_id == event.id]
+        return [
+            EventConflict(
+                event_id=event_id,
+                title=self.mock_events[event_id].title,
+                start_time=interval_start,
+                end_time=interval_end,
+                recurrence_id=recurrence_id,
+                overlaps_with=[event.id]
+            )
+            for interval_start, interval_end, event_id, recurrence_id in intervals
+            if event_id != event.id
+            and bisect_right(own_ends, interval_start) < bisect_left(own_starts, interval_end)
+        ]
+    
+    def _to_response(
+        self, event: CalendarEvent, occurrence: Optional[datetime] = None
+    ) -> EventResponse:
+        """Build a response for an event or for one occurrence of a series"""
+        if occurrence is None or not event.recurrence_rule:
+            return EventResponse(**event.model_dump())
+        return EventResponse(**{
+            **event.model_dump(),
+            "start_time": occurrence,
+            "end_time": occurrence + (event.end_time - event.start_time),
+            "recurrence_id": occurrence,
+        })
     
     async def create_event(
         self, user_id: UUID, request: CreateEventRequest
-    ) -> EventResponse:
+    ) -> EventWithConflictsResponse:
         """Create calendar event"""
+        rule = None
+        if request.recurrence_rule:
+            rule = parse_recurrence_rule(request.recurrence_rule, request.start_time)
+        
         event_id = uuid4()
         event = CalendarEvent(
             id=event_id,
@@ -76,29 +313,115 @@ class CalendarService:
             **request.model_dump()
         )
         
-        self.mock_events[event_id] = event
-        return EventResponse(**event.model_dump())
+        self._store(event, rule)
+        return EventWithConflictsResponse(
+            **event.model_dump(), conflicts=self._find_conflicts(event)
+        )
     
     async def get_events(
         self, user_id: UUID, start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None, page: int = 1, limit: int = 50
-    ) -> tuple[list[EventResponse], int]:
-        """Get calendar events with optional date filtering"""
-        filtered = [
-            e for e in self.mock_events.values()
-            if e.user_id == user_id and
-            (start_date is None or e.start_time >= start_date) and
-            (end_date is None or e.start_time <= end_date)
-        ]
+        end_date: Optional[datetime] = None, page: int = 1, limit: int = 50,
+        cursor: Optional[str] = None, include_total: bool = True
+    ) -> tuple[list[EventResponse], Optional[int], Optional[str]]:
+        """
+        Get calendar events with optional date filtering
+        Recurring series are expanded into occurrences inside the window only.
+        Returns the page, the total (if requested) and the next-page cursor.
+        """
+        start_date, end_date = to_local_naive(start_date), to_local_naive(end_date)
+        index = self._index.get(user_id) or SortedIndex()
+        
+        # Binary search the window, then slice the page straight from the index
+        lo, hi = index.bounds(start_date, end_date)
         
-        filtered.sort(key=lambda x: x.start_time)
+        if not self._series.get(user_id):
+            entries, next_cursor = paginate_index(index, lo, hi, page, limit, cursor)
+            paginated = [self._to_response(self.mock_events[event_id]) for _, event_id in entries]
+            return paginated, (hi - lo) if include_total else None, next_cursor
         
-        total = len(filtered)
-        start = (page - 1) * limit
-        end = start + limit
-        paginated = filtered[start:end]
+        total = None
+        if include_total:
+            total = (hi - lo) + sum(1 for _ in self._iter_occurrences(user_id, start_date, end_date))
         
-        return [EventResponse(**e.model_dump()) for e in paginated], total
+        after = None
+        if cursor is not None:
+            after = decode_cursor(cursor, datetime)
+            lo = max(lo, index.position(*after, after=True))
+            offset = 0
+        else:
+            offset = (page - 1) * limit
+        occurrences = self._iter_occurrences(user_id, start_date, end_date, after)
+        
+        merged = list(islice(merge(index.iter_entries(lo, hi), occurrences), offset, offset + limit + 1))
+        next_cursor = encode_cursor(*merged[limit - 1]) if len(merged) > limit else None
+        paginated = [
+            self._to_response(self.mock_events[event_id], start_time)
+            for start_time, event_id in merged[:limit]
+        ]
+        
+        return paginated, total, next_cursor
+    
+    def iter_user_events(self, user_id: UUID) -> Iterator[CalendarEvent]:
+        """Lazily yield a user's single events in start order, then their series"""
+        event_ids = self._index[user_id].ids() + list(self._series.get(user_id, {}))
+        for event_id in event_ids:
+            event = self.mock_events.get(event_id)
+            if event is not None:
+                yield event
+    
+    def get_etag(self, user_id: UUID) -> str:
+        """Entity tag that changes whenever the user's events change"""
+        return f'"{_BOOT_ID}-{user_id.hex[:8]}-{self._versions[user_id]}"'
+    
+    def _imported_event(self, user_id: UUID, uid: str) -> Optional[CalendarEvent]:
+        """The user's event with an iCalendar UID: imported with it, or exported as it"""
+        event_id = self._by_uid.get(user_id, {}).get(uid)
+        if event_id is None and uid.endswith(EXPORT_UID_SUFFIX):
+            try:
+                event_id = UUID(uid[:-len(EXPORT_UID_SUFFIX)])
+            except ValueError:
+                return None
+        event = self.mock_events.get(event_id) if event_id is not None else None
+        return event if event is not None and event.user_id == user_id else None
+    
+    async def import_events(
+        self, user_id: UUID, requests: list[tuple[Optional[str], CreateEventRequest]]
+    ) -> tuple[int, list[str]]:
+        """
+        Insert a batch of (uid, request) events without building responses or conflict checks
+        Events whose UID was imported (or exported) before are updated in place.
+        Returns how many were updated and an error message for each event that was rejected.
+        """
+        updated = 0
+        errors = []
+        now = datetime.now()
+        for uid, request in requests:
+            try:
+                rule = None
+                if request.recurrence_rule:
+                    rule = parse_recurrence_rule(request.recurrence_rule, request.start_time)
+            except BadRequestException as exc:
+                errors.append(exc.detail)
+                continue
+            
+            existing = self._imported_event(user_id, uid) if uid else None
+            if existing is not None:
+                self._unstore(existing)
+                for field, value in request.model_dump().items():
+                    setattr(existing, field, value)
+                existing.updated_at = now
+                self._store(existing, rule)
+                updated += 1
+                continue
+            self._store(CalendarEvent(
+                id=uuid4(),
+                user_id=user_id,
+                created_at=now,
+                updated_at=now,
+                ical_uid=uid,
+                **request.model_dump()
+            ), rule)
+        return updated, errors
     
     async def get_event_by_id(self, user_id: UUID, event_id: UUID) -> EventResponse:
         """Get event by ID"""
@@ -110,16 +433,137 @@ class CalendarService:
     
     async def update_event(
         self, user_id: UUID, event_id: UUID, request: UpdateEventRequest
-    ) -> EventResponse:
+    ) -> EventWithConflictsResponse:
         """Update calendar event"""
         event = self.mock_events.get(event_id)
         if not event or event.user_id != user_id:
             raise NotFoundException(detail="Calendar event not found")
         
         update_data = request.model_dump(exclude_unset=True)
+        if update_data.get("recurrence_exdates", []) is None:
+            update_data["recurrence_exdates"] = []
+        
+        # Validate the new rule before touching stored state
+        rule = None
+        recurrence_rule = update_data.get("recurrence_rule", event.recurrence_rule)
+        if recurrence_rule:
+            rule = parse_recurrence_rule(
+                recurrence_rule, update_data.get("start_time") or event.start_time
+            )
+        
+        self._unstore(event)
         for field, value in update_data.items():
             setattr(event, field, value)
+        event.updated_at = datetime.now()
+        self._store(event, rule)
+        
+        return EventWithConflictsResponse(
+            **event.model_dump(), conflicts=self._find_conflicts(event)
+        )
+    
+    async def get_free_busy(
+        self, user_id: UUID, start: datetime, end: datetime
+    ) -> FreeBusyResponse:
+        """Merged busy intervals and overlapping events within a window"""
+        start, end = to_local_naive(start), to_local_naive(end)
+        if end <= start:
+            raise BadRequestException(detail="end must be after start")
+        
+        busy, conflicts = self._sweep(self._overlapping(user_id, start, end), start, end)
+        return FreeBusyResponse(start=start, end=end, busy=busy, conflicts=conflicts)
+    
+    async def get_grid(
+        self, user_id: UUID, view: str, anchor: Optional[datetime] = None
+    ) -> CalendarGridResponse:
+        """
+        Aggregated grid for the period containing anchor
+        month: one slot per day, day: one per hour, hour: one per 15 minutes.
+        Grids are cached per user and period until the user's events change.
+        """
+        anchor = to_local_naive(anchor) or datetime.now()
+        if view == "month":
+            start = anchor.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            end = (start + timedelta(days=32)).replace(day=1)
+            slot_length = timedelta(days=1)
+        elif view == "day":
+            start = anchor.replace(hour=0, minute=0, second=0, microsecond=0)
+            end = start + timedelta(days=1)
+            slot_length = timedelta(hours=1)
+        elif view == "hour":
+            start = anchor.replace(minute=0, second=0, microsecond=0)
+            end = start + timedelta(hours=1)
+            slot_length = timedelta(minutes=15)
+        else:
+            raise BadRequestException(detail="view must be one of: month, day, hour")
+        
+        cache = self._grid_cache.setdefault(user_id, {})
+        cached = cache.get((view, start))
+        if cached is not None:
+            return cached
+        
+        slot_count = (end - start) // slot_length
+        counts = [0] * slot_count
+        busy_time = [timedelta(0)] * slot_count
+        categories: list[dict[str, Optional[str]]] = [{} for _ in range(slot_count)]
+        
+        intervals = self._overlapping(user_id, start, end)
+        for interval_start, interval_end, event_id, _ in intervals:
+            event = self.mock_events[event_id]
+            first = max(0, (interval_start - start) // slot_length)
+            last = min(slot_count - 1, (interval_end - start - timedelta(microseconds=1)) // slot_length)
+            for slot in range(first, last + 1):
+                counts[slot] += 1
+                if event.category or event.color:
+                    categories[slot].setdefault(event.category or "other", event.color)
+        
+        busy, _ = self._sweep(intervals, start, end)
+        for block in busy:
+            first = (block.start - start) // slot_length
+            last = min(slot_count - 1, (block.end - start - timedelta(microseconds=1)) // slot_length)
+            for slot in range(first, last + 1):
+                slot_start = start + slot * slot_length
+                overlap = min(block.end, slot_start + slot_length) - max(block.start, slot_start)
+                busy_time[slot] += overlap
+        
+        grid = CalendarGridResponse(
+            view=view,
+            start=start,
+            end=end,
+            slots=[
+                CalendarGridSlot(
+                    start=start + slot * slot_length,
+                    end=start + (slot + 1) * slot_length,
+                    count=counts[slot],
+                    occupancy=round(busy_time[slot] / slot_length, 3),
+                    categories=categories[slot]
+                )
+                for slot in range(slot_count)
+            ]
+        )
+        
+        if len(cache) >= GRID_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[(view, start)] = grid
+        return grid
+    
+    async def cancel_occurrence(
+        self, user_id: UUID, event_id: UUID, occurrence_start: datetime
+    ) -> EventResponse:
+        """Cancel a single occurrence of a recurring event"""
+        occurrence_start = to_local_naive(occurrence_start)
+        event = self.mock_events.get(event_id)
+        if not event or event.user_id != user_id:
+            raise NotFoundException(detail="Calendar event not found")
+        
+        rule = self._series[user_id].get(event_id)
+        if rule is None:
+            raise BadRequestException(detail="Calendar event is not recurring")
+        if occurrence_start not in rule.between(occurrence_start, occurrence_start, inc=True):
+            raise NotFoundException(detail="Occurrence not found in series")
         
+        if occurrence_start not in event.recurrence_exdates:
+            event.recurrence_exdates.append(occurrence_start)
+            self._touch(user_id)
         event.updated_at = datetime.now()
         return EventResponse(**event.model_dump())
     
@@ -129,7 +573,7 @@ class CalendarService:
         if not event or event.user_id != user_id:
             raise NotFoundException(detail="Calendar event not found")
         
-        del self.mock_events[event_id]
+        self._unstore(event)
 
 
 # Singleton instance
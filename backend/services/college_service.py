@@ -2,7 +2,9 @@
 College service - Mock implementation
 TODO: Connect to database
 """
+import time
 from uuid import UUID, uuid4
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -12,7 +14,35 @@ from schemas.college import (
     UpdateCollegeTaskRequest,
     CollegeTaskResponse
 )
+from core.datetimes import to_local_naive
 from core.exceptions import NotFoundException
+from core.events import event_bus, COLLEGE_CHANGED
+from core.scheduler import DeadlineScheduler
+from core.indexing import SortedIndex
+from core.pagination import paginate_merged
+
+# Statuses a task leaves the overdue set with
+DONE_STATUSES = ("completed",)
+
+OVERDUE_STATUS = "overdue"
+
+# Status an overdue task returns to when its due date is pushed back
+REOPENED_STATUS = "pending"
+
+
+def _sort_key(task: CollegeTask) -> tuple:
+    """Due date (nulls last), then created_at"""
+    return (task.due_date is None, task.due_date or datetime.max, task.created_at)
+
+
+def _awaits_deadline(task: CollegeTask) -> bool:
+    """Whether the task should turn overdue when its due date passes"""
+    return task.due_date is not None and task.status not in DONE_STATUSES and task.status != OVERDUE_STATUS
+
+
+def _due_bound(due: datetime) -> tuple:
+    """Highest sort key of tasks due at or before due"""
+    return (False, due, datetime.max)
 
 
 class CollegeService:
@@ -20,6 +50,11 @@ class CollegeService:
     
     def __init__(self):
         self.mock_tasks: dict[UUID, CollegeTask] = {}
+        # Per-user tasks ordered by _sort_key, overall and per status
+        self._index: dict[UUID, SortedIndex] = defaultdict(SortedIndex)
+        self._by_status: dict[UUID, dict[str, SortedIndex]] = defaultdict(lambda: defaultdict(SortedIndex))
+        # Open tasks with a due date, flipped to overdue when it passes
+        self._deadlines = DeadlineScheduler(self._mark_overdue)
         self._seed_mock_data()
     
     def _seed_mock_data(self):
@@ -61,13 +96,81 @@ class CollegeService:
         
         for data in tasks_data:
             task_id = uuid4()
-            self.mock_tasks[task_id] = CollegeTask(
+            self._store(CollegeTask(
                 id=task_id,
                 user_id=user_id,
                 created_at=datetime.now() - timedelta(days=7),
                 updated_at=datetime.now(),
                 **data
-            )
+            ))
+    
+    def _store(self, task: CollegeTask):
+        """Add task to the user's due-date indexes, then save it"""
+        key = _sort_key(task)
+        self._index[task.user_id].add(key, task.id)
+        self._by_status[task.user_id][task.status].add(key, task.id)
+        # Only after indexing succeeded, so a stored task is always indexed
+        self.mock_tasks[task.id] = task
+        if _awaits_deadline(task):
+            self._deadlines.schedule(task.id, task.due_date.timestamp())
+        else:
+            self._deadlines.cancel(task.id)
+        event_bus.publish(COLLEGE_CHANGED, user_id=task.user_id, due=task.due_date)
+    
+    def _unstore(self, task: CollegeTask):
+        """Drop task and remove it from the user's due-date indexes"""
+        self._index[task.user_id].remove(_sort_key(task), task.id)
+        self._by_status[task.user_id][task.status].remove(_sort_key(task), task.id)
+        self._deadlines.cancel(task.id)
+        del self.mock_tasks[task.id]
+        event_bus.publish(COLLEGE_CHANGED, user_id=task.user_id, due=task.due_date)
+    
+    def _mark_overdue(self, task_ids: list[UUID]):
+        """Flip tasks whose due date has passed to overdue"""
+        now = datetime.now()
+        for task_id in task_ids:
+            task = self.mock_tasks.get(task_id)
+            if not task or not _awaits_deadline(task):
+                continue
+            self._unstore(task)
+            task.status = OVERDUE_STATUS
+            task.updated_at = now
+            self._store(task)
+    
+    def start_overdue_transitions(self):
+        """Rebuild due-date deadlines from the store and start flipping tasks to overdue"""
+        self._deadlines.rebuild(
+            (task.id, task.due_date.timestamp()) for task in self.mock_tasks.values() if _awaits_deadline(task)
+        )
+        self._deadlines.start()
+    
+    async def stop_overdue_transitions(self):
+        await self._deadlines.stop()
+    
+    def _segments(
+        self, user_id: UUID, status: Optional[str] = None,
+        due_before: Optional[datetime] = None, overdue: bool = False, per_status: bool = False
+    ) -> dict[Optional[str], tuple[SortedIndex, int, int]]:
+        """
+        Index ranges holding the matching tasks, keyed by status (None for
+        the all-status index unless per_status). Overdue means due before
+        now and not done.
+        """
+        due_before = to_local_naive(due_before)
+        high = _due_bound(due_before) if due_before is not None else None
+        if overdue:
+            now = (False, datetime.now())
+            high = min(high, now) if high is not None else now
+        
+        if status is None and not overdue and not per_status:
+            indexes = {None: self._index.get(user_id) or SortedIndex()}
+        else:
+            by_status = self._by_status.get(user_id, {})
+            statuses = [status] if status is not None else list(by_status)
+            if overdue:
+                statuses = [s for s in statuses if s not in DONE_STATUSES]
+            indexes = {s: by_status[s] for s in statuses if s in by_status}
+        return {s: (index, *index.bounds(high=high)) for s, index in indexes.items()}
     
     async def create_task(
         self, user_id: UUID, request: CreateCollegeTaskRequest
@@ -82,27 +185,30 @@ class CollegeService:
             **request.model_dump()
         )
         
-        self.mock_tasks[task_id] = task
+        self._store(task)
         return CollegeTaskResponse(**task.model_dump())
     
     async def get_tasks(
-        self, user_id: UUID, status: Optional[str] = None, page: int = 1, limit: int = 20
-    ) -> tuple[list[CollegeTaskResponse], int]:
-        """Get college tasks with pagination"""
-        filtered = [
-            t for t in self.mock_tasks.values()
-            if t.user_id == user_id and (status is None or t.status == status)
-        ]
-        
-        # Sort by due date (nulls last) then by created_at
-        filtered.sort(key=lambda x: (x.due_date is None, x.due_date or datetime.max, x.created_at))
-        
-        total = len(filtered)
-        start = (page - 1) * limit
-        end = start + limit
-        paginated = filtered[start:end]
-        
-        return [CollegeTaskResponse(**t.model_dump()) for t in paginated], total
+        self, user_id: UUID, status: Optional[str] = None, page: int = 1, limit: int = 20,
+        cursor: Optional[str] = None, include_total: bool = True,
+        due_before: Optional[datetime] = None, overdue: bool = False
+    ) -> tuple[list[CollegeTaskResponse], Optional[int], Optional[str]]:
+        """Get college tasks with pagination, by due date (nulls last) then created_at"""
+        segments = self._segments(user_id, status, due_before, overdue)
+        entries, next_cursor = paginate_merged(
+            list(segments.values()), page, limit, cursor, key_type=(bool, datetime, datetime)
+        )
+        paginated = [self.mock_tasks[task_id] for _, task_id in entries]
+        total = sum(stop - start for _, start, stop in segments.values()) if include_total else None
+        return [CollegeTaskResponse(**t.model_dump()) for t in paginated], total, next_cursor
+    
+    async def count_tasks(
+        self, user_id: UUID, due_before: Optional[datetime] = None, overdue: bool = False
+    ) -> dict[str, int]:
+        """Matching task count per status, from index range bounds"""
+        segments = self._segments(user_id, due_before=due_before, overdue=overdue, per_status=True)
+        counts = {s: stop - start for s, (_, start, stop) in segments.items()}
+        return {s: n for s, n in counts.items() if n}
     
     async def get_task_by_id(self, user_id: UUID, task_id: UUID) -> CollegeTaskResponse:
         """Get college task by ID"""
@@ -121,11 +227,22 @@ class CollegeService:
             raise NotFoundException(detail="College task not found")
         
         update_data = request.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(task, field, value)
+        updated = task.model_copy(update={**update_data, "updated_at": datetime.now()})
         
-        task.updated_at = datetime.now()
-        return CollegeTaskResponse(**task.model_dump())
+        # Moving an overdue task's due date into the future reopens it
+        if (
+            updated.status == OVERDUE_STATUS and "status" not in update_data
+            and updated.due_date is not None and updated.due_date.timestamp() > time.time()
+        ):
+            updated.status = REOPENED_STATUS
+        
+        self._unstore(task)
+        try:
+            self._store(updated)
+        except Exception:
+            self._store(task)
+            raise
+        return CollegeTaskResponse(**updated.model_dump())
     
     async def delete_task(self, user_id: UUID, task_id: UUID):
         """Delete college task"""
@@ -133,7 +250,7 @@ class CollegeService:
         if not task or task.user_id != user_id:
             raise NotFoundException(detail="College task not found")
         
-        del self.mock_tasks[task_id]
+        self._unstore(task)
 
 
 # Singleton instance
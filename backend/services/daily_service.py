@@ -2,78 +2,293 @@
 Daily summary service - Aggregates data from multiple sources
 TODO: Connect to database
 """
+import asyncio
+import time as timer
+from collections import OrderedDict, defaultdict
 from uuid import UUID
-from datetime import date
-from typing import Optional
+from datetime import date, datetime, time, timedelta
+from itertools import takewhile
+from typing import Any, AsyncIterator, Awaitable, Iterable, Iterator, Optional
 
-from schemas.daily import DailySummaryResponse
+from config import settings
+from core.events import event_bus, HEALTH_CHANGED, JOURNAL_CHANGED, COLLEGE_CHANGED
+from core.exceptions import BadRequestException
+from schemas.daily import DailySummaryResponse, DailySummarySourceStatus
 from services.health_service import health_service
 from services.college_service import college_service
 from services.journal_service import journal_service
 
+# Materialized summaries kept (least recently used are dropped first)
+MAX_CACHED_SUMMARIES = 10000
+
+# Users who requested a summary this recently get tomorrow's precomputed
+ACTIVE_USER_WINDOW = timedelta(days=7)
+
+# How long before midnight tomorrow's summaries are built
+PRECOMPUTE_LEAD = timedelta(minutes=5)
+
+# Items listed per section of a summary
+COLLEGE_TASKS_PER_DAY = 50
+JOURNAL_ENTRIES_PER_DAY = 10
+
+# Longest range served by get_summary_range
+MAX_SUMMARY_RANGE_DAYS = 366
+
+# Source status reported by summaries served from the cache
+_CACHED_SOURCE = DailySummarySourceStatus(status="cached", duration_ms=0.0)
+
+
+def _days(start: date, end: date) -> Iterator[date]:
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+async def _timed(source: Awaitable[Any], timeout: float) -> tuple[Any, DailySummarySourceStatus]:
+    """
+    Await one module's lookup, returning (result or None, status with timing)
+    The timeout can only interrupt a lookup while it awaits; a lookup that
+    runs synchronously is timed but always completes.
+    """
+    started = timer.perf_counter()
+    result, status, error = None, "ok", None
+    try:
+        result = await asyncio.wait_for(source, timeout)
+    except asyncio.TimeoutError:
+        status, error = "timeout", f"No response within {timeout:g}s"
+    except Exception as e:
+        status, error = "error", type(e).__name__  # no details: they may expose internals
+    duration_ms = round((timer.perf_counter() - started) * 1000, 3)
+    return result, DailySummarySourceStatus(status=status, duration_ms=duration_ms, error=error)
+
+
+async def iter_ndjson(summaries: AsyncIterator[DailySummaryResponse]) -> AsyncIterator[str]:
+    """
+    NDJSON lines for a run of summaries
+    Consecutive days list mostly the same college tasks, so each task is
+    serialized once and spliced into every line that lists it.
+    """
+    task_json: dict[tuple[UUID, datetime], str] = {}
+    async for summary in summaries:
+        tasks = []
+        for task in summary.college_tasks:
+            key = (task.id, task.updated_at)
+            encoded = task_json.get(key)
+            if encoded is None:
+                encoded = task_json[key] = task.model_dump_json()
+            tasks.append(encoded)
+        head = summary.model_dump_json(exclude={"college_tasks"})
+        yield f'{head[:-1]},"college_tasks":[{",".join(tasks)}]}}\n'
+
 
 class DailySummaryService:
-    """Daily summary service - aggregates data from multiple modules"""
+    """
+    Daily summary service - aggregates data from multiple modules
+    Built summaries are materialized per (user, date) and dropped when a
+    health, journal or college write touching that date is published.
+    """
     
-    async def get_summary(self, user_id: UUID, summary_date: Optional[date] = None) -> DailySummaryResponse:
+    def __init__(self):
+        self._cache: OrderedDict[tuple[UUID, date], DailySummaryResponse] = OrderedDict()
+        self._cached_days: dict[UUID, set[date]] = defaultdict(set)
+        # Bumped on every invalidation, so a build that raced a write is not cached
+        self._versions: dict[UUID, int] = defaultdict(int)
+        self._last_seen: dict[UUID, date] = {}
+        self._precompute_task: Optional[asyncio.Task] = None
+        event_bus.subscribe(HEALTH_CHANGED, self._on_day_changed)
+        event_bus.subscribe(JOURNAL_CHANGED, self._on_day_changed)
+        event_bus.subscribe(COLLEGE_CHANGED, self._on_college_changed)
+    
+    def _invalidate(self, user_id: UUID, days: Iterable[date]):
+        self._versions[user_id] += 1
+        cached = self._cached_days.get(user_id)
+        if not cached:
+            return
+        for day in days:
+            if day in cached:
+                cached.discard(day)
+                self._cache.pop((user_id, day), None)
+    
+    def _on_day_changed(self, user_id: UUID, day: date):
+        self._invalidate(user_id, (day,))
+    
+    def _on_college_changed(self, user_id: UUID, due: Optional[datetime]):
+        # Summaries list tasks due by their date, so every later day is affected
+        if due is not None:
+            cached = self._cached_days.get(user_id, ())
+            self._invalidate(user_id, [day for day in cached if day >= due.date()])
+    
+    def _remember(self, summary: DailySummaryResponse, version: int):
         """
-        Get daily summary for a specific date
-        Aggregates data from health, college, journal, expenses
+        Cache a fully built summary unless a write landed while it was built
+        The cached copy is marked as such, so hits do not report the
+        original build's timings as their own.
         """
-        if summary_date is None:
-            summary_date = date.today()
-        
-        # Fetch health entry for the date
-        health_entries, _ = await health_service.get_entries(
-            user_id=user_id,
-            date=summary_date,
-            page=1,
-            limit=1
-        )
-        health_entry = health_entries[0] if health_entries else None
-        
-        # Fetch college tasks (due today or overdue)
-        college_tasks, _ = await college_service.get_tasks(
-            user_id=user_id,
-            page=1,
-            limit=50
-        )
-        
-        # Filter tasks relevant to today
-        relevant_tasks = [
-            t for t in college_tasks
-            if t.due_date and t.due_date.date() <= summary_date
-        ]
-        
-        # Fetch journal entries for the date
-        from datetime import datetime, time
-        start_datetime = datetime.combine(summary_date, time.min)
-        end_datetime = datetime.combine(summary_date, time.max)
-        
-        journal_entries, _ = await journal_service.get_entries(
+        user_id = summary.user_id
+        if summary.degraded or self._versions[user_id] != version:
+            return
+        key = (user_id, summary.date)
+        self._cache[key] = summary.model_copy(update={
+            "cached": True,
+            "sources": {name: _CACHED_SOURCE for name in summary.sources},
+        })
+        self._cache.move_to_end(key)
+        self._cached_days[user_id].add(summary.date)
+        while len(self._cache) > MAX_CACHED_SUMMARIES:
+            (old_user, old_day), _ = self._cache.popitem(last=False)
+            self._cached_days[old_user].discard(old_day)
+    
+    async def _college(self, user_id: UUID, start: date, end: date):
+        """
+        College tasks due by the end of the last day (including overdue),
+        and per-status counts of tasks due by the end of each day
+        """
+        tasks, _, _ = await college_service.get_tasks(
             user_id=user_id,
-            start_date=start_datetime,
-            end_date=end_datetime,
             page=1,
-            limit=10
+            limit=COLLEGE_TASKS_PER_DAY,
+            include_total=False,
+            due_before=datetime.combine(end, time.max)
         )
+        counts = {}
+        for day in _days(start, end):
+            counts[day] = await college_service.count_tasks(user_id, due_before=datetime.combine(day, time.max))
+        return tasks, counts
+    
+    async def _fetch(self, user_id: UUID, start: date, end: date) -> tuple[dict[str, Any], dict[str, DailySummarySourceStatus]]:
+        """
+        Every module's data for start..end, one range read per module
+        Modules are gathered concurrently; one that fails or exceeds
+        DAILY_SUMMARY_SOURCE_TIMEOUT yields None and a degraded status.
+        The current modules are in-memory and never await, so they run one
+        after another and the timeout applies only to lookups that do
+        await (e.g. once a module reads from a database). They are not
+        moved to threads: their state is unlocked and written from the
+        event loop.
+        """
+        timeout = settings.DAILY_SUMMARY_SOURCE_TIMEOUT
+        lookups = {
+            "health": health_service.get_entries_between(user_id, start, end),
+            "college": self._college(user_id, start, end),
+            "journal": journal_service.get_entries_by_day(user_id, start, end, limit=JOURNAL_ENTRIES_PER_DAY),
+        }
+        results = await asyncio.gather(*(_timed(lookup, timeout) for lookup in lookups.values()))
+        data = dict(zip(lookups, (result for result, _ in results)))
+        sources = dict(zip(lookups, (status for _, status in results)))
+        return data, sources
+    
+    def _assemble(
+        self, user_id: UUID, summary_date: date, data: dict[str, Any], sources: dict[str, DailySummarySourceStatus]
+    ) -> DailySummaryResponse:
+        """One day's summary from data fetched for a range containing it"""
+        health_entry = (data["health"] or {}).get(summary_date)
+        journal_entries = (data["journal"] or {}).get(summary_date, [])
+        tasks, counts = data["college"] or ([], {})
+        # Tasks are in due-date order, so the day's tasks are a prefix
+        end_of_day = datetime.combine(summary_date, time.max)
+        college_tasks = list(takewhile(lambda t: t.due_date <= end_of_day, tasks))
+        task_counts = counts.get(summary_date, {})
         
         # Calculate stats
-        tasks_completed = len([t for t in relevant_tasks if t.status == "completed"])
-        tasks_pending = len([t for t in relevant_tasks if t.status != "completed"])
+        tasks_completed = task_counts.get("completed", 0)
+        tasks_pending = sum(task_counts.values()) - tasks_completed
         
         return DailySummaryResponse(
             date=summary_date,
             user_id=user_id,
             health=health_entry,
-            college_tasks=relevant_tasks,
+            college_tasks=college_tasks,
             journal_entries=journal_entries,
             total_expenses=0.0,  # TODO: Fetch from expenses service
             water_intake=health_entry.water if health_entry else 0,
             steps=health_entry.steps if health_entry else 0,
             tasks_completed=tasks_completed,
-            tasks_pending=tasks_pending
+            tasks_pending=tasks_pending,
+            sources=sources,
+            degraded=[name for name, status in sources.items() if status.status != "ok"]
         )
+    
+    async def get_summary(self, user_id: UUID, summary_date: Optional[date] = None) -> DailySummaryResponse:
+        """Get daily summary for a specific date, from the cache when possible"""
+        if summary_date is None:
+            summary_date = date.today()
+        self._last_seen[user_id] = date.today()
+        
+        summary = self._cache.get((user_id, summary_date))
+        if summary is not None:
+            self._cache.move_to_end((user_id, summary_date))
+            return summary
+        version = self._versions[user_id]
+        summary = await self._build(user_id, summary_date)
+        self._remember(summary, version)
+        return summary
+    
+    async def _build(self, user_id: UUID, summary_date: date) -> DailySummaryResponse:
+        """Aggregate data from health, college, journal, expenses"""
+        data, sources = await self._fetch(user_id, summary_date, summary_date)
+        return self._assemble(user_id, summary_date, data, sources)
+    
+    async def get_summary_range(self, user_id: UUID, start: date, end: date) -> AsyncIterator[DailySummaryResponse]:
+        """
+        Summaries for every day from start to end inclusive, oldest first
+        The range is checked up front; days are then produced lazily from
+        one fetch per module (cached days are reused and new ones cached).
+        """
+        if end < start:
+            raise BadRequestException(detail="end must not be before start")
+        if (end - start).days >= MAX_SUMMARY_RANGE_DAYS:
+            raise BadRequestException(detail=f"Range exceeds {MAX_SUMMARY_RANGE_DAYS} days")
+        self._last_seen[user_id] = date.today()
+        return self._iter_range(user_id, start, end)
+    
+    async def _iter_range(self, user_id: UUID, start: date, end: date) -> AsyncIterator[DailySummaryResponse]:
+        version = self._versions[user_id]
+        cached = {day: self._cache.get((user_id, day)) for day in _days(start, end)}
+        data = sources = None
+        if not all(cached.values()):
+            data, sources = await self._fetch(user_id, start, end)
+        for day, summary in cached.items():
+            if summary is None:
+                summary = self._assemble(user_id, day, data, sources)
+                self._remember(summary, version)
+            yield summary
+    
+    async def precompute(self, summary_date: date) -> int:
+        """Build and cache summaries for users active in the last ACTIVE_USER_WINDOW"""
+        since = date.today() - ACTIVE_USER_WINDOW
+        built = 0
+        for user_id in [u for u, seen in self._last_seen.items() if seen >= since]:
+            if (user_id, summary_date) not in self._cache:
+                version = self._versions[user_id]
+                self._remember(await self._build(user_id, summary_date), version)
+                built += 1
+        return built
+    
+    async def _precompute_nightly(self):
+        while True:
+            tomorrow = date.today() + timedelta(days=1)
+            run_at = datetime.combine(tomorrow, time.min) - PRECOMPUTE_LEAD
+            # Sleep in short steps so clock changes are noticed
+            while datetime.now() < run_at:
+                await asyncio.sleep(min(300.0, (run_at - datetime.now()).total_seconds()))
+            await self.precompute(tomorrow)
+            while date.today() < tomorrow:
+                await asyncio.sleep(min(300.0, (datetime.combine(tomorrow, time.min) - datetime.now()).total_seconds()))
+    
+    def start_precompute(self):
+        """Start building active users' summaries for each next day shortly before midnight"""
+        if self._precompute_task is None or self._precompute_task.done():
+            self._precompute_task = asyncio.create_task(self._precompute_nightly())
+    
+    async def stop_precompute(self):
+        if self._precompute_task is not None:
+            self._precompute_task.cancel()
+            try:
+                await self._precompute_task
+            except asyncio.CancelledError:
+                pass
+            self._precompute_task = None
 
 
 # Singleton instance
@@ -0,0 +1,267 @@
+"""
+Daily summary email service
+Opted-in users are sent the day's summary at DAILY_EMAIL_HOUR. Messages
+are rendered in batches by a process pool while the previous batch is
+delivered over a bounded pool of persistent SMTP connections.
+TODO: Persist subscriptions in the database
+"""
+import asyncio
+import logging
+import multiprocessing
+import time as timer
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from email.utils import parseaddr
+from typing import Optional
+from uuid import UUID
+
+from config import settings
+from core.exceptions import BadRequestException, ServiceUnavailableException
+from core.smtp import SMTPPool, SMTPReplyError
+from models.daily import DailyEmailSubscription
+from schemas.daily import (
+    DailyEmailRunStats,
+    DailyEmailSubscriptionRequest,
+    DailyEmailSubscriptionResponse,
+    DailySummaryResponse,
+    EmailDeliveryStatsResponse,
+    SendDailySummaryEmailRequest,
+    SendDailySummaryEmailResponse
+)
+from services.daily_service import daily_service
+from services.email_rendering import load_templates, render_messages
+
+# Processes rendering summary emails
+EMAIL_RENDER_WORKERS = 2
+
+# Messages rendered per worker call, so pickling and IPC are amortized
+RENDER_BATCH_SIZE = 200
+
+logger = logging.getLogger(__name__)
+
+# Failures of a single delivery attempt, after the pool's retries
+_DELIVERY_ERRORS = (SMTPReplyError, OSError, EOFError, asyncio.TimeoutError)
+
+
+def _payload(summary: DailySummaryResponse) -> dict:
+    """What the templates need of a summary, as plain JSON types"""
+    return summary.model_dump(
+        mode="json",
+        exclude={"sources": True, "journal_entries": {"__all__": {"content", "images"}}}
+    )
+
+
+class DailyEmailService:
+    """Daily summary email service with mock subscriptions"""
+
+    def __init__(self):
+        self.mock_subscriptions: dict[UUID, DailyEmailSubscription] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._smtp: Optional[SMTPPool] = None
+        self._schedule_task: Optional[asyncio.Task] = None
+        self._run_lock = asyncio.Lock()
+        self.last_run: Optional[DailyEmailRunStats] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=EMAIL_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=load_templates
+            )
+        return self._pool
+
+    def _mailer(self) -> SMTPPool:
+        if not settings.SMTP_HOST:
+            raise ServiceUnavailableException(detail="Email delivery is not configured")
+        if self._smtp is None:
+            port = settings.SMTP_PORT or (465 if settings.SMTP_USE_TLS else 587 if settings.SMTP_STARTTLS else 25)
+            self._smtp = SMTPPool(
+                settings.SMTP_HOST,
+                port,
+                size=settings.SMTP_POOL_SIZE,
+                username=settings.SMTP_USER,
+                password=settings.SMTP_PASSWORD,
+                use_tls=settings.SMTP_USE_TLS,
+                start_tls=settings.SMTP_STARTTLS
+            )
+        return self._smtp
+
+    def _sender(self) -> str:
+        return parseaddr(settings.SMTP_FROM)[1]
+
+    def _subscription_response(self, subscription: Optional[DailyEmailSubscription]) -> DailyEmailSubscriptionResponse:
+        return DailyEmailSubscriptionResponse(
+            enabled=subscription is not None,
+            recipient_email=subscription.recipient_email if subscription else None,
+            send_hour=settings.DAILY_EMAIL_HOUR,
+            last_sent_date=subscription.last_sent_date if subscription else None
+        )
+
+    async def get_subscription(self, user_id: UUID) -> DailyEmailSubscriptionResponse:
+        """Get a user's scheduled email settings"""
+        return self._subscription_response(self.mock_subscriptions.get(user_id))
+
+    async def update_subscription(
+        self, user_id: UUID, email: str, name: Optional[str], request: DailyEmailSubscriptionRequest
+    ) -> DailyEmailSubscriptionResponse:
+        """Opt a user in to (or out of) the scheduled daily summary email"""
+        if not request.enabled:
+            self.mock_subscriptions.pop(user_id, None)
+            return self._subscription_response(None)
+
+        now = datetime.now()
+        subscription = self.mock_subscriptions.get(user_id)
+        if subscription is None:
+            subscription = DailyEmailSubscription(
+                user_id=user_id,
+                recipient_email=request.recipient_email or email,
+                name=name,
+                created_at=now,
+                updated_at=now
+            )
+            self.mock_subscriptions[user_id] = subscription
+        else:
+            subscription.recipient_email = request.recipient_email or subscription.recipient_email
+            subscription.name = name
+            subscription.updated_at = now
+        return self._subscription_response(subscription)
+
+    async def _render(self, items: list[tuple[dict, str, str, Optional[str]]]) -> list[bytes]:
+        """Messages for items, split evenly across the render workers"""
+        loop = asyncio.get_running_loop()
+        chunk = -(-len(items) // EMAIL_RENDER_WORKERS)
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(self._executor(), render_messages, items[offset:offset + chunk])
+            for offset in range(0, len(items), chunk)
+        ))
+        return [message for part in parts for message in part]
+
+    async def send_summary(
+        self, user_id: UUID, email: str, name: Optional[str], request: SendDailySummaryEmailRequest
+    ) -> SendDailySummaryEmailResponse:
+        """Send one day's summary to the user now"""
+        mailer = self._mailer()
+        summary = await daily_service.get_summary(user_id, request.date)
+        recipient = request.recipient_email or email
+        message, = await self._render([(_payload(summary), settings.SMTP_FROM, recipient, name)])
+        try:
+            await mailer.send(self._sender(), recipient, message)
+        except SMTPReplyError as e:
+            # Only the code: the server's text may describe its internals
+            if e.transient:
+                raise ServiceUnavailableException(detail=f"Mail server deferred the message ({e.code})")
+            raise BadRequestException(detail=f"Mail server refused the message ({e.code})")
+        except (OSError, EOFError, asyncio.TimeoutError):
+            raise ServiceUnavailableException(detail="Mail server unreachable")
+        return SendDailySummaryEmailResponse(date=summary.date, recipient_email=recipient)
+
+    async def _deliver(
+        self, run: DailyEmailRunStats, mailer: SMTPPool, subscription: DailyEmailSubscription, message: bytes
+    ):
+        try:
+            await mailer.send(self._sender(), subscription.recipient_email, message)
+        except _DELIVERY_ERRORS:
+            run.failed += 1
+            return
+        subscription.last_sent_date = run.date
+        run.sent += 1
+
+    async def deliver_all(self, summary_date: date) -> DailyEmailRunStats:
+        """
+        Send summary_date's summary to every subscriber not yet sent it
+        Each batch is rendered while the one before it is being sent.
+        """
+        mailer = self._mailer()
+        async with self._run_lock:
+            subscribers = [s for s in self.mock_subscriptions.values() if s.last_sent_date != summary_date]
+            run = self.last_run = DailyEmailRunStats(
+                date=summary_date,
+                started_at=datetime.now(),
+                recipients=len(subscribers),
+                sent=0,
+                failed=0,
+                render_seconds=0.0,
+                messages_per_second=0.0
+            )
+            started = timer.perf_counter()
+            sending: Optional[asyncio.Future] = None
+            for offset in range(0, len(subscribers), RENDER_BATCH_SIZE):
+                batch = subscribers[offset:offset + RENDER_BATCH_SIZE]
+                summaries = await asyncio.gather(*(daily_service.get_summary(s.user_id, summary_date) for s in batch))
+                items = [
+                    (_payload(summary), settings.SMTP_FROM, s.recipient_email, s.name)
+                    for s, summary in zip(batch, summaries)
+                ]
+                render_started = timer.perf_counter()
+                try:
+                    messages = await self._render(items)
+                except Exception:
+                    logger.exception(
+                        "Rendering %d summary emails for %s failed; the batch is counted as failed",
+                        len(batch), summary_date
+                    )
+                    run.failed += len(batch)
+                    continue
+                finally:
+                    run.render_seconds += timer.perf_counter() - render_started
+                if sending is not None:
+                    await sending
+                sending = asyncio.gather(*(
+                    self._deliver(run, mailer, s, message) for s, message in zip(batch, messages)
+                ))
+            if sending is not None:
+                await sending
+
+            run.finished_at = datetime.now()
+            elapsed = timer.perf_counter() - started
+            run.messages_per_second = round(run.sent / elapsed, 2) if elapsed else 0.0
+            run.render_seconds = round(run.render_seconds, 3)
+            return run
+
+    async def _deliver_daily(self):
+        while True:
+            run_at = datetime.combine(date.today(), time(hour=settings.DAILY_EMAIL_HOUR))
+            if datetime.now() >= run_at:
+                run_at += timedelta(days=1)
+            # Sleep in short steps so clock changes are noticed
+            while datetime.now() < run_at:
+                await asyncio.sleep(min(300.0, (run_at - datetime.now()).total_seconds()))
+            if settings.SMTP_HOST:
+                await self.deliver_all(run_at.date())
+
+    def start_schedule(self):
+        """Start sending opted-in users each day's summary at DAILY_EMAIL_HOUR"""
+        if self._schedule_task is None or self._schedule_task.done():
+            self._schedule_task = asyncio.create_task(self._deliver_daily())
+
+    async def stop_schedule(self):
+        if self._schedule_task is not None:
+            self._schedule_task.cancel()
+            try:
+                await self._schedule_task
+            except asyncio.CancelledError:
+                pass
+            self._schedule_task = None
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def get_stats(self) -> EmailDeliveryStatsResponse:
+        """Subscriber count, SMTP pool counters and the latest delivery run"""
+        pool = self._smtp.stats() if self._smtp else {
+            "size": settings.SMTP_POOL_SIZE, "in_use": 0, "idle": 0,
+            "connections_opened": 0, "sent": 0, "failed": 0, "retries": 0
+        }
+        return EmailDeliveryStatsResponse(
+            subscribers=len(self.mock_subscriptions),
+            pool=pool,
+            last_run=self.last_run
+        )
+
+
+# Singleton instance
+email_service = DailyEmailService()
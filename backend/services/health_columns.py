@@ -0,0 +1,217 @@
+"""
+Columnar per-day health store
+Each user's health data lives in NumPy arrays indexed by date ordinal, so
+range statistics are slice operations instead of walks over entry objects.
+"""
+from datetime import date, timedelta
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from models.health import HealthEntry
+from schemas.health import HealthMetricStats
+
+# Days added whenever a user's arrays need to grow
+GROW_DAYS = 366
+
+# Quantiles reported per metric (p25, p50, p75, p90)
+QUANTILES = np.array([0.25, 0.5, 0.75, 0.9])
+
+_COLUMNS = ("entries", "water", "steps", "calories", "calorie_entries", "bath", "face_wash")
+
+# Columns kept as running totals by RollingTotals
+_ROLLING_COLUMNS = ("entries", "water", "steps", "calories", "calorie_entries")
+
+# Standard dashboard windows, in days
+ROLLING_WINDOWS = (7, 30, 90)
+
+
+class EntryValues(NamedTuple):
+    """Snapshot of the HealthEntry fields the columns and rolling totals read"""
+    date: date
+    water: int
+    steps: int
+    calories: Optional[int]
+    bath: bool
+    face_wash: bool
+
+    @classmethod
+    def of(cls, entry: HealthEntry) -> "EntryValues":
+        return cls(entry.date, entry.water, entry.steps, entry.calories, entry.bath, entry.face_wash)
+
+
+def _contribution(entry: Union[HealthEntry, EntryValues]) -> tuple[int, ...]:
+    """An entry's values for each of _ROLLING_COLUMNS"""
+    has_calories = entry.calories is not None
+    return (1, entry.water, entry.steps, entry.calories or 0, int(has_calories))
+
+
+def _metric_stats(values: np.ndarray) -> Optional[HealthMetricStats]:
+    """
+    Summary statistics of one column over logged days
+    Quantiles use linear interpolation (numpy's default) on a single sort.
+    """
+    if values.size == 0:
+        return None
+    ordered = np.sort(values)
+    positions = QUANTILES * (ordered.size - 1)
+    below = positions.astype(np.int64)
+    above = np.minimum(below + 1, ordered.size - 1)
+    p25, p50, p75, p90 = ordered[below] + (ordered[above] - ordered[below]) * (positions - below)
+    return HealthMetricStats(
+        mean=round(float(values.mean()), 1),
+        min=int(ordered[0]),
+        max=int(ordered[-1]),
+        p25=float(p25),
+        p50=float(p50),
+        p75=float(p75),
+        p90=float(p90)
+    )
+
+
+class HealthColumns:
+    """
+    Per-day columns for one user
+    Slot i holds the sums of all entries dated base + i: the number of
+    entries, water, steps, calories (and how many entries reported them)
+    and the hygiene flag counts.
+    """
+
+    def __init__(self):
+        self.base: Optional[int] = None  # date ordinal of slot 0
+        for name in _COLUMNS:
+            setattr(self, name, np.zeros(0, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _slot(self, day: date) -> int:
+        """Slot for a day, growing the arrays in either direction if needed"""
+        ordinal = day.toordinal()
+        if self.base is None:
+            self.base = ordinal
+        before = max(0, self.base - ordinal)
+        after = max(0, ordinal - self.base - len(self) + 1)
+        if before or after:
+            before = before and before + GROW_DAYS
+            after = after and after + GROW_DAYS
+            for name in _COLUMNS:
+                setattr(self, name, np.pad(getattr(self, name), (before, after)))
+            self.base -= before
+        return ordinal - self.base
+
+    def apply(self, entry: HealthEntry, sign: int = 1):
+        """
+        Add (sign=1) or remove (sign=-1) an entry's contribution
+        Values are converted before any column changes, so an entry that
+        does not fit leaves the columns untouched.
+        """
+        values = np.array(_contribution(entry) + (entry.bath, entry.face_wash), dtype=np.int64) * sign
+        slot = self._slot(entry.date)
+        for name, value in zip(_ROLLING_COLUMNS + ("bath", "face_wash"), values):
+            getattr(self, name)[slot] += value
+
+    def apply_many(self, entries: list[Union[HealthEntry, EntryValues]], sign: int = 1):
+        """Add (or with sign=-1 remove) a batch of entries with one scatter-add per column"""
+        if not entries:
+            return
+        self._slot(min(entry.date for entry in entries))
+        self._slot(max(entry.date for entry in entries))
+        slots = np.fromiter((entry.date.toordinal() for entry in entries), np.int64, len(entries)) - self.base
+        values = np.array(
+            [_contribution(entry) + (entry.bath, entry.face_wash) for entry in entries], dtype=np.int64
+        ) * sign
+        for i, name in enumerate(_ROLLING_COLUMNS + ("bath", "face_wash")):
+            np.add.at(getattr(self, name), slots, values[:, i])
+    
+    def bounds(self, start: date, end: date) -> tuple[int, int]:
+        """Slot range [lo, hi) covering start..end"""
+        if self.base is None:
+            return 0, 0
+        lo = max(0, start.toordinal() - self.base)
+        hi = min(len(self), end.toordinal() - self.base + 1)
+        return lo, max(lo, hi)
+
+    def window_sums(self, start: date, end: date) -> list[int]:
+        """Sums of _ROLLING_COLUMNS over start..end (empty when end < start)"""
+        lo, hi = self.bounds(start, end)
+        return [int(getattr(self, name)[lo:hi].sum()) for name in _ROLLING_COLUMNS]
+
+    def totals(self, lo: int, hi: int) -> tuple[int, int, int, int]:
+        """(entries, water, steps, calories) summed over slots [lo, hi)"""
+        return (
+            int(self.entries[lo:hi].sum()),
+            int(self.water[lo:hi].sum()),
+            int(self.steps[lo:hi].sum()),
+            int(self.calories[lo:hi].sum())
+        )
+
+    def range_stats(self, start: date, end: date) -> dict:
+        """
+        Vectorized statistics for start..end
+        Distributions are over daily totals of logged days. streak is the run
+        of consecutive logged days ending at the last logged day in range.
+        """
+        lo, hi = self.bounds(start, end)
+        entries = self.entries[lo:hi]
+        logged = entries > 0
+        total_entries, total_water, total_steps, total_calories = self.totals(lo, hi)
+        logged_days = int(logged.sum())
+
+        streak = longest_streak = 0
+        if logged_days:
+            last = int(np.flatnonzero(logged)[-1])
+            gaps = np.flatnonzero(~logged[:last + 1])
+            streak = last - int(gaps[-1]) if gaps.size else last + 1
+            edges = np.diff(np.concatenate(([0], logged.astype(np.int8), [0])))
+            longest_streak = int((np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)).max())
+
+        return {
+            "entries": total_entries,
+            "water_total": total_water,
+            "steps_total": total_steps,
+            "calories_total": total_calories,
+            "streak": streak,
+            "longest_streak": longest_streak,
+            "water": _metric_stats(self.water[lo:hi][logged]),
+            "steps": _metric_stats(self.steps[lo:hi][logged]),
+            "calories": _metric_stats(self.calories[lo:hi][self.calorie_entries[lo:hi] > 0]),
+            "bath_rate": round(float(self.bath[lo:hi].sum()) / total_entries, 3) if total_entries else None,
+            "face_wash_rate": round(float(self.face_wash[lo:hi].sum()) / total_entries, 3) if total_entries else None,
+        }
+
+
+class RollingTotals:
+    """
+    Running sums over the `days` days ending at `anchor`
+    Writes adjust the sums in O(1); when the date moves on, the window slides
+    by subtracting the days that left and adding the days that entered, read
+    from the same columns, so the sums always equal a full recomputation.
+    """
+
+    def __init__(self, columns: HealthColumns, days: int):
+        self.columns = columns
+        self.days = days
+        self.anchor: Optional[date] = None
+        self.sums = [0] * len(_ROLLING_COLUMNS)
+
+    @property
+    def start(self) -> date:
+        return self.anchor - timedelta(days=self.days - 1)
+
+    def advance(self, today: date):
+        """Move the window so it ends at today"""
+        if self.anchor == today:
+            return
+        if self.anchor is None or today < self.anchor or (today - self.anchor).days >= self.days:
+            self.sums = self.columns.window_sums(today - timedelta(days=self.days - 1), today)
+        else:
+            leaving = self.columns.window_sums(self.start, today - timedelta(days=self.days))
+            entering = self.columns.window_sums(self.anchor + timedelta(days=1), today)
+            self.sums = [total - out + new for total, out, new in zip(self.sums, leaving, entering)]
+        self.anchor = today
+
+    def apply(self, entry: Union[HealthEntry, EntryValues], sign: int = 1):
+        """Add or remove an entry if it falls inside the current window"""
+        if self.anchor is not None and self.start <= entry.date <= self.anchor:
+            self.sums = [total + sign * value for total, value in zip(self.sums, _contribution(entry))]
@@ -0,0 +1,233 @@
+"""
+Apple Health / Google Fit export parsing
+Exports are read incrementally (expat for XML, a streaming array scanner
+for JSON) and rolled up into per-day totals, so memory depends on the
+number of days, not the file size. This module only uses the standard
+library so import worker processes start quickly.
+"""
+import codecs
+import json
+import re
+import zipfile
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, IO, Iterator, Optional
+from xml.parsers import expat
+
+# Bytes read per parser step
+READ_SIZE = 1024 * 1024
+
+# mL of water in one glass, the unit HealthEntry.water is tracked in
+GLASS_ML = 250
+
+# Apple Health record type -> metric
+APPLE_TYPES = {
+    "HKQuantityTypeIdentifierStepCount": "steps",
+    "HKQuantityTypeIdentifierDietaryWater": "water",
+    "HKQuantityTypeIdentifierDietaryEnergyConsumed": "calories",
+}
+
+# Google Fit data type -> metric
+GOOGLE_FIT_TYPES = {
+    "com.google.step_count.delta": "steps",
+    "com.google.hydration": "water",
+    "com.google.nutrition": "calories",
+}
+
+# Unit -> factor to mL (water) or kcal (energy)
+_UNITS = {
+    "mL": 1.0, "L": 1000.0, "cL": 10.0, "dL": 100.0,
+    "fl_oz_us": 29.5735, "fl_oz_imp": 28.4131, "cup_us": 236.588, "cup_imp": 284.131,
+    "kcal": 1.0, "Cal": 1.0, "cal": 0.001, "kJ": 0.239006, "J": 0.000239006,
+    "count": 1.0,
+}
+
+_POINTS_ARRAY = re.compile(r'"(?:Data Points|point)"\s*:\s*\[')
+
+
+class DailyTotals:
+    """
+    Per-day metric sums, kept per data source
+    Phones and watches often record the same steps, so a day's value for a
+    metric is the largest single-source total rather than the sum of all.
+    """
+
+    def __init__(self):
+        self.sums: dict[tuple[str, str, str], float] = defaultdict(float)  # (day, metric, source)
+        self.records = 0
+
+    def add(self, day: str, metric: str, source: str, value: float):
+        self.sums[(day, metric, source)] += value
+        self.records += 1
+
+    def days(self) -> dict[str, dict[str, int]]:
+        """{YYYY-MM-DD: {metric: value}} with water in glasses and calories in kcal"""
+        best: dict[str, dict[str, float]] = defaultdict(dict)
+        for (day, metric, _), value in self.sums.items():
+            if value > best[day].get(metric, 0):
+                best[day][metric] = value
+        result = {}
+        for day, metrics in best.items():
+            if "water" in metrics:
+                metrics["water"] = metrics["water"] / GLASS_ML
+            result[day] = {metric: round(value) for metric, value in metrics.items()}
+        return result
+
+
+def _read_chunks(stream: IO[bytes], on_read: Callable[[int], None]) -> Iterator[bytes]:
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            return
+        on_read(len(chunk))
+        yield chunk
+
+
+def parse_apple_health(chunks: Iterator[bytes], totals: DailyTotals):
+    """Roll Apple Health export.xml <Record> elements into totals"""
+    def start(name, attrs):
+        if name != "Record":
+            return
+        metric = APPLE_TYPES.get(attrs.get("type"))
+        if metric is None:
+            return
+        # startDate is "YYYY-MM-DD HH:MM:SS +ZZZZ" in the device's local time
+        day = attrs.get("startDate", "")[:10]
+        try:
+            value = float(attrs["value"]) * _UNITS.get(attrs.get("unit", "count"), 1.0)
+        except (KeyError, ValueError):
+            return
+        if len(day) == 10:
+            totals.add(day, metric, attrs.get("sourceName", ""), value)
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    for chunk in chunks:
+        parser.Parse(chunk, False)
+    parser.Parse(b"", True)
+
+
+def _fit_value(metric: str, values: list[dict]) -> Optional[float]:
+    """Numeric value of a Google Fit point, in mL / kcal / steps"""
+    if not values:
+        return None
+    value = values[0].get("value", values[0])  # Takeout nests under "value"
+    if metric == "calories":
+        for field in value.get("mapVal", []):
+            if field.get("key") == "calories":
+                return field.get("value", {}).get("fpVal")
+        return None
+    number = value.get("intVal", value.get("fpVal"))
+    if number is None:
+        return None
+    return number * 1000.0 if metric == "water" else number  # hydration is in liters
+
+
+def _iter_json_points(chunks: Iterator[bytes]) -> Iterator[dict]:
+    """
+    Yield the objects of a "Data Points" (Takeout) or "point" (REST) array
+    Only the current point and the undecoded tail of the input are held.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer, position, in_array, exhausted = "", 0, False, False
+
+    while True:
+        if not in_array:
+            match = _POINTS_ARRAY.search(buffer, position)
+            if match:
+                position, in_array = match.end(), True
+                continue
+            position = max(position, len(buffer) - 32)  # key may straddle chunks
+        else:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer):
+                if buffer[position] == "]":
+                    in_array = False
+                    continue
+                try:
+                    point, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise ValueError("Truncated or invalid Google Fit JSON")
+                else:
+                    position = end
+                    yield point
+                    continue
+        if exhausted:
+            return
+        buffer = buffer[position:]
+        position = 0
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer += text_decoder.decode(b"", final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+
+
+def parse_google_fit(chunks: Iterator[bytes], totals: DailyTotals):
+    """Roll Google Fit data points (Takeout or REST dataset JSON) into totals"""
+    for point in _iter_json_points(chunks):
+        metric = GOOGLE_FIT_TYPES.get(point.get("dataTypeName"))
+        if metric is None:
+            continue
+        value = _fit_value(metric, point.get("fitValue") or point.get("value") or [])
+        if value is None:
+            continue
+        day = datetime.fromtimestamp(int(point.get("startTimeNanos", 0)) / 1e9).date().isoformat()
+        totals.add(day, metric, point.get("originDataSourceId", ""), value)
+
+
+def _members(archive: zipfile.ZipFile, source: str) -> list[zipfile.ZipInfo]:
+    """Archive members holding records (export_cda.xml duplicates export.xml)"""
+    suffix = ".xml" if source == "apple_health" else ".json"
+    return [
+        info for info in archive.infolist()
+        if info.filename.endswith(suffix) and "export_cda" not in info.filename
+    ]
+
+
+def aggregate_export(
+    path: str, source: str, on_read: Callable[[int], None] = lambda size: None
+) -> tuple[dict[str, dict[str, int]], int]:
+    """
+    Parse an export file (plain or zipped) into per-day totals
+    on_read is called with the number of bytes consumed after each read.
+    Returns (days, records).
+    """
+    parse = parse_apple_health if source == "apple_health" else parse_google_fit
+    totals = DailyTotals()
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in _members(archive, source):
+                with archive.open(info) as stream:
+                    parse(_read_chunks(stream, on_read), totals)
+    else:
+        with open(path, "rb") as stream:
+            parse(_read_chunks(stream, on_read), totals)
+    return totals.days(), totals.records
+
+
+def export_size(path: str, source: str) -> int:
+    """Bytes aggregate_export will read: the file, or its unzipped members"""
+    if not zipfile.is_zipfile(path):
+        with open(path, "rb") as stream:
+            return stream.seek(0, 2)
+    with zipfile.ZipFile(path) as archive:
+        return sum(info.file_size for info in _members(archive, source))
+
+
+def import_worker(path: str, source: str, bytes_read, conn):
+    """Worker process entry point; sends ("ok", (days, records)) or ("error", message)"""
+    def on_read(size: int):
+        bytes_read.value += size
+
+    try:
+        conn.send(("ok", aggregate_export(path, source, on_read)))
+    except Exception as exc:
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
@@ -0,0 +1,144 @@
+"""
+Health export import jobs - Mock implementation
+Exports are parsed in a separate process (see services/health_export.py)
+so multi-gigabyte files never block the event loop; only the per-day
+totals come back to be upserted into HealthService.
+TODO: Persist jobs in the database
+"""
+import asyncio
+import multiprocessing
+import os
+from collections import deque
+from datetime import date, datetime, timedelta
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError
+
+from schemas.health import HealthEntryRow, HealthImportJobResponse
+from services.health_export import export_size, import_worker
+from services.health_ingest import ROW_ADAPTER
+from services.health_service import health_service
+from core.exceptions import NotFoundException
+
+# Export files parsed at the same time
+MAX_IMPORT_WORKERS = 2
+
+# Days upserted per batch once a worker finishes
+IMPORT_UPSERT_BATCH = 1000
+
+# Completed and failed jobs are forgotten this long after they finish
+IMPORT_JOB_TTL = timedelta(hours=24)
+
+# Fresh interpreters: forking a process that runs an event loop is unsafe
+_context = multiprocessing.get_context("spawn")
+
+
+class HealthImportService:
+    """Health import job service with mock data"""
+
+    def __init__(self):
+        self.mock_jobs: dict[UUID, HealthImportJobResponse] = {}
+        self._owners: dict[UUID, UUID] = {}  # job id -> user id
+        self._progress: dict[UUID, multiprocessing.Value] = {}  # bytes read by running workers
+        self._tasks: set[asyncio.Task] = set()
+        self._slots = asyncio.Semaphore(MAX_IMPORT_WORKERS)
+        self._finished: deque[tuple[datetime, UUID]] = deque()  # (finished_at, job id), oldest first
+
+    def _drop_expired_jobs(self):
+        expired_before = datetime.now() - IMPORT_JOB_TTL
+        while self._finished and self._finished[0][0] < expired_before:
+            _, job_id = self._finished.popleft()
+            self.mock_jobs.pop(job_id, None)
+            self._owners.pop(job_id, None)
+
+    async def start_import(self, user_id: UUID, source: str, path: str) -> HealthImportJobResponse:
+        """Queue an import of the export file at path (deleted when the job ends)"""
+        self._drop_expired_jobs()
+        job = HealthImportJobResponse(
+            id=uuid4(),
+            source=source,
+            status="queued",
+            bytes_total=await asyncio.to_thread(export_size, path, source),
+            created_at=datetime.now()
+        )
+        self.mock_jobs[job.id] = job
+        self._owners[job.id] = user_id
+        task = asyncio.create_task(self._run(job, user_id, path))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job.model_copy()
+
+    async def get_job(self, user_id: UUID, job_id: UUID) -> HealthImportJobResponse:
+        """Get a job with its current progress (finished jobs expire after IMPORT_JOB_TTL)"""
+        self._drop_expired_jobs()
+        job = self.mock_jobs.get(job_id)
+        if not job or self._owners.get(job_id) != user_id:
+            raise NotFoundException(detail="Import job not found")
+        progress = self._progress.get(job_id)
+        if progress is not None:
+            job.bytes_read = min(progress.value, job.bytes_total)
+        job.progress = round(job.bytes_read / job.bytes_total, 3) if job.bytes_total else 0.0
+        return job.model_copy()
+
+    async def _run(self, job: HealthImportJobResponse, user_id: UUID, path: str):
+        try:
+            async with self._slots:
+                job.status = "running"
+                days, job.records = await self._parse(job, path)
+                job.bytes_read, job.progress = job.bytes_total, 1.0
+                job.status = "applying"
+                await self._apply(job, user_id, days)
+            job.status = "completed"
+        except Exception as exc:
+            job.status = "failed"
+            job.error = str(exc)
+        finally:
+            self._progress.pop(job.id, None)
+            job.finished_at = datetime.now()
+            self._finished.append((job.finished_at, job.id))
+            await asyncio.to_thread(os.remove, path)
+
+    async def _parse(self, job: HealthImportJobResponse, path: str) -> tuple[dict, int]:
+        """Run aggregate_export in a worker process and wait for its result"""
+        bytes_read = _context.Value("q", 0, lock=False)
+        receiver, sender = _context.Pipe(duplex=False)
+        process = _context.Process(
+            target=import_worker, args=(path, job.source, bytes_read, sender), daemon=True
+        )
+        process.start()
+        sender.close()  # so recv() raises EOFError if the worker dies
+        self._progress[job.id] = bytes_read
+        try:
+            status, result = await asyncio.to_thread(receiver.recv)
+        except EOFError:
+            raise RuntimeError("Import worker exited unexpectedly")
+        finally:
+            receiver.close()
+            await asyncio.to_thread(process.join)
+        if status == "error":
+            raise ValueError(result)
+        return result
+
+    async def _apply(self, job: HealthImportJobResponse, user_id: UUID, days: dict[str, dict[str, int]]):
+        """Upsert per-day totals; only the imported metrics are overwritten"""
+        batch: list[HealthEntryRow] = []
+        for day in sorted(days):
+            try:
+                batch.append(ROW_ADAPTER.validate_python({**days[day], "date": date.fromisoformat(day)}))
+            except ValidationError:
+                job.days_skipped += 1  # dated out of range or implausible totals
+                continue
+            if len(batch) >= IMPORT_UPSERT_BATCH:
+                await self._flush(job, user_id, batch)
+        await self._flush(job, user_id, batch)
+
+    async def _flush(self, job: HealthImportJobResponse, user_id: UUID, batch: list[HealthEntryRow]):
+        if batch:
+            created, updated = await health_service.bulk_upsert(user_id, batch)
+            job.days_created += created
+            job.days_updated += updated
+            batch.clear()
+
+
+# Singleton instance
+health_import_service = HealthImportService()
@@ -0,0 +1,124 @@
+"""
+Bulk health ingest - streaming NDJSON / JSON array upserts
+Rows are validated one at a time as they arrive and upserted into
+HealthService in batches, with per-row error reporting.
+"""
+import json
+from typing import AsyncIterator
+from uuid import UUID
+
+from pydantic import TypeAdapter, ValidationError
+
+from config import settings
+from schemas.health import HealthEntryRow, BulkIngestResponse, BulkRowError
+from services.health_service import health_service
+from core.exceptions import BadRequestException, PayloadTooLargeException
+
+# Rows validated before each upsert batch
+BULK_BATCH_SIZE = 1000
+
+# Row errors kept in a bulk ingest result
+MAX_BULK_ERRORS = 100
+
+# Rows are validated into dicts rather than CreateHealthEntryRequest models
+ROW_ADAPTER = TypeAdapter(HealthEntryRow)
+
+
+async def _limited(chunks: AsyncIterator[bytes], max_size: int) -> AsyncIterator[bytes]:
+    """Pass chunks through, failing as soon as the body exceeds max_size"""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_size:
+            raise PayloadTooLargeException(detail=f"Bulk body exceeds {max_size} bytes")
+        yield chunk
+
+
+def _error_message(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+            for err in exc.errors()
+        )
+    return str(exc)
+
+
+class _Ingest:
+    """Collects validated rows into batches and tallies the outcome"""
+
+    def __init__(self, user_id: UUID):
+        self.user_id = user_id
+        self.batch: list[HealthEntryRow] = []
+        self.received = self.created = self.updated = 0
+        self.errors: list[BulkRowError] = []
+        self.failed = 0
+
+    def add(self, row: int, validate, value) -> bool:
+        """Validate one row; returns whether the batch is full and due for flush()"""
+        self.received += 1
+        try:
+            self.batch.append(validate(value))
+        except (ValidationError, ValueError) as exc:
+            self.failed += 1
+            if len(self.errors) < MAX_BULK_ERRORS:
+                self.errors.append(BulkRowError(row=row, error=_error_message(exc)))
+            return False
+        return len(self.batch) >= BULK_BATCH_SIZE
+
+    async def flush(self):
+        if self.batch:
+            created, updated = await health_service.bulk_upsert(self.user_id, self.batch)
+            self.created += created
+            self.updated += updated
+            self.batch = []
+
+
+async def ingest_health_rows(
+    user_id: UUID, chunks: AsyncIterator[bytes], max_size: int = settings.MAX_BULK_INGEST_SIZE
+) -> BulkIngestResponse:
+    """
+    Ingest CreateHealthEntryRequest rows from an NDJSON or JSON array body
+    NDJSON is parsed line by line as chunks arrive. A JSON array is parsed
+    once the (size-limited) body is complete, then validated row by row.
+    """
+    ingest = _Ingest(user_id)
+    buffer = bytearray()  # appended in place: bytes += would copy the whole body per chunk
+    line_number = 0
+    is_array = None
+
+    async for chunk in _limited(chunks, max_size):
+        buffer += chunk
+        if is_array is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                continue
+            is_array = stripped.startswith(b"[")
+        if is_array:
+            continue
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip() and ingest.add(line_number, ROW_ADAPTER.validate_json, line):
+                await ingest.flush()
+
+    if is_array:
+        try:
+            rows = json.loads(buffer)
+        except ValueError as exc:
+            raise BadRequestException(detail=f"Invalid JSON array: {exc}")
+        if not isinstance(rows, list):
+            raise BadRequestException(detail="Expected a JSON array of health entries")
+        for position, row in enumerate(rows, start=1):
+            if ingest.add(position, ROW_ADAPTER.validate_python, row):
+                await ingest.flush()
+    elif buffer.strip():
+        ingest.add(line_number + 1, ROW_ADAPTER.validate_json, buffer)
+
+    await ingest.flush()
+    return BulkIngestResponse(
+        received=ingest.received,
+        created=ingest.created,
+        updated=ingest.updated,
+        failed=ingest.failed,
+        errors=ingest.errors
+    )
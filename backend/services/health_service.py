@@ -3,17 +3,39 @@ Health service - Mock implementation
 TODO: Connect to database
 """
 from uuid import UUID, uuid4
+from collections import defaultdict
 from datetime import date, datetime, timedelta
 from typing import Optional
 
 from models.health import HealthEntry
 from schemas.health import (
     CreateHealthEntryRequest,
+    HealthEntryRow,
     UpdateHealthEntryRequest,
     HealthEntryResponse,
-    HealthStatsResponse
+    HealthStatsResponse,
+    RollingHealthStatsResponse
 )
-from core.exceptions import NotFoundException
+from services.health_columns import EntryValues, HealthColumns, RollingTotals, ROLLING_WINDOWS
+from core.exceptions import NotFoundException, ConflictException
+from core.events import event_bus, HEALTH_CHANGED
+from core.indexing import SortedIndex
+from core.pagination import paginate_index
+
+# Key type of the per-user entry index (get_entries' date parameter shadows date)
+INDEX_KEY_TYPE = date
+
+
+def _averages(count: int, total_water: int, total_steps: int, total_calories: int) -> dict:
+    """Average fields shared by range and rolling stats, from integer totals"""
+    if not count:
+        return {"avg_water": 0, "avg_steps": 0, "avg_calories": 0, "total_days": 0}
+    return {
+        "avg_water": round(total_water / count, 1),
+        "avg_steps": round(total_steps / count, 0),
+        "avg_calories": round(total_calories / count, 0) if total_calories > 0 else None,
+        "total_days": count
+    }
 
 
 class HealthService:
@@ -22,6 +44,14 @@ class HealthService:
     def __init__(self):
         # Mock health entries database
         self.mock_entries: dict[UUID, HealthEntry] = {}
+        # Per-user entries ordered by date
+        self._index: dict[UUID, SortedIndex] = defaultdict(SortedIndex)
+        # Unique (user_id, date) -> entry id
+        self._by_date: dict[tuple[UUID, date], UUID] = {}
+        # Per-user columnar day store backing statistics
+        self._columns: dict[UUID, HealthColumns] = defaultdict(HealthColumns)
+        # Per-user running totals for the standard dashboard windows
+        self._rolling: dict[UUID, list[RollingTotals]] = {}
         self._seed_mock_data()
     
     def _seed_mock_data(self):
@@ -33,7 +63,7 @@ class HealthService:
             entry_date = date.today() - timedelta(days=i)
             entry_id = uuid4()
             
-            self.mock_entries[entry_id] = HealthEntry(
+            self._store(HealthEntry(
                 id=entry_id,
                 user_id=user_id,
                 date=entry_date,
@@ -49,12 +79,63 @@ class HealthService:
                 notes=f"Day {i+1} notes",
                 created_at=datetime.now() - timedelta(days=i),
                 updated_at=datetime.now() - timedelta(days=i)
-            )
+            ))
+    
+    def _store(self, entry: HealthEntry):
+        """Save entry and add it to the user's date index and columns"""
+        self.mock_entries[entry.id] = entry
+        self._by_date[(entry.user_id, entry.date)] = entry.id
+        self._index[entry.user_id].add(entry.date, entry.id)
+        self._apply(entry)
+        event_bus.publish(HEALTH_CHANGED, user_id=entry.user_id, day=entry.date)
+    
+    def _apply(self, entry: HealthEntry, sign: int = 1):
+        """Add or remove an entry's values in the columns and rolling totals"""
+        self._columns[entry.user_id].apply(entry, sign)
+        for window in self._rolling.get(entry.user_id, ()):
+            window.apply(entry, sign)
+    
+    def _patch(self, entry: HealthEntry, changes: dict):
+        """
+        Update entry fields, keeping columns and rolling totals in step
+        All or nothing: if the new values cannot be applied, the entry and
+        the totals are left as they were.
+        """
+        updated = entry.model_copy(update=changes)
+        self._apply(entry, sign=-1)
+        try:
+            self._apply(updated)
+        except Exception:
+            self._apply(entry)
+            raise
+        for field, value in changes.items():
+            setattr(entry, field, value)
+        entry.updated_at = datetime.now()
+        event_bus.publish(HEALTH_CHANGED, user_id=entry.user_id, day=entry.date)
+    
+    def _unstore(self, entry: HealthEntry):
+        """Drop entry and remove it from the user's date index and columns"""
+        self._index[entry.user_id].remove(entry.date, entry.id)
+        self._by_date.pop((entry.user_id, entry.date), None)
+        self._apply(entry, sign=-1)
+        del self.mock_entries[entry.id]
+        event_bus.publish(HEALTH_CHANGED, user_id=entry.user_id, day=entry.date)
     
     async def create_entry(
-        self, user_id: UUID, request: CreateHealthEntryRequest
+        self, user_id: UUID, request: CreateHealthEntryRequest, upsert: bool = False
     ) -> HealthEntryResponse:
-        """Create health entry"""
+        """
+        Create health entry
+        There is at most one entry per user and date. With upsert, an existing
+        entry for the date is updated with the fields set on the request.
+        """
+        existing_id = self._by_date.get((user_id, request.date))
+        if existing_id is not None:
+            if not upsert:
+                raise ConflictException(detail="Health entry already exists for this date")
+            changes = request.model_dump(exclude_unset=True, exclude={"date"})
+            return await self.update_entry(user_id, existing_id, UpdateHealthEntryRequest(**changes))
+        
         entry_id = uuid4()
         entry = HealthEntry(
             id=entry_id,
@@ -74,28 +155,93 @@ class HealthService:
             updated_at=datetime.now()
         )
         
-        self.mock_entries[entry_id] = entry
+        self._store(entry)
         return HealthEntryResponse(**entry.model_dump())
     
-    async def get_entries(
-        self, user_id: UUID, date: Optional[date] = None, page: int = 1, limit: int = 10
-    ) -> tuple[list[HealthEntryResponse], int]:
-        """Get health entries with pagination"""
-        # Filter by user and optional date
-        filtered = [
-            e for e in self.mock_entries.values()
-            if e.user_id == user_id and (date is None or e.date == date)
-        ]
+    async def bulk_upsert(
+        self, user_id: UUID, rows: list[HealthEntryRow]
+    ) -> tuple[int, int]:
+        """
+        Upsert already-validated rows without building responses
+        Existing days get the fields present in the row. The old values of
+        updated days are subtracted from and the new and updated entries added
+        to the columns in one vectorized pass each. Returns (created, updated).
+        """
+        created: list[HealthEntry] = []
+        replaced: list[EntryValues] = []
+        added: list[HealthEntry] = []
+        touched: set[UUID] = set()  # ids in added, whose final values are applied below
+        updated = 0
+        now = datetime.now()
+        for row in rows:
+            existing_id = self._by_date.get((user_id, row["date"]))
+            if existing_id is not None:
+                entry = self.mock_entries[existing_id]
+                if existing_id not in touched:
+                    replaced.append(EntryValues.of(entry))
+                    added.append(entry)
+                    touched.add(existing_id)
+                # Assigned as model_copy(update=...) does, skipping per-field __setattr__
+                entry.__dict__.update(row, updated_at=now)
+                entry.__pydantic_fields_set__.update(row)
+                updated += 1
+                continue
+            # Rows are validated already; fields they leave out get the defaults
+            entry = HealthEntry.model_construct(
+                id=uuid4(), user_id=user_id, created_at=now, updated_at=now, **row
+            )
+            self.mock_entries[entry.id] = entry
+            self._by_date[(user_id, entry.date)] = entry.id
+            self._index[user_id].add(entry.date, entry.id)
+            created.append(entry)
+            added.append(entry)
+            touched.add(entry.id)
         
-        # Sort by date descending
-        filtered.sort(key=lambda x: x.date, reverse=True)
+        columns = self._columns[user_id]
+        columns.apply_many(replaced, sign=-1)
+        columns.apply_many(added)
+        for window in self._rolling.get(user_id, ()):
+            for entry in replaced:
+                window.apply(entry, sign=-1)
+            for entry in added:
+                window.apply(entry)
+        for entry in added:
+            event_bus.publish(HEALTH_CHANGED, user_id=user_id, day=entry.date)
+        return len(created), updated
+    
+    async def get_entries(
+        self, user_id: UUID, date: Optional[date] = None, page: int = 1, limit: int = 10,
+        cursor: Optional[str] = None, include_total: bool = True
+    ) -> tuple[list[HealthEntryResponse], Optional[int], Optional[str]]:
+        """Get health entries with pagination, newest first"""
+        if date is not None:
+            entry = await self.get_entry_by_date(user_id, date)
+            entries = [entry] if entry is not None and page == 1 and cursor is None else []
+            return entries, int(entry is not None) if include_total else None, None
         
-        total = len(filtered)
-        start = (page - 1) * limit
-        end = start + limit
-        paginated = filtered[start:end]
+        index = self._index.get(user_id) or SortedIndex()
+        entries, next_cursor = paginate_index(
+            index, 0, len(index), page, limit, cursor, descending=True, key_type=INDEX_KEY_TYPE
+        )
         
-        return [HealthEntryResponse(**e.model_dump()) for e in paginated], total
+        paginated = [self.mock_entries[entry_id] for _, entry_id in entries]
+        total = len(index) if include_total else None
+        return [HealthEntryResponse(**e.model_dump()) for e in paginated], total, next_cursor
+    
+    async def get_entry_by_date(self, user_id: UUID, entry_date: date) -> Optional[HealthEntryResponse]:
+        """Get the user's entry for a date, if any (O(1))"""
+        entry_id = self._by_date.get((user_id, entry_date))
+        if entry_id is None:
+            return None
+        return HealthEntryResponse(**self.mock_entries[entry_id].model_dump())
+    
+    async def get_entries_between(self, user_id: UUID, start: date, end: date) -> dict[date, HealthEntryResponse]:
+        """The user's entries from start to end inclusive, by date (one range read)"""
+        index = self._index.get(user_id) or SortedIndex()
+        return {
+            entry.date: HealthEntryResponse(**entry.model_dump())
+            for entry in (self.mock_entries[entry_id] for entry_id in index.ids(*index.bounds(start, end)))
+        }
     
     async def get_entry_by_id(self, user_id: UUID, entry_id: UUID) -> HealthEntryResponse:
         """Get health entry by ID"""
@@ -113,13 +259,7 @@ class HealthService:
         if not entry or entry.user_id != user_id:
             raise NotFoundException(detail="Health entry not found")
         
-        # Update fields
-        update_data = request.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(entry, field, value)
-        
-        entry.updated_at = datetime.now()
-        
+        self._patch(entry, request.model_dump(exclude_unset=True))
         return HealthEntryResponse(**entry.model_dump())
     
     async def delete_entry(self, user_id: UUID, entry_id: UUID):
@@ -128,43 +268,63 @@ class HealthService:
         if not entry or entry.user_id != user_id:
             raise NotFoundException(detail="Health entry not found")
         
-        del self.mock_entries[entry_id]
+        self._unstore(entry)
     
     async def get_stats(
         self, user_id: UUID, start_date: date, end_date: date
     ) -> HealthStatsResponse:
-        """Get health statistics"""
-        # Filter entries in date range
-        filtered = [
-            e for e in self.mock_entries.values()
-            if e.user_id == user_id and start_date <= e.date <= end_date
-        ]
-        
-        if not filtered:
-            return HealthStatsResponse(
-                period=f"{start_date} to {end_date}",
-                avg_water=0,
-                avg_steps=0,
-                avg_calories=0,
-                total_days=0,
-                streak=0
-            )
+        """Get health statistics from the user's columnar day store"""
+        period = f"{start_date} to {end_date}"
+        columns = self._columns.get(user_id)
+        stats = columns.range_stats(start_date, end_date) if columns is not None else None
         
-        # Calculate averages
-        total_water = sum(e.water for e in filtered)
-        total_steps = sum(e.steps for e in filtered)
-        total_calories = sum(e.calories or 0 for e in filtered)
-        count = len(filtered)
+        if not stats or not stats["entries"]:
+            return HealthStatsResponse(period=period, streak=0, **_averages(0, 0, 0, 0))
         
         return HealthStatsResponse(
-            period=f"{start_date} to {end_date}",
-            avg_water=round(total_water / count, 1),
-            avg_steps=round(total_steps / count, 0),
-            avg_calories=round(total_calories / count, 0) if total_calories > 0 else None,
-            total_days=count,
-            streak=count  # Simplified: assume all consecutive
+            period=period,
+            **_averages(
+                stats["entries"], stats["water_total"], stats["steps_total"], stats["calories_total"]
+            ),
+            streak=stats["streak"],
+            longest_streak=stats["longest_streak"],
+            water=stats["water"],
+            steps=stats["steps"],
+            calories=stats["calories"],
+            bath_rate=stats["bath_rate"],
+            face_wash_rate=stats["face_wash_rate"]
         )
 
+    
+    async def get_rolling_stats(
+        self, user_id: UUID, today: Optional[date] = None
+    ) -> list[RollingHealthStatsResponse]:
+        """
+        Stats for the standard windows ending today
+        Totals are maintained on every write, so reads are O(1) per window
+        (plus a slide over the days elapsed since the last read).
+        """
+        today = today or date.today()
+        windows = self._rolling.get(user_id)
+        if windows is None:
+            columns = self._columns[user_id]
+            windows = self._rolling[user_id] = [RollingTotals(columns, days) for days in ROLLING_WINDOWS]
+        
+        results = []
+        for window in windows:
+            window.advance(today)
+            count, total_water, total_steps, total_calories, _ = window.sums
+            results.append(RollingHealthStatsResponse(
+                window_days=window.days,
+                start_date=window.start,
+                end_date=window.anchor,
+                total_water=total_water,
+                total_steps=total_steps,
+                total_calories=total_calories,
+                **_averages(count, total_water, total_steps, total_calories)
+            ))
+        return results
+
 
 # Singleton instance
 health_service = HealthService()
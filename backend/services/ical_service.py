@@ -0,0 +1,346 @@
+"""
+iCalendar (RFC 5545) import/export for calendar events
+Parsing and serialization are both incremental: the parser consumes byte
+chunks and yields one event at a time, the serializer yields one VEVENT
+at a time, so neither holds a whole calendar in memory.
+"""
+import codecs
+import hashlib
+import hmac
+import re
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterator, Optional
+from uuid import UUID
+
+from dateutil import tz
+from pydantic import ValidationError
+
+from models.calendar import CalendarEvent
+from schemas.calendar import CreateEventRequest, CalendarImportResponse
+from services.calendar_service import calendar_service, EXPORT_UID_SUFFIX
+from core.auth import require_secret_key, secret_key
+from core.exceptions import NotFoundException
+
+PRODID = "-//Moments//Calendar//EN"
+
+# Events inserted per batch while importing
+IMPORT_BATCH_SIZE = 500
+
+# Error messages kept in an import result
+MAX_IMPORT_ERRORS = 20
+
+_DURATION = re.compile(
+    r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+_UNTIL = re.compile(r"UNTIL=(\d{8}T\d{6}Z)")
+_ESCAPED = re.compile(r"\\(.)")
+
+
+def _unescape(value: str) -> str:
+    return _ESCAPED.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _split_property(line: str) -> tuple[str, dict[str, str], str]:
+    """Split a content line into (NAME, params, value)"""
+    head, _, value = line.partition(":")
+    name, *raw_params = head.split(";")
+    params = {}
+    for param in raw_params:
+        key, _, param_value = param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _parse_datetime(value: str, params: dict[str, str]) -> tuple[datetime, bool]:
+    """
+    Parse a DATE or DATE-TIME value as naive local time
+    UTC and TZID values are converted, matching the naive datetimes
+    the rest of the calendar uses. Returns (datetime, is_all_day).
+    """
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d"), True
+
+    parsed = datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    elif "TZID" in params and tz.gettz(params["TZID"]) is not None:
+        parsed = parsed.replace(tzinfo=tz.gettz(params["TZID"]))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed, False
+
+
+def _parse_duration(value: str) -> timedelta:
+    match = _DURATION.match(value)
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+        minutes=int(minutes or 0), seconds=int(seconds or 0)
+    )
+    return -duration if sign == "-" else duration
+
+
+def _localize_until(rule: str) -> str:
+    """Rewrite UTC UNTIL values to naive local time to match DTSTART"""
+    def replace(match):
+        until, _ = _parse_datetime(match.group(1), {})
+        return "UNTIL=" + until.strftime("%Y%m%dT%H%M%S")
+    return _UNTIL.sub(replace, rule)
+
+
+def _build_event(props: list[tuple[str, dict[str, str], str]]) -> CreateEventRequest:
+    """Turn the properties of one VEVENT into a create request"""
+    fields: dict = {}
+    exdates: list[datetime] = []
+    duration: Optional[timedelta] = None
+
+    for name, params, value in props:
+        if name == "SUMMARY":
+            fields["title"] = _unescape(value)
+        elif name == "DESCRIPTION":
+            fields["description"] = _unescape(value)
+        elif name == "LOCATION":
+            fields["location"] = _unescape(value)
+        elif name == "CATEGORIES":
+            fields["category"] = _unescape(value.split(",")[0]).lower()
+        elif name == "COLOR":
+            fields["color"] = value
+        elif name == "DTSTART":
+            fields["start_time"], fields["all_day"] = _parse_datetime(value, params)
+        elif name == "DTEND":
+            fields["end_time"], _ = _parse_datetime(value, params)
+        elif name == "DURATION":
+            duration = _parse_duration(value)
+        elif name == "RRULE":
+            fields["recurrence_rule"] = _localize_until(value)
+        elif name == "EXDATE":
+            exdates.extend(_parse_datetime(v, params)[0] for v in value.split(","))
+
+    if "start_time" not in fields:
+        raise ValueError("VEVENT has no DTSTART")
+    if "end_time" not in fields:
+        if duration is None:
+            duration = timedelta(days=1) if fields.get("all_day") else timedelta(0)
+        fields["end_time"] = fields["start_time"] + duration
+    fields.setdefault("title", "(untitled)")
+    fields["recurrence_exdates"] = exdates
+    return CreateEventRequest(**fields)
+
+
+def _event_uid(props: list[tuple[str, dict[str, str], str]]) -> Optional[str]:
+    """
+    UID identifying one VEVENT across imports
+    Overrides of single occurrences share their series' UID, so their
+    RECURRENCE-ID is part of it.
+    """
+    values = {name: value for name, _, value in props if name in ("UID", "RECURRENCE-ID")}
+    if not values.get("UID"):
+        return None
+    if "RECURRENCE-ID" in values:
+        return f"{values['UID']};{values['RECURRENCE-ID']}"
+    return values["UID"]
+
+
+async def _iter_physical_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode byte chunks into raw lines"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    for line in buffer.split("\n"):
+        yield line.rstrip("\r")
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Unfold raw lines into content lines"""
+    current: Optional[str] = None
+    async for line in _iter_physical_lines(chunks):
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+async def iter_ics_events(
+    chunks: AsyncIterator[bytes]
+) -> AsyncIterator[tuple[Optional[str], Optional[CreateEventRequest], Optional[str]]]:
+    """
+    Parse an .ics byte stream one VEVENT at a time
+    Yields (uid, request, None) for each event, or (uid, None, error) for
+    events that could not be parsed. Only the current event is held in memory.
+    """
+    props: Optional[list] = None
+    depth = 0  # nested components (VALARM) inside the current VEVENT
+
+    async for line in _iter_lines(chunks):
+        name, params, value = _split_property(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and props is None:
+                props = []
+            elif props is not None:
+                depth += 1
+        elif name == "END":
+            if props is None:
+                continue
+            if depth:
+                depth -= 1
+            elif value.upper() == "VEVENT":
+                uid = _event_uid(props)
+                try:
+                    result = (uid, _build_event(props), None)
+                except (ValueError, ValidationError) as exc:
+                    result = (uid, None, str(exc))
+                props = None
+                yield result
+        elif props is not None and not depth:
+            props.append((name, params, value))
+
+
+async def import_ics(user_id: UUID, chunks: AsyncIterator[bytes]) -> CalendarImportResponse:
+    """
+    Parse an .ics stream and insert its events in batches
+    Events with a UID seen in an earlier import (or export) update that event,
+    and only the last VEVENT with a given UID in the file is kept.
+    """
+    imported, updated, skipped = 0, 0, 0
+    errors: list[str] = []
+    batch: dict[str, CreateEventRequest] = {}
+    anonymous: list[tuple[None, CreateEventRequest]] = []
+
+    async def flush():
+        nonlocal imported, updated, skipped
+        requests = list(batch.items()) + anonymous
+        batch_updated, rejected = await calendar_service.import_events(user_id, requests)
+        imported += len(requests) - len(rejected) - batch_updated
+        updated += batch_updated
+        skipped += len(rejected)
+        errors.extend(rejected[:MAX_IMPORT_ERRORS - len(errors)])
+        batch.clear()
+        anonymous.clear()
+
+    async for uid, request, error in iter_ics_events(chunks):
+        if error is not None:
+            skipped += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append(error)
+            continue
+        if uid is None:
+            anonymous.append((None, request))
+        else:
+            batch[uid] = request
+        if len(batch) + len(anonymous) >= IMPORT_BATCH_SIZE:
+            await flush()
+    if batch or anonymous:
+        await flush()
+
+    return CalendarImportResponse(imported=imported, updated=updated, skipped=skipped, errors=errors)
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;")
+        .replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start, width = [], 0, 75
+    while start < len(encoded):
+        end = min(start + width, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # don't split a UTF-8 sequence
+        parts.append(encoded[start:end].decode())
+        start, width = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _format_datetime(value: datetime, all_day: bool = False) -> str:
+    if all_day:
+        return value.strftime("%Y%m%d")
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def serialize_event(event: CalendarEvent) -> str:
+    """Render one event as a VEVENT block"""
+    date_param = ";VALUE=DATE" if event.all_day else ""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event.id}{EXPORT_UID_SUFFIX}",
+        f"DTSTAMP:{_format_datetime(event.updated_at.astimezone(timezone.utc))}",
+        f"DTSTART{date_param}:{_format_datetime(event.start_time, event.all_day)}",
+        f"DTEND{date_param}:{_format_datetime(event.end_time, event.all_day)}",
+        f"SUMMARY:{_escape(event.title)}",
+    ]
+    if event.description:
+        lines.append(f"DESCRIPTION:{_escape(event.description)}")
+    if event.location:
+        lines.append(f"LOCATION:{_escape(event.location)}")
+    if event.category:
+        lines.append(f"CATEGORIES:{_escape(event.category)}")
+    if event.color:
+        lines.append(f"COLOR:{event.color}")
+    if event.recurrence_rule:
+        rule = event.recurrence_rule
+        lines.append(rule if rule.upper().startswith("RRULE:") else f"RRULE:{rule}")
+    for exdate in event.recurrence_exdates:
+        lines.append(f"EXDATE{date_param}:{_format_datetime(exdate, event.all_day)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def iter_ics(events: Iterator[CalendarEvent], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Stream a VCALENDAR, yielding roughly chunk_size bytes at a time"""
+    parts = [
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        f"PRODID:{PRODID}\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+    ]
+    size = 0
+    for event in events:
+        block = serialize_event(event)
+        parts.append(block)
+        size += len(block)
+        if size >= chunk_size:
+            yield "".join(parts).encode()
+            parts, size = [], 0
+    parts.append("END:VCALENDAR\r\n")
+    yield "".join(parts).encode()
+
+
+def _feed_signature(key: str, user_id: UUID) -> str:
+    digest = hmac.new(key.encode(), b"calendar-feed:" + user_id.bytes, hashlib.sha256)
+    return digest.hexdigest()[:32]
+
+
+def create_feed_token(user_id: UUID) -> str:
+    """Signed token identifying a user's calendar feed (JWT_SECRET_KEY must be configured)"""
+    return f"{user_id.hex}{_feed_signature(require_secret_key(), user_id)}"
+
+
+def verify_feed_token(token: str) -> UUID:
+    """Return the user id of a feed token, or raise if it is not valid"""
+    try:
+        user_id = UUID(hex=token[:32])
+    except ValueError:
+        raise NotFoundException(detail="Calendar feed not found")
+    key = secret_key()
+    if key is None or not hmac.compare_digest(token[32:], _feed_signature(key, user_id)):
+        raise NotFoundException(detail="Calendar feed not found")
+    return user_id
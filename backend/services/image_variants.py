@@ -0,0 +1,46 @@
+"""
+Image variant rendering, run in thumbnail worker processes
+Only imports Pillow so workers start quickly.
+"""
+import os
+
+from PIL import Image, ImageOps
+
+# Variant name -> longest edge in pixels
+VARIANT_SIZES = {
+    "thumb": 400,
+    "medium": 1200,
+}
+
+VARIANT_FORMAT = "webp"
+VARIANT_QUALITY = 80
+
+
+def variant_relative(relative: str, variant: str) -> str:
+    """Path of a variant next to its original: ab/<hash>.thumb.webp"""
+    return f"{os.path.splitext(relative)[0]}.{variant}.{VARIANT_FORMAT}"
+
+
+def render_variants(source: str) -> list[str]:
+    """
+    Write every variant smaller than the original next to it
+    Files are written to a temp name and renamed, so a variant that exists
+    is always complete. Returns the variant names written.
+    """
+    written = []
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or "A" in image.mode else "RGB")
+        # Largest first so each smaller variant resamples fewer pixels
+        for variant, size in sorted(VARIANT_SIZES.items(), key=lambda item: -item[1]):
+            if max(image.size) <= size:
+                continue
+            image = image.copy()
+            image.thumbnail((size, size), Image.LANCZOS)
+            target = variant_relative(source, variant)
+            partial = target + ".part"
+            image.save(partial, VARIANT_FORMAT.upper(), quality=VARIANT_QUALITY)
+            os.replace(partial, target)
+            written.append(variant)
+    return written
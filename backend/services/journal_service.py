@@ -2,17 +2,51 @@
 Journal service - Mock implementation
 TODO: Connect to database
 """
+import calendar
 from uuid import UUID, uuid4
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 from typing import Optional
 
 from models.journal import JournalEntry
 from schemas.journal import (
     CreateJournalEntryRequest,
     UpdateJournalEntryRequest,
-    JournalEntryResponse
+    JournalEntryResponse,
+    JournalEntrySummaryResponse,
+    JournalSearchResult,
+    JournalStorageStatsResponse,
+    JournalUserStorageStats
 )
+from core.datetimes import to_local_naive
 from core.exceptions import NotFoundException
+from core.events import event_bus, JOURNAL_CHANGED
+from core.indexing import SortedIndex
+from core.search import InvertedIndex, Query, plain_text, highlight
+from core.compression import CompressedTextStore
+from services.thumbnail_service import thumbnail_service
+from core.pagination import paginate_index
+
+# Field weights for search ranking
+TITLE_BOOST = 2.0
+TAG_BOOST = 1.5
+
+# Characters of plain text kept in list excerpts
+EXCERPT_LENGTH = 200
+
+# Decompressed bodies kept hot for repeat reads
+CONTENT_CACHE_BYTES = 8 * 1024 * 1024
+
+# Image variant used for covers in list views
+LIST_COVER_VARIANT = "thumb"
+
+
+def _excerpt(text: str) -> str:
+    """Opening of plain text, cut at a word boundary"""
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text.rfind(" ", 0, EXCERPT_LENGTH)
+    return text[:cut if cut > 0 else EXCERPT_LENGTH].rstrip() + "…"
 
 
 class JournalService:
@@ -20,6 +54,14 @@ class JournalService:
     
     def __init__(self):
         self.mock_entries: dict[UUID, JournalEntry] = {}
+        # Per-user entries ordered by date
+        self._index: dict[UUID, SortedIndex] = defaultdict(SortedIndex)
+        # Per-user (month, day) -> entry ids, for on-this-day lookups
+        self._by_day: dict[UUID, dict[tuple[int, int], set[UUID]]] = defaultdict(lambda: defaultdict(set))
+        # Per-user full-text index over title, content and tags
+        self._search: dict[UUID, InvertedIndex] = defaultdict(InvertedIndex)
+        # Entry content, compressed; stored JournalEntry objects keep content blank
+        self._contents = CompressedTextStore(cache_bytes=CONTENT_CACHE_BYTES)
         self._seed_mock_data()
     
     def _seed_mock_data(self):
@@ -54,7 +96,7 @@ class JournalService:
             entry_id = uuid4()
             entry_date = datetime.now() - timedelta(days=i)
             
-            self.mock_entries[entry_id] = JournalEntry(
+            self._store(JournalEntry(
                 id=entry_id,
                 user_id=user_id,
                 date=entry_date,
@@ -63,7 +105,52 @@ class JournalService:
                 created_at=entry_date,
                 updated_at=entry_date,
                 **data
-            )
+            ))
+    
+    def _store(self, entry: JournalEntry):
+        """Save entry, compressing its content, and add it to the user's indexes"""
+        content, entry.content = entry.content, ""
+        self._contents.put(entry.id, content, group=entry.user_id)
+        self.mock_entries[entry.id] = entry
+        self._index[entry.user_id].add(entry.date, entry.id)
+        self._by_day[entry.user_id][(entry.date.month, entry.date.day)].add(entry.id)
+        self._index_text(entry, content)
+        event_bus.publish(JOURNAL_CHANGED, user_id=entry.user_id, day=entry.date.date())
+    
+    def _index_text(self, entry: JournalEntry, content: str):
+        """Refresh the excerpt and word count and reindex title, content and tags"""
+        text = plain_text(content)
+        entry.excerpt = _excerpt(text)
+        entry.word_count = len(text.split())
+        fields = [(entry.title, TITLE_BOOST), (text, 1.0)]
+        fields += [(tag, TAG_BOOST) for tag in entry.tags]
+        self._search[entry.user_id].add(entry.id, fields)
+    
+    def _unstore(self, entry: JournalEntry):
+        """Drop entry and remove it from the user's date and search indexes"""
+        self._index[entry.user_id].remove(entry.date, entry.id)
+        self._by_day[entry.user_id][(entry.date.month, entry.date.day)].discard(entry.id)
+        self._search[entry.user_id].remove(entry.id)
+        self._contents.delete(entry.id)
+        del self.mock_entries[entry.id]
+        event_bus.publish(JOURNAL_CHANGED, user_id=entry.user_id, day=entry.date.date())
+    
+    def _response(
+        self, entry: JournalEntry, content: Optional[str] = None, cover_variant: Optional[str] = None
+    ) -> JournalEntryResponse:
+        """Full response, decompressing content unless it is passed in, optionally with a cover variant"""
+        if content is None:
+            content = self._contents.get(entry.id)
+        data = entry.model_dump(exclude={"content"})
+        if cover_variant:
+            data["cover_image"] = thumbnail_service.variant_url(entry.cover_image, cover_variant)
+        return JournalEntryResponse(**data, content=content)
+    
+    def _summary(self, entry: JournalEntry) -> JournalEntrySummaryResponse:
+        """List item without content, pointing at the cover thumbnail"""
+        summary = JournalEntrySummaryResponse(**entry.model_dump(exclude={"content", "images"}))
+        summary.cover_image = thumbnail_service.variant_url(entry.cover_image, LIST_COVER_VARIANT)
+        return summary
     
     async def create_entry(
         self, user_id: UUID, request: CreateJournalEntryRequest
@@ -79,29 +166,94 @@ class JournalService:
             **request.model_dump(exclude={"date"})
         )
         
-        self.mock_entries[entry_id] = entry
-        return JournalEntryResponse(**entry.model_dump())
+        self._store(entry)
+        return self._response(entry, request.content)
     
     async def get_entries(
         self, user_id: UUID, start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None, page: int = 1, limit: int = 10
-    ) -> tuple[list[JournalEntryResponse], int]:
-        """Get journal entries with pagination"""
-        filtered = [
-            e for e in self.mock_entries.values()
-            if e.user_id == user_id and
-            (start_date is None or e.date >= start_date) and
-            (end_date is None or e.date <= end_date)
-        ]
-        
-        filtered.sort(key=lambda x: x.date, reverse=True)
+        end_date: Optional[datetime] = None, page: int = 1, limit: int = 10,
+        cursor: Optional[str] = None, include_total: bool = True, summary: bool = False
+    ) -> tuple[list[JournalEntryResponse | JournalEntrySummaryResponse], Optional[int], Optional[str]]:
+        """
+        Get journal entries with pagination, newest first
+        With summary set, items carry the stored excerpt instead of content.
+        """
+        start_date, end_date = to_local_naive(start_date), to_local_naive(end_date)
+        index = self._index.get(user_id) or SortedIndex()
+        lo, hi = index.bounds(start_date, end_date)
+        entries, next_cursor = paginate_index(
+            index, lo, hi, page, limit, cursor, descending=True
+        )
         
-        total = len(filtered)
-        start = (page - 1) * limit
-        end = start + limit
-        paginated = filtered[start:end]
+        paginated = [self.mock_entries[entry_id] for _, entry_id in entries]
+        total = hi - lo if include_total else None
+        if summary:
+            items = [self._summary(e) for e in paginated]
+        else:
+            items = [self._response(e, cover_variant=LIST_COVER_VARIANT) for e in paginated]
+        return items, total, next_cursor
+    
+    async def get_entries_by_day(
+        self, user_id: UUID, start: date, end: date, limit: int = 10
+    ) -> dict[date, list[JournalEntryResponse]]:
+        """
+        Newest `limit` entries of each day from start to end inclusive
+        One range read; responses are only built for entries that are kept.
+        """
+        index = self._index.get(user_id) or SortedIndex()
+        lo, hi = index.bounds(datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.max.time()))
+        days: dict[date, list[JournalEntryResponse]] = defaultdict(list)
+        for _, entry_id in index.entries(lo, hi)[::-1]:
+            entry = self.mock_entries[entry_id]
+            items = days[entry.date.date()]
+            if len(items) < limit:
+                items.append(self._response(entry, cover_variant=LIST_COVER_VARIANT))
+        return days
+    
+    async def get_on_this_day(self, user_id: UUID, day: date) -> list[JournalEntrySummaryResponse]:
+        """
+        Entries written on the same month and day in earlier years, newest first
+        On Feb 28 of a non-leap year, Feb 29 entries are included too.
+        """
+        by_day = self._by_day.get(user_id, {})
+        keys = [(day.month, day.day)]
+        if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+            keys.append((2, 29))
+        matches = [
+            self.mock_entries[entry_id]
+            for key in keys for entry_id in by_day.get(key, ())
+        ]
+        matches = [entry for entry in matches if entry.date.year < day.year]
+        matches.sort(key=lambda entry: entry.date, reverse=True)
+        return [self._summary(e) for e in matches]
+    
+    async def search_entries(
+        self, user_id: UUID, q: str, page: int = 1, limit: int = 10
+    ) -> tuple[list[JournalSearchResult], int]:
+        """
+        Ranked full-text search over title, content and tags
+        Supports terms, "quoted phrases" and prefix* terms; all must match.
+        """
+        query = Query(q)
+        index = self._search.get(user_id)
+        if not query or index is None:
+            return [], 0
         
-        return [JournalEntryResponse(**e.model_dump()) for e in paginated], total
+        ranked, total, terms = index.search(query, top=page * limit)
+        results = []
+        for entry_id, score in ranked[(page - 1) * limit:]:
+            entry = self.mock_entries[entry_id]
+            results.append(JournalSearchResult(
+                id=entry.id,
+                title=entry.title,
+                date=entry.date,
+                cover_image=thumbnail_service.variant_url(entry.cover_image, LIST_COVER_VARIANT),
+                mood=entry.mood,
+                tags=entry.tags,
+                score=round(score, 4),
+                snippet=highlight(plain_text(self._contents.get(entry.id)), terms)
+            ))
+        return results, total
     
     async def get_entry_by_id(self, user_id: UUID, entry_id: UUID) -> JournalEntryResponse:
         """Get journal entry by ID"""
@@ -109,7 +261,7 @@ class JournalService:
         if not entry or entry.user_id != user_id:
             raise NotFoundException(detail="Journal entry not found")
         
-        return JournalEntryResponse(**entry.model_dump())
+        return self._response(entry)
     
     async def update_entry(
         self, user_id: UUID, entry_id: UUID, request: UpdateJournalEntryRequest
@@ -120,11 +272,17 @@ class JournalService:
             raise NotFoundException(detail="Journal entry not found")
         
         update_data = request.model_dump(exclude_unset=True)
+        content = update_data.pop("content", None)
         for field, value in update_data.items():
             setattr(entry, field, value)
+        if content is not None:
+            self._contents.put(entry.id, content, group=user_id)
+        if content is not None or update_data.keys() & {"title", "tags"}:
+            self._index_text(entry, content if content is not None else self._contents.get(entry.id))
         
         entry.updated_at = datetime.now()
-        return JournalEntryResponse(**entry.model_dump())
+        event_bus.publish(JOURNAL_CHANGED, user_id=user_id, day=entry.date.date())
+        return self._response(entry, content)
     
     async def delete_entry(self, user_id: UUID, entry_id: UUID):
         """Delete journal entry"""
@@ -132,7 +290,30 @@ class JournalService:
         if not entry or entry.user_id != user_id:
             raise NotFoundException(detail="Journal entry not found")
         
-        del self.mock_entries[entry_id]
+        self._unstore(entry)
+    
+    async def get_storage_stats(self) -> JournalStorageStatsResponse:
+        """Compression ratio and memory saved by content storage, per user"""
+        users = []
+        for user_id, (entries, raw_bytes, stored_bytes) in self._contents.group_stats().items():
+            users.append(JournalUserStorageStats(
+                user_id=user_id,
+                entries=entries,
+                raw_bytes=raw_bytes,
+                stored_bytes=stored_bytes,
+                compression_ratio=round(raw_bytes / stored_bytes, 2) if stored_bytes else 1.0,
+                saved_bytes=raw_bytes - stored_bytes
+            ))
+        raw_total = sum(user.raw_bytes for user in users)
+        stored_total = sum(user.stored_bytes for user in users)
+        return JournalStorageStatsResponse(
+            users=sorted(users, key=lambda user: user.saved_bytes, reverse=True),
+            raw_bytes=raw_total,
+            stored_bytes=stored_total,
+            compression_ratio=round(raw_total / stored_total, 2) if stored_total else 1.0,
+            saved_bytes=raw_total - stored_total,
+            cache=self._contents.cache_stats()
+        )
 
 
 # Singleton instance
@@ -0,0 +1,119 @@
+"""
+Thumbnail service - Background image variant generation
+Uploaded images are queued here; variants are rendered in a process pool
+and cached next to the original. Each queued image has a marker file
+under UPLOAD_DIR/.pending until it is done, so work interrupted by a
+restart is picked up again by resume_pending().
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from uuid import UUID
+
+import aiofiles
+import aiofiles.os
+
+from config import settings
+from services.image_variants import VARIANT_SIZES, render_variants, variant_relative
+
+# Processes rendering variants
+THUMBNAIL_WORKERS = 2
+
+# Directory under UPLOAD_DIR holding one marker per queued image
+PENDING_DIR = ".pending"
+
+# Pillow-decodable image types worth resizing
+RESIZABLE_TYPES = ("image/jpeg", "image/png", "image/webp", "image/bmp", "image/tiff", "image/heic")
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_URL = re.compile(r"^/uploads/([0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]{1,10})$")
+
+
+class ThumbnailService:
+    """Queues uploaded images for variant generation and resolves variant URLs"""
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: dict[str, asyncio.Task] = {}  # relative path -> render task
+        self._ready: dict[str, bool] = {}  # variant relative path -> exists
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=THUMBNAIL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _marker(self, relative: str) -> str:
+        return os.path.join(settings.UPLOAD_DIR, PENDING_DIR, os.path.basename(relative))
+
+    async def enqueue(self, upload_id: UUID, relative: str, content_type: Optional[str]):
+        """Queue variant generation for a stored upload (path relative to UPLOAD_DIR)"""
+        if (content_type or "").split(";")[0] not in RESIZABLE_TYPES or relative in self._tasks:
+            return
+        marker = self._marker(relative)
+        await aiofiles.os.makedirs(os.path.dirname(marker), exist_ok=True)
+        async with aiofiles.open(marker, "w") as out:
+            await out.write(f"{relative}\n{upload_id}")
+        self._schedule(relative, str(upload_id))
+
+    def _schedule(self, relative: str, upload_id: str):
+        task = asyncio.create_task(self._render(relative, upload_id))
+        self._tasks[relative] = task
+        task.add_done_callback(lambda _: self._tasks.pop(relative, None))
+
+    async def _render(self, relative: str, upload_id: str):
+        source = os.path.join(settings.UPLOAD_DIR, relative)
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor(), render_variants, source)
+        except Exception:
+            # Undecodable or missing image: keep serving the original
+            logger.exception("Rendering variants of upload %s (%s) failed", upload_id, relative)
+        for variant in VARIANT_SIZES:
+            self._ready.pop(variant_relative(relative, variant), None)
+        marker = self._marker(relative)
+        if await aiofiles.os.path.exists(marker):
+            await aiofiles.os.remove(marker)
+
+    async def resume_pending(self) -> int:
+        """Re-queue images whose variants were not finished before a restart"""
+        directory = os.path.join(settings.UPLOAD_DIR, PENDING_DIR)
+        if not await aiofiles.os.path.isdir(directory):
+            return 0
+        resumed = 0
+        for name in await aiofiles.os.listdir(directory):
+            async with aiofiles.open(os.path.join(directory, name)) as marker:
+                relative, _, upload_id = (await marker.read()).strip().partition("\n")
+            if relative and relative not in self._tasks:
+                self._schedule(relative, upload_id or "unknown")
+                resumed += 1
+        return resumed
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def variant_url(self, url: Optional[str], variant: str) -> Optional[str]:
+        """
+        URL of a variant of an uploaded image, or the original URL when
+        the variant is not (yet) available or url is not a stored upload
+        """
+        match = _CONTENT_URL.match(url or "")
+        if not match:
+            return url
+        relative = variant_relative(match.group(1), variant)
+        ready = self._ready.get(relative)
+        if ready is None:
+            ready = self._ready[relative] = os.path.exists(os.path.join(settings.UPLOAD_DIR, relative))
+        return f"/uploads/{relative}" if ready else url
+
+
+# Singleton instance
+thumbnail_service = ThumbnailService()
@@ -0,0 +1,230 @@
+"""
+Upload service - Mock implementation
+Files are streamed to disk while being hashed and stored under their
+SHA-256, so identical content is kept once however often it is uploaded.
+TODO: Persist upload records in the database
+"""
+import asyncio
+import hashlib
+import mimetypes
+import os
+import re
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+from uuid import UUID, uuid4
+
+import aiofiles
+import aiofiles.os
+
+from config import settings
+from models.uploads import Upload
+from schemas.uploads import CreateUploadSessionRequest, UploadResponse, UploadSessionResponse
+from services.thumbnail_service import thumbnail_service
+from core.exceptions import (
+    BadRequestException,
+    ConflictException,
+    NotFoundException,
+    PayloadTooLargeException
+)
+
+# Suggested bytes per resumable chunk
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Unfinished resumable uploads are discarded after this long
+UPLOAD_SESSION_TTL = timedelta(hours=24)
+
+# Directory under UPLOAD_DIR for in-progress files
+PARTIAL_DIR = ".partial"
+
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+def _extension(filename: Optional[str], content_type: Optional[str]) -> str:
+    """Safe lowercase extension from the file name, else the content type"""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if not _EXTENSION.match(ext):
+        ext = mimetypes.guess_extension((content_type or "").split(";")[0].strip()) or ""
+    return ext if _EXTENSION.match(ext) else ""
+
+
+def content_path(relative: str) -> str:
+    """Absolute path of a stored file from its path relative to UPLOAD_DIR"""
+    return os.path.join(settings.UPLOAD_DIR, relative)
+
+
+class _UploadSession:
+    """In-progress resumable upload; bytes are hashed as they are appended"""
+
+    def __init__(self, user_id: UUID, request: CreateUploadSessionRequest):
+        self.id = uuid4()
+        self.user_id = user_id
+        self.filename = request.filename
+        self.content_type = request.content_type
+        self.size = request.size
+        self.expected_sha256 = request.sha256.lower() if request.sha256 else None
+        self.received = 0
+        self.hasher = hashlib.sha256()
+        self.path = content_path(os.path.join(PARTIAL_DIR, self.id.hex))
+        self.expires_at = datetime.now() + UPLOAD_SESSION_TTL
+        self.lock = asyncio.Lock()
+
+    def to_response(self) -> UploadSessionResponse:
+        return UploadSessionResponse(
+            id=self.id,
+            filename=self.filename,
+            content_type=self.content_type,
+            size=self.size,
+            received=self.received,
+            chunk_size=UPLOAD_CHUNK_SIZE,
+            expires_at=self.expires_at
+        )
+
+
+class UploadService:
+    """Upload service with mock records and content-addressed files on disk"""
+
+    def __init__(self):
+        self.mock_uploads: dict[UUID, Upload] = {}
+        self.mock_sessions: dict[UUID, _UploadSession] = {}
+        self._by_hash: dict[tuple[UUID, str], UUID] = {}  # (user, sha256) -> upload id
+        self._files: dict[str, str] = {}  # sha256 -> path relative to UPLOAD_DIR
+
+    async def _partial_path(self) -> str:
+        directory = content_path(PARTIAL_DIR)
+        await aiofiles.os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, uuid4().hex)
+
+    async def save_stream(
+        self, user_id: UUID, chunks: AsyncIterator[bytes],
+        filename: Optional[str] = None, content_type: Optional[str] = None
+    ) -> UploadResponse:
+        """Stream a body to disk, hashing it and enforcing MAX_UPLOAD_SIZE as it arrives"""
+        path = await self._partial_path()
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(path, "wb") as out:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > settings.MAX_UPLOAD_SIZE:
+                        raise PayloadTooLargeException(detail=f"Upload exceeds {settings.MAX_UPLOAD_SIZE} bytes")
+                    hasher.update(chunk)
+                    await out.write(chunk)
+            if not size:
+                raise BadRequestException(detail="Empty upload")
+        except BaseException:
+            await aiofiles.os.remove(path)
+            raise
+        return await self._finalize(user_id, path, hasher.hexdigest(), size, filename, content_type)
+
+    async def _finalize(
+        self, user_id: UUID, path: str, sha256: str, size: int,
+        filename: Optional[str], content_type: Optional[str]
+    ) -> UploadResponse:
+        """Move a completed file to its content address (or drop it as a duplicate)"""
+        relative = self._files.get(sha256) or os.path.join(sha256[:2], sha256 + _extension(filename, content_type))
+        target = content_path(relative)
+        existing_id = self._by_hash.get((user_id, sha256))
+        upload_id = existing_id or uuid4()
+        deduplicated = await aiofiles.os.path.exists(target)
+        if deduplicated:
+            await aiofiles.os.remove(path)
+        else:
+            await aiofiles.os.makedirs(os.path.dirname(target), exist_ok=True)
+            await aiofiles.os.replace(path, target)
+            await thumbnail_service.enqueue(upload_id, relative, content_type or mimetypes.guess_type(relative)[0])
+        self._files[sha256] = relative
+
+        if existing_id is not None:
+            return UploadResponse(**self.mock_uploads[existing_id].model_dump(), deduplicated=True)
+
+        upload = Upload(
+            id=upload_id,
+            user_id=user_id,
+            sha256=sha256,
+            size=size,
+            content_type=content_type or mimetypes.guess_type(relative)[0],
+            filename=filename,
+            url="/uploads/" + relative.replace(os.sep, "/"),
+            created_at=datetime.now()
+        )
+        self.mock_uploads[upload.id] = upload
+        self._by_hash[(user_id, sha256)] = upload.id
+        return UploadResponse(**upload.model_dump(), deduplicated=deduplicated)
+
+    async def _drop_expired_sessions(self):
+        now = datetime.now()
+        for session in [s for s in self.mock_sessions.values() if s.expires_at < now]:
+            await self._discard(session)
+
+    async def _discard(self, session: _UploadSession):
+        self.mock_sessions.pop(session.id, None)
+        if await aiofiles.os.path.exists(session.path):
+            await aiofiles.os.remove(session.path)
+
+    def _get_session(self, user_id: UUID, session_id: UUID) -> _UploadSession:
+        session = self.mock_sessions.get(session_id)
+        if not session or session.user_id != user_id:
+            raise NotFoundException(detail="Upload session not found")
+        return session
+
+    async def create_session(self, user_id: UUID, request: CreateUploadSessionRequest) -> UploadSessionResponse:
+        """Start a resumable upload"""
+        if request.size > settings.MAX_RESUMABLE_UPLOAD_SIZE:
+            raise PayloadTooLargeException(detail=f"Upload exceeds {settings.MAX_RESUMABLE_UPLOAD_SIZE} bytes")
+        await self._drop_expired_sessions()
+        session = _UploadSession(user_id, request)
+        await aiofiles.os.makedirs(os.path.dirname(session.path), exist_ok=True)
+        async with aiofiles.open(session.path, "wb"):
+            pass
+        self.mock_sessions[session.id] = session
+        return session.to_response()
+
+    async def get_session(self, user_id: UUID, session_id: UUID) -> UploadSessionResponse:
+        """Get a resumable upload's progress"""
+        return self._get_session(user_id, session_id).to_response()
+
+    async def append_chunk(
+        self, user_id: UUID, session_id: UUID, offset: int, chunks: AsyncIterator[bytes]
+    ) -> UploadSessionResponse:
+        """
+        Append bytes at offset, which must equal the bytes received so far
+        Progress is kept per byte written, so an interrupted chunk can be
+        resumed from the session's received offset.
+        """
+        session = self._get_session(user_id, session_id)
+        async with session.lock:
+            if offset != session.received:
+                raise ConflictException(detail=f"Expected offset {session.received}")
+            async with aiofiles.open(session.path, "ab") as out:
+                async for chunk in chunks:
+                    if session.received + len(chunk) > session.size:
+                        raise BadRequestException(detail="Chunk extends past the declared upload size")
+                    await out.write(chunk)
+                    session.hasher.update(chunk)
+                    session.received += len(chunk)
+            session.expires_at = datetime.now() + UPLOAD_SESSION_TTL
+        return session.to_response()
+
+    async def complete_session(self, user_id: UUID, session_id: UUID) -> UploadResponse:
+        """Finish a resumable upload once every byte has arrived"""
+        session = self._get_session(user_id, session_id)
+        async with session.lock:
+            if session.received != session.size:
+                raise BadRequestException(detail=f"Upload incomplete: {session.received} of {session.size} bytes")
+            sha256 = session.hasher.hexdigest()
+            if session.expected_sha256 and session.expected_sha256 != sha256:
+                await self._discard(session)
+                raise BadRequestException(detail="Checksum mismatch; upload discarded")
+            del self.mock_sessions[session.id]
+            return await self._finalize(
+                user_id, session.path, sha256, session.size, session.filename, session.content_type
+            )
+
+    async def cancel_session(self, user_id: UUID, session_id: UUID):
+        """Abandon a resumable upload"""
+        await self._discard(self._get_session(user_id, session_id))
+
+
+# Singleton instance
+upload_service = UploadService()
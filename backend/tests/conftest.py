@@ -0,0 +1,7 @@
+"""
+Test configuration: import the app's packages from the backend directory
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
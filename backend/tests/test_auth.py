@@ -0,0 +1,78 @@
+"""
+Tokens signed with JWT_SECRET_KEY or SUPABASE_JWT_SECRET are only issued
+and accepted once a real key is configured
+"""
+import asyncio
+import secrets
+from uuid import uuid4
+
+import pytest
+from jose import jwt
+
+from config import JWT_SECRET_KEY_PLACEHOLDER, SUPABASE_JWT_SECRET_PLACEHOLDER, settings
+from core import auth
+from core.exceptions import ServiceUnavailableException, UnauthorizedException
+from services.ical_service import create_feed_token, verify_feed_token
+
+
+@pytest.fixture(autouse=True)
+def clear_verified_tokens():
+    auth.verified_tokens.clear()
+    yield
+    auth.verified_tokens.clear()
+
+
+def test_tokens_round_trip_with_a_configured_key(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", secrets.token_urlsafe(32))
+    user_id = uuid4()
+    token = auth.create_access_token({"sub": str(user_id), "email": "user@example.com"})
+
+    user = asyncio.run(auth.authenticate(token))
+
+    assert (user.user_id, user.email) == (user_id, "user@example.com")
+    assert verify_feed_token(create_feed_token(user_id)) == user_id
+
+
+@pytest.mark.parametrize("key", [None, "", JWT_SECRET_KEY_PLACEHOLDER])
+def test_unconfigured_key_neither_issues_nor_accepts_tokens(monkeypatch, key):
+    user_id = uuid4()
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", key)
+    with pytest.raises(ServiceUnavailableException):
+        auth.create_access_token({"sub": str(user_id)})
+    with pytest.raises(ServiceUnavailableException):
+        create_feed_token(user_id)
+
+    # Signed with the key anyone could have read from the example config
+    forged = jwt.encode(
+        {"sub": str(user_id), "iss": settings.JWT_ISSUER, "exp": 2**31},
+        JWT_SECRET_KEY_PLACEHOLDER,
+        algorithm=settings.JWT_ALGORITHM
+    )
+    with pytest.raises(UnauthorizedException):
+        asyncio.run(auth.authenticate(forged))
+
+
+@pytest.mark.parametrize("secret", [None, "", SUPABASE_JWT_SECRET_PLACEHOLDER])
+def test_unconfigured_supabase_secret_accepts_no_tokens(monkeypatch, secret):
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", secret)
+    # Signed with the Supabase secret placeholder from the example config
+    forged = jwt.encode(
+        {"sub": str(uuid4()), "aud": settings.SUPABASE_JWT_AUDIENCE, "exp": 2**31},
+        SUPABASE_JWT_SECRET_PLACEHOLDER,
+        algorithm="HS256"
+    )
+    with pytest.raises(UnauthorizedException):
+        asyncio.run(auth.authenticate(forged))
+
+
+def test_supabase_tokens_verify_with_a_configured_secret(monkeypatch):
+    secret = secrets.token_urlsafe(32)
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", secret)
+    user_id = uuid4()
+    token = jwt.encode(
+        {"sub": str(user_id), "aud": settings.SUPABASE_JWT_AUDIENCE, "exp": 2**31},
+        secret,
+        algorithm="HS256"
+    )
+
+    assert asyncio.run(auth.authenticate(token)).user_id == user_id
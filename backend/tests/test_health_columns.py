@@ -0,0 +1,123 @@
+"""
+Randomized check that the health day columns and rolling totals match a
+full recomputation from the stored entries after every write
+"""
+import asyncio
+import random
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+
+from schemas.health import CreateHealthEntryRequest, UpdateHealthEntryRequest
+from services.health_columns import ROLLING_WINDOWS
+from services.health_ingest import ROW_ADAPTER
+from services.health_service import HealthService, _averages
+
+# Days before today that random entries are dated in
+DAY_RANGE = 120
+
+
+def _random_values(rng: random.Random) -> dict:
+    return {
+        "water": rng.randint(0, 12),
+        "steps": rng.randint(0, 30000),
+        "calories": rng.choice([None, rng.randint(0, 4000)]),
+        "bath": rng.random() < 0.5,
+        "face_wash": rng.random() < 0.5,
+    }
+
+
+def _random_update(rng: random.Random) -> dict:
+    values = _random_values(rng)
+    return {field: values[field] for field in rng.sample(sorted(values), rng.randint(1, len(values)))}
+
+
+def _expected_rolling(service: HealthService, user_id, today: date) -> list[dict]:
+    """Rolling stats recomputed from scratch from the user's entries"""
+    entries = [e for e in service.mock_entries.values() if e.user_id == user_id]
+    results = []
+    for days in ROLLING_WINDOWS:
+        start = today - timedelta(days=days - 1)
+        window = [e for e in entries if start <= e.date <= today]
+        total_water = sum(e.water for e in window)
+        total_steps = sum(e.steps for e in window)
+        total_calories = sum(e.calories or 0 for e in window)
+        results.append({
+            "window_days": days,
+            "start_date": start,
+            "end_date": today,
+            "total_water": total_water,
+            "total_steps": total_steps,
+            "total_calories": total_calories,
+            **_averages(len(window), total_water, total_steps, total_calories),
+        })
+    return results
+
+
+def _expected_totals(service: HealthService, user_id, start: date, end: date) -> tuple[int, ...]:
+    window = [e for e in service.mock_entries.values() if e.user_id == user_id and start <= e.date <= end]
+    return (
+        len(window),
+        sum(e.water for e in window),
+        sum(e.steps for e in window),
+        sum(e.calories or 0 for e in window),
+        sum(e.bath for e in window),
+        sum(e.face_wash for e in window),
+    )
+
+
+async def _run(seed: int, operations: int):
+    rng = random.Random(seed)
+    service = HealthService()
+    user_id = uuid4()
+    today = date.today()
+    entry_ids: dict[date, object] = {}
+
+    # Read once so the rolling totals exist and are maintained by every write
+    await service.get_rolling_stats(user_id, today)
+
+    for step in range(operations):
+        action = rng.random()
+        day = today - timedelta(days=rng.randrange(DAY_RANGE))
+        if action < 0.4 and day not in entry_ids:
+            entry = await service.create_entry(
+                user_id, CreateHealthEntryRequest(date=day, **_random_values(rng))
+            )
+            entry_ids[day] = entry.id
+        elif action < 0.55:
+            rows = []
+            # Days may repeat within a batch
+            for row_day in rng.choices(range(DAY_RANGE), k=rng.randint(1, 20)):
+                row_date = today - timedelta(days=row_day)
+                values = _random_values(rng)
+                # Bulk rows only overwrite the fields they set
+                fields = rng.sample(sorted(values), rng.randint(1, len(values)))
+                rows.append(ROW_ADAPTER.validate_python({"date": row_date, **{f: values[f] for f in fields}}))
+            await service.bulk_upsert(user_id, rows)
+            for entry in service.mock_entries.values():
+                if entry.user_id == user_id:
+                    entry_ids[entry.date] = entry.id
+        elif action < 0.8 and entry_ids:
+            entry_id = entry_ids[rng.choice(sorted(entry_ids))]
+            await service.update_entry(user_id, entry_id, UpdateHealthEntryRequest(**_random_update(rng)))
+        elif entry_ids:
+            entry_day = rng.choice(sorted(entry_ids))
+            await service.delete_entry(user_id, entry_ids.pop(entry_day))
+
+        # Occasionally read as of another day, so the windows slide both ways
+        read_day = today - timedelta(days=rng.randrange(10)) if rng.random() < 0.2 else today
+        rolling = await service.get_rolling_stats(user_id, read_day)
+        assert [r.model_dump() for r in rolling] == _expected_rolling(service, user_id, read_day), f"step {step}"
+
+        start = today - timedelta(days=rng.randrange(DAY_RANGE + 30))
+        end = start + timedelta(days=rng.randrange(DAY_RANGE))
+        columns = service._columns[user_id]
+        lo, hi = columns.bounds(start, end)
+        actual = columns.totals(lo, hi) + (int(columns.bath[lo:hi].sum()), int(columns.face_wash[lo:hi].sum()))
+        assert actual == _expected_totals(service, user_id, start, end), f"step {step}"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rolling_totals_match_full_recomputation(seed):
+    asyncio.run(_run(seed, operations=400))
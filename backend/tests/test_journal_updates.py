@@ -0,0 +1,40 @@
+"""
+Journal entry updates keep the stored entry and its search index in step
+"""
+import asyncio
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from schemas.journal import CreateJournalEntryRequest, UpdateJournalEntryRequest
+from services.journal_service import JournalService
+
+
+@pytest.mark.parametrize("field", ["title", "content", "images", "tags", "is_private"])
+def test_required_fields_cannot_be_cleared(field):
+    with pytest.raises(ValidationError):
+        UpdateJournalEntryRequest(**{field: None})
+
+
+def test_clearable_fields_accept_null():
+    request = UpdateJournalEntryRequest(cover_image=None, mood=None)
+    assert request.model_dump(exclude_unset=True) == {"cover_image": None, "mood": None}
+
+
+def test_updated_title_and_tags_are_searchable():
+    service = JournalService()
+    user_id = uuid4()
+
+    async def run():
+        entry = await service.create_entry(
+            user_id, CreateJournalEntryRequest(title="Temple walk", content="Ancient corridors", tags=["travel"])
+        )
+        await service.update_entry(user_id, entry.id, UpdateJournalEntryRequest(title="Harbour walk", tags=["sea"]))
+        return entry.id, [
+            [result.id for result in (await service.search_entries(user_id, query))[0]]
+            for query in ("temple", "harbour", "travel", "sea", "corridors")
+        ]
+
+    entry_id, matches = asyncio.run(run())
+    assert matches == [[], [entry_id], [], [entry_id], [entry_id]]
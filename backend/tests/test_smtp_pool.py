@@ -0,0 +1,144 @@
+"""
+SMTPPool against an in-process asyncio SMTP responder: pipelined
+envelopes, retried 4xx replies and counted 5xx failures
+"""
+import asyncio
+import re
+
+import pytest
+
+from core import smtp
+from core.smtp import SMTPPool, SMTPReplyError
+
+# Short enough that a client waiting for a reply the responder withholds fails fast
+REPLY_TIMEOUT = 2.0
+
+_ADDRESS = re.compile(r"<([^>]*)>")
+
+
+class Responder:
+    """
+    Minimal ESMTP server advertising PIPELINING
+    The envelope (MAIL, RCPT, DATA) is read in full before any of it is
+    answered, so a client that waits for each reply instead of pipelining
+    times out. Replies to RCPT for a recipient are taken from `refusals`
+    until none are left, and are 250 after that.
+    """
+
+    def __init__(self, refusals: dict[str, list[int]] = None):
+        self.refusals = {recipient: list(codes) for recipient, codes in (refusals or {}).items()}
+        self.messages: list[tuple[str, str, bytes]] = []
+        self.sessions = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.sessions += 1
+        writer.write(b"220 test ESMTP\r\n")
+        try:
+            while line := await reader.readline():
+                verb = line[:4].upper()
+                if verb == b"EHLO":
+                    writer.write(b"250-test\r\n250-PIPELINING\r\n250 SIZE 1000000\r\n")
+                elif verb == b"MAIL":
+                    await self._transaction(line, reader, writer)
+                elif verb == b"RSET":
+                    writer.write(b"250 Reset\r\n")
+                elif verb == b"QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    break
+                else:
+                    writer.write(b"502 Not implemented\r\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _transaction(self, mail: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        rcpt = await reader.readline()
+        data = await reader.readline()
+        assert rcpt.upper().startswith(b"RCPT TO:") and data.strip().upper() == b"DATA"
+        sender = _ADDRESS.search(mail.decode()).group(1)
+        recipient = _ADDRESS.search(rcpt.decode()).group(1)
+        codes = self.refusals.get(recipient)
+        code = codes.pop(0) if codes else 250
+        if code != 250:
+            writer.write(f"250 OK\r\n{code} Recipient refused\r\n554 No valid recipients\r\n".encode())
+            return
+        writer.write(b"250 OK\r\n250 OK\r\n354 Go ahead\r\n")
+        await writer.drain()
+        body = bytearray()
+        while (line := await reader.readline()) != b".\r\n":
+            body += line[1:] if line.startswith(b"..") else line
+        self.messages.append((sender, recipient, bytes(body)))
+        writer.write(b"250 Queued\r\n")
+
+
+async def _deliver(responder: Responder, sends: list[tuple[str, bytes]], size: int = 2):
+    """
+    Send (recipient, message) pairs concurrently through a fresh pool
+    Returns the pool and each send's exception (None when delivered).
+    """
+    server = await asyncio.start_server(responder.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    pool = SMTPPool("127.0.0.1", port, size=size, timeout=REPLY_TIMEOUT)
+    try:
+        results = await asyncio.gather(
+            *(pool.send("from@example.com", recipient, message) for recipient, message in sends),
+            return_exceptions=True
+        )
+    finally:
+        pool.close()
+        server.close()
+    return pool, results
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(smtp, "RETRY_BACKOFF", 0.001)
+
+
+def test_pipelined_messages_are_delivered_over_pooled_connections():
+    responder = Responder()
+    sends = [(f"user{i}@example.com", f"Subject: {i}\n\n.dotted line\nbody {i}".encode()) for i in range(6)]
+    pool, results = asyncio.run(_deliver(responder, sends, size=2))
+
+    assert results == [None] * 6
+    assert sorted(responder.messages) == sorted(
+        ("from@example.com", f"user{i}@example.com", f"Subject: {i}\r\n\r\n.dotted line\r\nbody {i}\r\n".encode())
+        for i in range(6)
+    )
+    assert pool.stats() == {
+        "size": 2, "in_use": 0, "idle": 0, "connections_opened": 2, "sent": 6, "failed": 0, "retries": 0
+    }
+    assert responder.sessions == 2
+
+
+def test_transient_replies_are_retried():
+    responder = Responder({"busy@example.com": [451, 451]})
+    pool, results = asyncio.run(_deliver(responder, [("busy@example.com", b"Subject: hi\n\nbody")]))
+
+    assert results == [None]
+    assert [recipient for _, recipient, _ in responder.messages] == ["busy@example.com"]
+    assert (pool.sent, pool.failed, pool.retries) == (1, 0, 2)
+    # The envelope was reset after each refusal, so the session was reused
+    assert pool.connections_opened == 1
+
+
+def test_transient_replies_fail_once_attempts_run_out():
+    responder = Responder({"busy@example.com": [451] * smtp.MAX_ATTEMPTS})
+    pool, (result,) = asyncio.run(_deliver(responder, [("busy@example.com", b"body")]))
+
+    assert isinstance(result, SMTPReplyError) and result.code == 451
+    assert (pool.sent, pool.failed, pool.retries) == (0, 1, smtp.MAX_ATTEMPTS - 1)
+    assert responder.messages == []
+
+
+def test_permanent_replies_fail_without_retrying():
+    responder = Responder({"gone@example.com": [550]})
+    pool, results = asyncio.run(_deliver(
+        responder, [("gone@example.com", b"body"), ("user@example.com", b"body")], size=1
+    ))
+
+    assert isinstance(results[0], SMTPReplyError) and results[0].code == 550
+    assert not results[0].transient
+    assert results[1] is None
+    assert [recipient for _, recipient, _ in responder.messages] == ["user@example.com"]
+    assert (pool.sent, pool.failed, pool.retries, pool.connections_opened) == (1, 1, 0, 1)